@@ -1,8 +1,228 @@
-from django.contrib import admin
+from datetime import timedelta
+
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME, ActionForm
+from django.contrib.admin.views.main import ChangeList, ALL_VAR, ORDER_VAR, PAGE_VAR, IS_POPUP_VAR, TO_FIELD_VAR, IS_FACETS_VAR
+from django.contrib.admin.widgets import ForeignKeyRawIdWidget
+from django.db.models import Sum
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
 # -----------------------
 from .models import *
+from .utils.bulk import BulkPostChanges
+from .utils.paginator import CountHintPaginator
+from .utils.search import PostSearch
+# -----------------------
+
+class PostOwnerAdmin(admin.ModelAdmin):
+    readonly_fields = ('post_count',)
+    post_filter = None
+
+    @admin.display(description='Posts', ordering='post_count')
+    def posts(self, owner):
+        # Opens the post list filtered by this owner (see OwnerFilter).
+        url = f"{reverse('admin:cleanblog_post_changelist')}?{self.post_filter}={owner.pk}"
+        return format_html('<a href="{}">{}</a>', url, owner.post_count)
+
+
+@admin.register(Author)
+class AuthorAdmin(PostOwnerAdmin):
+    list_display = ('id', 'name', 'email', 'occupation', 'posts')
+    list_display_links = ('id', 'name')
+    search_fields = ('name', 'email')
+    autocomplete_fields = ('user',)
+    show_full_result_count = False
+    post_filter = 'author'
+
+
+@admin.register(Category)
+class CategoryAdmin(PostOwnerAdmin):
+    list_display = ('id', 'title', 'posts')
+    list_display_links = ('id', 'title')
+    search_fields = ('title',)
+    post_filter = 'category'
+
 # -----------------------
 
-admin.site.register(Author)
-admin.site.register(Category)
-admin.site.register(Post)
\ No newline at end of file
+class CreatedFilter(admin.SimpleListFilter):
+    """Fixed ranges of ``created_at``: listing them needs no query, and each is a range on idx_post_created_at_id."""
+
+    title = 'created'
+    parameter_name = 'created'
+    ranges = (('day', 'Last 24 hours', 1), ('week', 'Last 7 days', 7), ('month', 'Last 30 days', 30), ('year', 'Last 365 days', 365))
+
+    def lookups(self, request, model_admin):
+        return [(key, label) for key, label, _ in self.ranges]
+
+    def queryset(self, request, queryset):
+        days = {key: days for key, _, days in self.ranges}.get(self.value())
+        if days:
+            return queryset.filter(created_at__gte=timezone.now() - timedelta(days=days))
+        return queryset
+
+
+class OwnerFilter(admin.SimpleListFilter):
+    """
+    Posts of one author or category, by id.
+
+    Reached from the owner's post count; only the selected owner is listed,
+    so the filter never loads the whole table.
+    """
+
+    owner_model = None
+
+    def lookups(self, request, model_admin):
+        # The admin skips filters without choices, so an unknown id still gets one.
+        value = self.value()
+        if not value:
+            return []
+        owner = self.owner_model.objects.filter(pk=value).first() if value.isdigit() else None
+        return [(value, str(owner) if owner else f'{value} (not found)')]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if not value:
+            return queryset
+        if not value.isdigit():
+            return queryset.none()
+        return queryset.filter(**{f'{self.parameter_name}_id': value})
+
+
+class CategoryFilter(OwnerFilter):
+    title = 'category'
+    parameter_name = 'category'
+    owner_model = Category
+
+
+class AuthorFilter(OwnerFilter):
+    title = 'author'
+    parameter_name = 'author'
+    owner_model = Author
+
+# -----------------------
+
+class PostActionForm(ActionForm):
+    # A raw id with a lookup popup; a <select> would load every category on each page.
+    category = forms.ModelChoiceField(
+        Category.objects.all(), required=False, label='Move to',
+        # The changelist renders the action form without ids; the lookup popup fills in #id_category.
+        widget=ForeignKeyRawIdWidget(Post._meta.get_field('category').remote_field, admin.site, attrs={'id': 'id_category'}),
+    )
+
+
+class PostChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        # Only the listed columns; text and the rendered body stay in the table.
+        return super().get_queryset(request, exclude_parameters).only(*self.model_admin.list_fields)
+
+
+@admin.register(Post)
+class PostAdmin(admin.ModelAdmin):
+    list_display = ('id', 'title', 'author_name', 'category_title', 'created_at')
+    list_display_links = ('id', 'title')
+    list_select_related = ('author', 'category')
+    list_fields = ('id', 'title', 'created_at', 'author__name', 'category__title')
+    list_filter = (CreatedFilter, CategoryFilter, AuthorFilter)
+    list_per_page = 50
+    # Matches idx_post_created_at_id.
+    ordering = ('-created_at', '-id')
+    search_fields = ('title',)
+    search_help_text = 'Full-text search over title, briefing and text.'
+    autocomplete_fields = ('author', 'category')
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    action_form = PostActionForm
+    actions = ['recategorize_posts', 'delete_posts']
+
+    # Changelist parameters that do not filter the rows.
+    display_params = {ALL_VAR, ORDER_VAR, PAGE_VAR, IS_POPUP_VAR, TO_FIELD_VAR, IS_FACETS_VAR}
+
+    @admin.display(description='Author')
+    def author_name(self, post):
+        return post.author.name
+
+    @admin.display(description='Category')
+    def category_title(self, post):
+        return post.category.title
+
+    def action_checkbox(self, post):
+        # The default label is str(post), which would load the deferred briefing and text per row.
+        attrs = {'class': 'action-select', 'aria-label': f'Select post {post.pk}: {post.title}'}
+        return forms.CheckboxInput(attrs, lambda value: False).render(ACTION_CHECKBOX_NAME, str(post.pk))
+
+    def get_changelist(self, request, **kwargs):
+        return PostChangeList
+
+    def get_actions(self, request):
+        # delete_selected loads and signals every row; delete_posts is batched.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        matches = PostSearch().filter(Post.objects.all(), search_term).order_by().values('pk')
+        return queryset.filter(pk__in=matches), False
+
+    # -----------------------
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return CountHintPaginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            count_hint=lambda: self.count_hint(request),
+        )
+
+    def count_hint(self, request):
+        """Exact row count from the ``post_count`` columns when the list is unfiltered or filtered by one owner."""
+        params = {key: value for key, value in request.GET.items() if value and key not in self.display_params}
+        if not params:
+            return Category.objects.aggregate(total=Sum('post_count'))['total'] or 0
+        if len(params) == 1:
+            (key, value), = params.items()
+            owners = {CategoryFilter.parameter_name: Category, AuthorFilter.parameter_name: Author}
+            if key in owners and value.isdigit():
+                return owners[key].objects.filter(pk=value).values_list('post_count', flat=True).first() or 0
+        return None
+
+    # -----------------------
+
+    @admin.action(description='Move selected posts to the chosen category', permissions=['change'])
+    def recategorize_posts(self, request, queryset):
+        try:
+            category = PostActionForm.base_fields['category'].clean(request.POST.get('category'))
+        except forms.ValidationError:
+            category = None
+        if category is None:
+            self.message_user(request, 'Choose the category to move the posts to.', messages.WARNING)
+            return
+        moved = BulkPostChanges().recategorize(queryset, category)
+        self.message_user(request, f'{moved} post(s) moved to {category}.')
+
+    @admin.action(description='Delete selected posts (batched)', permissions=['delete'])
+    def delete_posts(self, request, queryset):
+        deleted = BulkPostChanges().delete(queryset)
+        self.message_user(request, f'{deleted} post(s) deleted.')
+
+# -----------------------
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'max_attempts', 'run_at', 'finished_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name',)
+    date_hierarchy = 'created_at'
+    readonly_fields = [field.name for field in Job._meta.fields]
+    actions = ['retry_jobs']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Retry selected jobs now')
+    def retry_jobs(self, request, queryset):
+        updated = queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED, run_at=timezone.now(), attempts=0, locked_by='', locked_at=None, finished_at=None,
+        )
+        self.message_user(request, f'{updated} job(s) queued again.')
@@ -0,0 +1,237 @@
+import json
+from datetime import datetime, time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views import View
+
+# -----------------------
+
+from .models import Post
+from .utils.cache import ContentCache
+from .utils.http import HttpCacheMixin
+from .utils.paginator import CursorPaginator, InvalidCursor
+from .utils.records import PostRecords
+
+# -----------------------
+
+class ApiError(Exception):
+    pass
+
+
+class PostApiView(HttpCacheMixin, View):
+    """
+    Read-only JSON for posts, version 1.
+
+    ``?fields=id,title,text`` selects the serialized fields; only their
+    columns (and joins) are queried, and ``text``/``html`` are never sent
+    unless asked for. Rows are read with ``values_list()`` and serialized
+    straight from the tuples.
+    """
+
+    # Public field -> column; ``url`` is built from the id.
+    fields = {
+        'id': 'id',
+        'url': 'id',
+        'title': 'title',
+        'briefing': 'briefing',
+        'excerpt': 'excerpt',
+        'reading_time': 'reading_time',
+        'text': 'text',
+        'html': 'text_html',
+        'picture': 'picture',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+        'author_id': 'author_id',
+        'author': 'author__name',
+        'category_id': 'category_id',
+        'category': 'category__title',
+    }
+    default_fields = (
+        'id', 'url', 'title', 'briefing', 'excerpt', 'reading_time', 'created_at', 'updated_at',
+        'author_id', 'author', 'category_id', 'category',
+    )
+
+    def dispatch(self, request, *args, **kwargs):
+        # Validated before the validators, so a bad request is a 400 rather than a cached 200.
+        try:
+            self.parse_request()
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+        except Http404 as error:
+            return JsonResponse({'error': str(error)}, status=404)
+
+    def parse_request(self):
+        self.names = self.get_fields()
+
+    def get_fields(self):
+        requested = self.request.GET.get('fields', '')
+        if not requested:
+            return self.default_fields
+        names = tuple(dict.fromkeys(name.strip() for name in requested.split(',') if name.strip()))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(self.fields)}.")
+        return names
+
+    def get_columns(self, names, *required):
+        return tuple(dict.fromkeys((*required, *(self.fields[name] for name in names))))
+
+    def serializer(self, names, columns):
+        """Return ``row -> dict`` for ``values_list(*columns)`` rows."""
+        positions = [(name, columns.index(self.fields[name])) for name in names]
+        media_url = self.request.build_absolute_uri(settings.MEDIA_URL)
+
+        def serialize(row):
+            item = {}
+            for name, position in positions:
+                value = row[position]
+                if name == 'url':
+                    value = self.request.build_absolute_uri(reverse('post-detail', args=[value]))
+                elif name == 'picture':
+                    value = f'{media_url}{value}' if value else None
+                item[name] = value
+            return item
+        return serialize
+
+    def dumps(self, data):
+        return json.dumps(data, cls=DjangoJSONEncoder)
+
+# -----------------------
+
+class PostListApiView(PostApiView):
+    """
+    ``GET /api/v1/posts/``: newest first, filtered by ``category``, ``author``,
+    ``created_after`` and ``created_before`` (ISO dates or datetimes).
+
+    Pages are walked with an opaque ``cursor`` on ``(created_at, id)`` over
+    the (owner, -created_at, -id) indexes, so deep pages cost the same as
+    the first and no ``COUNT(*)`` is issued. The body is streamed as rows
+    come off the cursor; the ``next`` link closes it.
+    """
+
+    limit = 20
+    max_limit = 500
+    filters = ('category', 'author', 'created_after', 'created_before', 'cursor', 'limit')
+    chunk_size = 100
+
+    def get_limit(self):
+        value = self.request.GET.get('limit') or self.limit
+        try:
+            value = int(value)
+        except ValueError:
+            raise ApiError('limit must be an integer.')
+        if not 1 <= value <= self.max_limit:
+            raise ApiError(f'limit must be between 1 and {self.max_limit}.')
+        return value
+
+    def parse_moment(self, name):
+        value = self.request.GET.get(name)
+        if not value:
+            return None
+        try:
+            moment = parse_datetime(value)
+            if moment is None:
+                day = parse_date(value)
+                moment = day and datetime.combine(day, time.min)
+        except ValueError:
+            moment = None
+        if moment is None:
+            raise ApiError(f'{name} must be an ISO 8601 date or datetime.')
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    def get_queryset(self):
+        queryset = Post.objects.all()
+        for name in ('category', 'author'):
+            value = self.request.GET.get(name)
+            if value:
+                if not value.isdigit():
+                    raise ApiError(f'{name} must be an id.')
+                queryset = queryset.filter(**{f'{name}_id': int(value)})
+        created_after = self.parse_moment('created_after')
+        if created_after:
+            queryset = queryset.filter(created_at__gte=created_after)
+        created_before = self.parse_moment('created_before')
+        if created_before:
+            queryset = queryset.filter(created_at__lt=created_before)
+        return queryset
+
+    # -----------------------
+
+    def parse_request(self):
+        super().parse_request()
+        self.per_page = self.get_limit()
+        self.paginator = CursorPaginator(self.get_queryset(), self.per_page)
+        try:
+            direction, _, self.queryset = self.paginator.get_page_queryset(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise ApiError('Invalid cursor.')
+        # Forward-only: the body is streamed, so pages are never reversed.
+        if direction != self.paginator.NEXT:
+            raise ApiError('Invalid cursor: backward cursors are not supported; follow "next" from the first page.')
+
+    def get_validators(self):
+        parts = [self.request.GET.get(name, '') for name in self.filters]
+        return self.make_etag('api-post-list', ContentCache().version(), ','.join(self.names), *parts), None
+
+    def get(self, request, *args, **kwargs):
+        columns = self.get_columns(self.names, 'id', 'created_at')
+        rows = self.queryset.values_list(*columns)[:self.per_page + 1]
+        return StreamingHttpResponse(
+            self.render(rows.iterator(chunk_size=self.chunk_size), columns),
+            content_type='application/json',
+        )
+
+    def render(self, rows, columns):
+        serialize = self.serializer(self.names, columns)
+        created_at = columns.index('created_at')
+        yield '{"results": ['
+        chunk, separator, last, count, cursor = [], '', None, 0, None
+        for row in rows:
+            if count == self.per_page:
+                # The extra row only tells that another page exists.
+                cursor = self.paginator.encode_position(self.paginator.NEXT, last[created_at], last[0])
+                break
+            chunk.append(self.dumps(serialize(row)))
+            last, count = row, count + 1
+            if len(chunk) == self.chunk_size:
+                yield separator + ','.join(chunk)
+                chunk, separator = [], ','
+        if chunk:
+            yield separator + ','.join(chunk)
+        next_url = None
+        if cursor:
+            query = self.request.GET.copy()
+            query['cursor'] = cursor
+            next_url = self.request.build_absolute_uri(f'{self.request.path}?{query.urlencode()}')
+        yield f'], "next_cursor": {self.dumps(cursor)}, "next": {self.dumps(next_url)}}}'
+
+
+class PostDetailApiView(PostApiView):
+    """
+    ``GET /api/v1/posts/<id>/``.
+
+    Validators come from the post's record versions (``PostRecords``), so a
+    revalidation is answered with a 304 without touching the database.
+    """
+
+    def get_validators(self):
+        record = PostRecords().get(self.kwargs['pk'])
+        if record is None:
+            raise Http404('Post not found.')
+        versions, post = record
+        return self.make_etag('api-post', post.pk, ','.join(self.names), *versions), post.updated_at or post.created_at
+
+    def get(self, request, pk):
+        columns = self.get_columns(self.names, 'id')
+        row = Post.objects.filter(pk=pk).values_list(*columns).first()
+        if row is None:
+            raise Http404('Post not found.')
+        return JsonResponse(self.serializer(self.names, columns)(row))
@@ -1,7 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 # -----------------------
 
 class CleanblogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cleanblog'
+
+    def ready(self):
+        from . import signals
+        post_migrate.connect(signals.install_search_triggers, sender=self)
@@ -0,0 +1,150 @@
+import hashlib
+import json
+from xml.sax.saxutils import escape, quoteattr
+
+from django.db.models import Max
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import rfc2822_date, rfc3339_date
+from django.utils.http import http_date, quote_etag
+from django.views import View
+
+# -----------------------
+
+from .models import Author, Category, Post
+from .utils.cache import ContentCache
+
+# -----------------------
+
+class PostFeedView(View):
+    """
+    RSS 2.0, Atom and JSON Feed of the newest posts, optionally per category or author.
+
+    Validators come from one ``MAX(created_at), MAX(updated_at)`` query plus
+    the content version, so unchanged polls get a 304 before any post row is
+    read. Bodies are streamed from a narrow ``values_list()`` projection.
+    """
+
+    limit = 50
+    content_types = {
+        'rss': 'application/rss+xml; charset=utf-8',
+        'atom': 'application/atom+xml; charset=utf-8',
+        'json': 'application/feed+json; charset=utf-8',
+    }
+    fields = ('id', 'title', 'briefing', 'created_at', 'updated_at', 'author__name', 'category__title')
+
+    scope = None
+
+    def get_scope(self):
+        pk = self.kwargs.get('pk')
+        if self.scope == 'category':
+            title = Category.objects.filter(pk=pk).values_list('title', flat=True).first()
+            if title is None:
+                raise Http404('Category not found.')
+            return {'category_id': pk}, f'CleanBlog: {title}'
+        if self.scope == 'author':
+            name = Author.objects.filter(pk=pk).values_list('name', flat=True).first()
+            if name is None:
+                raise Http404('Author not found.')
+            return {'author_id': pk}, f'CleanBlog: posts by {name}'
+        return {}, 'CleanBlog'
+
+    def get(self, request, format, **kwargs):
+        filters, self.title = self.get_scope()
+        queryset = Post.objects.filter(**filters)
+
+        latest = queryset.aggregate(created=Max('created_at'), updated=Max('updated_at'))
+        last_modified = max((date for date in latest.values() if date), default=None)
+        digest = hashlib.md5(
+            f'{format}|{self.scope}|{kwargs.get("pk")}|{last_modified}|{ContentCache().version()}'.encode()
+        ).hexdigest()
+        etag = quote_etag(digest)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            rows = queryset.order_by('-created_at', '-id').values_list(*self.fields)[:self.limit]
+            body = getattr(self, f'render_{format}')(rows.iterator(), last_modified)
+            response = StreamingHttpResponse(body, content_type=self.content_types[format])
+        response.headers['ETag'] = etag
+        if timestamp is not None:
+            response.headers['Last-Modified'] = http_date(timestamp)
+        return response
+
+    # -----------------------
+
+    def item(self, row):
+        pk, title, briefing, created_at, updated_at, author, category = row
+        return {
+            'url': self.request.build_absolute_uri(reverse('post-detail', args=[pk])),
+            'title': title,
+            'summary': briefing,
+            'published': created_at,
+            'updated': updated_at or created_at,
+            'author': author,
+            'category': category,
+        }
+
+    def render_rss(self, rows, last_modified):
+        link = self.request.build_absolute_uri(reverse('post-list'))
+        yield '<?xml version="1.0" encoding="utf-8"?>\n'
+        yield '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom" xmlns:dc="http://purl.org/dc/elements/1.1/"><channel>'
+        yield f'<title>{escape(self.title)}</title><link>{escape(link)}</link><description>{escape(self.title)}</description>'
+        yield f'<atom:link href={quoteattr(self.request.build_absolute_uri())} rel="self"/>'
+        if last_modified:
+            yield f'<lastBuildDate>{rfc2822_date(last_modified)}</lastBuildDate>'
+        for row in rows:
+            item = self.item(row)
+            yield (
+                f'<item><title>{escape(item["title"])}</title><link>{escape(item["url"])}</link>'
+                f'<guid isPermaLink="true">{escape(item["url"])}</guid>'
+                f'<description>{escape(item["summary"])}</description>'
+                f'<dc:creator>{escape(item["author"])}</dc:creator><category>{escape(item["category"])}</category>'
+                f'<pubDate>{rfc2822_date(item["published"])}</pubDate></item>'
+            )
+        yield '</channel></rss>\n'
+
+    def render_atom(self, rows, last_modified):
+        link = self.request.build_absolute_uri(reverse('post-list'))
+        yield '<?xml version="1.0" encoding="utf-8"?>\n'
+        yield '<feed xmlns="http://www.w3.org/2005/Atom">'
+        yield f'<title>{escape(self.title)}</title><link href={quoteattr(link)} rel="alternate"/>'
+        yield f'<link href={quoteattr(self.request.build_absolute_uri())} rel="self"/>'
+        yield f'<id>{escape(self.request.build_absolute_uri())}</id>'
+        if last_modified:
+            yield f'<updated>{rfc3339_date(last_modified)}</updated>'
+        for row in rows:
+            item = self.item(row)
+            yield (
+                f'<entry><title>{escape(item["title"])}</title><link href={quoteattr(item["url"])} rel="alternate"/>'
+                f'<id>{escape(item["url"])}</id><published>{rfc3339_date(item["published"])}</published>'
+                f'<updated>{rfc3339_date(item["updated"])}</updated>'
+                f'<author><name>{escape(item["author"])}</name></author>'
+                f'<summary>{escape(item["summary"])}</summary><category term={quoteattr(item["category"])}/></entry>'
+            )
+        yield '</feed>\n'
+
+    def render_json(self, rows, last_modified):
+        header = {
+            'version': 'https://jsonfeed.org/version/1.1',
+            'title': self.title,
+            'home_page_url': self.request.build_absolute_uri(reverse('post-list')),
+            'feed_url': self.request.build_absolute_uri(),
+        }
+        yield json.dumps(header)[:-1] + ', "items": ['
+        separator = ''
+        for row in rows:
+            item = self.item(row)
+            yield separator + json.dumps({
+                'id': item['url'],
+                'url': item['url'],
+                'title': item['title'],
+                'summary': item['summary'],
+                'date_published': rfc3339_date(item['published']),
+                'date_modified': rfc3339_date(item['updated']),
+                'authors': [{'name': item['author']}],
+                'tags': [item['category']],
+            })
+            separator = ', '
+        yield ']}\n'
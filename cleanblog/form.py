@@ -2,9 +2,8 @@ from django import forms
 
 # --------------------------------------------------------------------
 
-from .models import (
-    Post, Category
-)
+from .models import Post
+from .utils.categories import CategoryChoiceField
 from .utils.validators import Validator
 
 # --------------------------------------------------------------------
@@ -69,12 +68,12 @@ class PostForm(forms.ModelForm):
     )
 
     text = forms.CharField(
-        max_length=3000,
+        max_length=50000,
         widget=forms.Textarea(attrs={  
             'class': 'form-control',
             'cols':'30',
             'rows':'10',
-            'maxlength':'3000'
+            'maxlength':'50000'
         })
     )
 
@@ -85,8 +84,7 @@ class PostForm(forms.ModelForm):
         })
     )
 
-    category = forms.ModelChoiceField(
-        queryset=Category.objects.all(),
+    category = CategoryChoiceField(
         widget=forms.Select(attrs={
             'class': 'form-control'
         })
@@ -96,14 +94,21 @@ class PostForm(forms.ModelForm):
         super(PostForm, self).__init__(*args, **kwargs)
         for field in self.fields.values():
             field.required = False
+        # category is not in Meta.fields, so it is not part of the model's initial data.
+        if self.instance.category_id is not None:
+            self.initial.setdefault('category', self.instance.category_id)
     
     def clean_title(self):
         title = self.cleaned_data.get('title')
         return Validator().validate_string(title, 'title', 5, 45)
 
     def clean_category(self):
-        category = self.cleaned_data.get('category')
-        return Validator().validate_category(category)
+        # Checked against CategoryCache and set on the instance here; category is
+        # left out of Meta.fields so model validation does not look it up again
+        # (the FK constraint still applies on save).
+        category = Validator().validate_category(self.cleaned_data.get('category'))
+        self.instance.category = category
+        return category
     
     def clean_briefing(self):
         briefing = self.cleaned_data.get('briefing')
@@ -111,15 +116,15 @@ class PostForm(forms.ModelForm):
    
     def clean_text(self):
         text = self.cleaned_data.get('text')
-        return Validator().validate_string(text, 'text', 100, 3000)
+        return Validator().validate_string(text, 'text', 100, 50000)
     
     def clean_picture(self):
         picture = self.cleaned_data.get('picture')
         return Validator().validate_picture(picture)
-    
+
     class Meta:
         model = Post
-        fields = ('title', 'category', 'briefing', 'text', 'picture')
+        fields = ('title', 'briefing', 'text', 'picture')
 
 # --------------------------------------------------------------------
         
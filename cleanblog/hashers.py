@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+# -----------------------
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the iteration count taken from ``PASSWORD_PBKDF2_ITERATIONS``.
+
+    It keeps the ``pbkdf2_sha256`` algorithm name, so it verifies every
+    existing hash. Hashes stored with another iteration count are reported
+    by ``must_update()``, and Django re-hashes them on the next successful
+    login: changing the setting migrates accounts as their owners sign in.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', None) or PBKDF2PasswordHasher.iterations
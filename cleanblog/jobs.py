@@ -0,0 +1,197 @@
+import functools
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+# -----------------------
+
+from .metrics import registry
+from .models import Job
+
+# -----------------------
+
+logger = logging.getLogger('cleanblog.jobs')
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF = 30
+
+registry.describe('cleanblog_jobs_total', 'counter', 'Background jobs run, by task and outcome.')
+registry.describe('cleanblog_job_duration_seconds', 'histogram', 'Background job run time, by task.')
+
+# -----------------------
+
+def retry_delay(attempts, backoff=DEFAULT_BACKOFF):
+    """Exponential backoff (backoff, 2x, 4x... capped at an hour) with up to 10% jitter."""
+    delay = min(backoff * 2 ** max(attempts - 1, 0), 3600)
+    return timedelta(seconds=delay * (1 + random.random() / 10))
+
+# -----------------------
+
+class Task:
+    """A function that can be run by the job queue; created with ``@job``."""
+
+    def __init__(self, func, max_attempts=DEFAULT_MAX_ATTEMPTS, backoff=DEFAULT_BACKOFF):
+        functools.update_wrapper(self, func)
+        self.func = func
+        # Workers find the function again through this dotted path.
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        """
+        Enqueue a run; arguments must be JSON-serializable.
+
+        The job row is written in the caller's transaction, so workers only
+        see it once that transaction commits and a rollback discards it.
+        With ``JOBS_RUN_INLINE`` the function instead runs in this process
+        right after the commit (development without a worker).
+        """
+        using = router.db_for_write(Job)
+        if getattr(settings, 'JOBS_RUN_INLINE', False):
+            transaction.on_commit(functools.partial(self.run_inline, args, kwargs), using=using)
+            return None
+        return Job.objects.using(using).create(
+            name=self.name, args=list(args), kwargs=kwargs, max_attempts=self.max_attempts,
+        )
+
+    def run_inline(self, args, kwargs):
+        try:
+            self.func(*args, **kwargs)
+        except Exception:
+            logger.exception('Job %s failed.', self.name)
+
+
+def job(func=None, *, max_attempts=DEFAULT_MAX_ATTEMPTS, backoff=DEFAULT_BACKOFF):
+    """
+    Turn a module-level function into a ``Task``::
+
+        @job(max_attempts=3)
+        def notify(post_id): ...
+
+        notify.delay(post.pk)
+    """
+    if func is None:
+        return functools.partial(job, max_attempts=max_attempts, backoff=backoff)
+    return Task(func, max_attempts=max_attempts, backoff=backoff)
+
+# -----------------------
+
+class Worker:
+    """
+    Claims due jobs and runs them on a thread pool.
+
+    A job is claimed with a conditional UPDATE (``queued`` -> ``running``),
+    so any number of worker processes can poll the same table without a
+    broker or row locks; SQLite serializes the writes. Jobs left ``running``
+    by a worker that died are requeued after ``JOBS_LOCK_TIMEOUT`` seconds.
+    """
+
+    housekeeping_interval = 60
+
+    def __init__(self, threads=4, poll_interval=1.0):
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.lock_timeout = getattr(settings, 'JOBS_LOCK_TIMEOUT', 600)
+        self.retention = getattr(settings, 'JOBS_RETENTION', 7 * 86400)
+        self.stopping = threading.Event()
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def work(self, burst=False):
+        """Run jobs until ``stop()`` is called, or until none are due when ``burst`` is set."""
+        last_housekeeping = 0
+        with ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='jobs') as executor:
+            pending = set()
+            while not self.stopping.is_set():
+                if time.monotonic() - last_housekeeping >= self.housekeeping_interval:
+                    self.housekeeping()
+                    last_housekeeping = time.monotonic()
+                free = self.threads - len(pending)
+                if free:
+                    pending |= {executor.submit(self.execute_in_thread, pk) for pk in self.claim(free)}
+                if not pending:
+                    if burst:
+                        break
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                _, pending = wait(pending, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+            # Leaving the executor waits for the jobs already running.
+
+    # -----------------------
+
+    def claim(self, limit):
+        now = timezone.now()
+        candidates = (
+            Job.objects.filter(status=Job.QUEUED, run_at__lte=now)
+            .order_by('run_at', 'id').values_list('id', flat=True)[:limit]
+        )
+        claimed = []
+        for pk in list(candidates):
+            updated = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+                status=Job.RUNNING, locked_by=self.name, locked_at=now, attempts=F('attempts') + 1,
+            )
+            if updated:
+                claimed.append(pk)
+        return claimed
+
+    def execute(self, pk):
+        job = Job.objects.using(router.db_for_write(Job)).get(pk=pk)
+        started = time.perf_counter()
+        task = None
+        try:
+            task = import_string(job.name)
+            getattr(task, 'func', task)(*job.args, **job.kwargs)
+        except Exception:
+            outcome = self.fail(job, task, traceback.format_exc())
+        else:
+            Job.objects.filter(pk=pk).update(status=Job.DONE, finished_at=timezone.now(), last_error='')
+            outcome = Job.DONE
+        elapsed = time.perf_counter() - started
+        registry.inc('cleanblog_jobs_total', [('task', job.name), ('outcome', outcome)])
+        registry.observe('cleanblog_job_duration_seconds', elapsed, [('task', job.name)])
+        return outcome
+
+    def execute_in_thread(self, pk):
+        try:
+            return self.execute(pk)
+        finally:
+            # Same connection hygiene as the end of a request.
+            close_old_connections()
+
+    def fail(self, job, task, error):
+        if job.attempts >= job.max_attempts:
+            logger.error('Job %s (%s) failed after %s attempts:\n%s', job.pk, job.name, job.attempts, error)
+            Job.objects.filter(pk=job.pk).update(status=Job.FAILED, finished_at=timezone.now(), last_error=error)
+            return Job.FAILED
+        delay = retry_delay(job.attempts, task.backoff if isinstance(task, Task) else DEFAULT_BACKOFF)
+        logger.warning('Job %s (%s) failed, retrying in %.0fs.', job.pk, job.name, delay.total_seconds())
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.QUEUED, run_at=timezone.now() + delay, locked_by='', locked_at=None, last_error=error,
+        )
+        return 'retried'
+
+    def housekeeping(self):
+        now = timezone.now()
+        stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=now - timedelta(seconds=self.lock_timeout))
+        lost = 'Worker lost while running the job.'
+        stale.filter(attempts__lt=F('max_attempts')).update(status=Job.QUEUED, locked_by='', locked_at=None, last_error=lost)
+        stale.update(status=Job.FAILED, finished_at=now, last_error=lost)
+        Job.objects.filter(status=Job.DONE, finished_at__lt=now - timedelta(seconds=self.retention)).delete()
@@ -0,0 +1,68 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+# -----------------------
+
+from ...models import Author, Post
+from ...utils.cache import ContentCache
+from ...utils.images import ImageVariants
+
+# -----------------------
+
+logger = logging.getLogger(__name__)
+
+# -----------------------
+
+class Command(BaseCommand):
+    help = 'Generate responsive image variants for existing Post and Author pictures.'
+
+    batch_size = 200
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that are already up to date.')
+        parser.add_argument('--workers', type=int, default=4, help='Number of images processed in parallel.')
+
+    def handle(self, *args, **options):
+        images = ImageVariants()
+        force = options['force']
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            for model in (Post, Author):
+                label = model._meta.label
+                processed = 0
+                for batch in self.batches(model, images, force):
+                    processed += len(list(executor.map(lambda pk: self.process(images, label, pk, force), batch)))
+                    ContentCache().bump()
+                self.stdout.write(f'{model._meta.verbose_name_plural}: {processed} processed.')
+        self.stdout.write(self.style.SUCCESS('Image variants are up to date.'))
+
+    def batches(self, model, images, force):
+        """
+        Yield lists of pks to process, one keyset page at a time.
+
+        Each page is read in full before the workers start: an open read
+        cursor would keep SQLite's shared lock and make their writes fail.
+        """
+        last = 0
+        while True:
+            rows = list(
+                model.objects.filter(pk__gt=last).order_by('pk')
+                .only('id', 'picture', 'picture_variants')[:self.batch_size]
+            )
+            if not rows:
+                return
+            last = rows[-1].pk
+            batch = [row.pk for row in rows if force or images.is_stale(row)]
+            if batch:
+                yield batch
+
+    def process(self, images, label, pk, force):
+        try:
+            images.process(label, pk, force=force, invalidate=False)
+        except Exception:
+            logger.exception('Could not generate variants for %s %s.', label, pk)
+        finally:
+            # Each pool thread has its own connection; do not leave it open.
+            connections.close_all()
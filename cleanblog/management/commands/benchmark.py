@@ -0,0 +1,314 @@
+import http.cookiejar
+import json
+import platform
+import random
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+# -----------------------
+
+from ...models import Category, Post
+from .seed_posts import USERNAME_PREFIX, WORDS
+
+# -----------------------
+
+ENDPOINTS = ('list', 'detail', 'search', 'create', 'login')
+OK_STATUSES = (200, 302, 304)
+# Client mode measures the login hash itself; every request comes from one address.
+UNTHROTTLED = {'ip': (10 ** 9, 10 ** 9), 'username': (10 ** 9, 10 ** 9), 'account': (10 ** 9, 10 ** 9)}
+
+# -----------------------
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, round(fraction * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def tiny_png():
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.new('RGB', (8, 8), (200, 200, 200)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+# -----------------------
+
+class ClientSession:
+    """Drives the application in-process through the Django test client."""
+
+    def __init__(self):
+        self.client = Client()
+
+    def login(self, username, password):
+        if not self.client.login(username=username, password=password):
+            raise CommandError(f'Cannot log in as {username!r}; run seed_posts first.')
+
+    def get(self, path, params=None):
+        return self.client.get(path, params or {}).status_code
+
+    def post(self, path, data, files=None):
+        data = dict(data)
+        for name, (filename, content) in (files or {}).items():
+            data[name] = SimpleUploadedFile(filename, content, content_type='image/png')
+        return self.client.post(path, data).status_code
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpSession:
+    """Drives a running server over HTTP, with its own cookie jar and CSRF token."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect)
+
+    def csrf_token(self):
+        token = next((cookie.value for cookie in self.cookies if cookie.name == settings.CSRF_COOKIE_NAME), None)
+        if token is None:
+            self.get(reverse('login'))
+            token = next((cookie.value for cookie in self.cookies if cookie.name == settings.CSRF_COOKIE_NAME), '')
+        return token
+
+    def open(self, request):
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            error.read()
+            return error.code
+
+    def login(self, username, password):
+        if self.post(reverse('login'), {'username': username, 'password': password}) != 302:
+            raise CommandError(f'Cannot log in as {username!r} on {self.base_url}.')
+
+    def get(self, path, params=None):
+        query = f'?{urllib.parse.urlencode(params)}' if params else ''
+        return self.open(urllib.request.Request(f'{self.base_url}{path}{query}'))
+
+    def post(self, path, data, files=None):
+        data = {**data, 'csrfmiddlewaretoken': self.csrf_token()}
+        if files:
+            boundary = uuid.uuid4().hex
+            parts = []
+            for name, value in data.items():
+                parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+            for name, (filename, content) in files.items():
+                parts.append(
+                    f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                    f'Content-Type: image/png\r\n\r\n'.encode() + content + b'\r\n'
+                )
+            parts.append(f'--{boundary}--\r\n'.encode())
+            body, content_type = b''.join(parts), f'multipart/form-data; boundary={boundary}'
+        else:
+            body, content_type = urllib.parse.urlencode(data).encode(), 'application/x-www-form-urlencoded'
+        request = urllib.request.Request(
+            f'{self.base_url}{path}', data=body, method='POST',
+            headers={'Content-Type': content_type, 'Referer': f'{self.base_url}{path}'},
+        )
+        return self.open(request)
+
+# -----------------------
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the list, detail, search, create and login endpoints and write '
+        'p50/p95/p99 latency, throughput, SQL query counts and peak memory to a JSON file. '
+        "Seed data with seed_posts first; 'create' writes real posts, so use a disposable database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help=f'Comma-separated subset of {", ".join(ENDPOINTS)}.')
+        parser.add_argument('--requests', type=int, default=200, help='Timed requests per endpoint.')
+        parser.add_argument('--warmup', type=int, default=10, help='Untimed requests per endpoint before measuring.')
+        parser.add_argument('--concurrency', type=int, default=1, help='Parallel workers, each with its own session.')
+        parser.add_argument('--mode', choices=('client', 'http'), default='client', help='In-process test client, or HTTP against --base-url.')
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server driven in http mode.')
+        parser.add_argument('--username', default=f'{USERNAME_PREFIX}0', help='Author used by create and login.')
+        parser.add_argument('--password', default='benchmark')
+        parser.add_argument('--memory-requests', type=int, default=20, help='Requests traced with tracemalloc (client mode).')
+        parser.add_argument('--cold', action='store_true', help='Clear the cache before each endpoint.')
+        parser.add_argument(
+            '--login-throttle', action='store_true',
+            help='Keep LOGIN_THROTTLE in client mode (http mode always uses the server settings).',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='benchmark.json', help="Result file ('-' for stdout).")
+
+    def handle(self, *args, **options):
+        endpoints = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = set(endpoints) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f'Unknown endpoints: {", ".join(sorted(unknown))}.')
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be positive.')
+
+        self.options = options
+        self.random = random.Random(options['seed'])
+        self.lock = threading.Lock()
+        # Sampled once: detail requests pick from these instead of querying per request.
+        self.post_ids = list(Post.objects.order_by('?').values_list('id', flat=True)[:10000])
+        self.category_id = Category.objects.values_list('id', flat=True).first()
+        if not self.post_ids and {'detail', 'create'} & set(endpoints):
+            raise CommandError('No posts to benchmark; run seed_posts first.')
+        self.picture = tiny_png() if 'create' in endpoints else None
+
+        results = {
+            'meta': {
+                'mode': options['mode'],
+                'base_url': options['base_url'] if options['mode'] == 'http' else None,
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'cold': options['cold'],
+                'posts': Post.objects.count(),
+                'database': connection.vendor,
+                'cache': settings.CACHES['default']['BACKEND'],
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            },
+            'endpoints': {},
+        }
+        for name in endpoints:
+            if options['cold']:
+                cache.clear()
+            if name == 'login' and options['mode'] == 'client' and not options['login_throttle']:
+                with override_settings(LOGIN_THROTTLE=UNTHROTTLED):
+                    results['endpoints'][name] = summary = self.run_endpoint(name)
+            else:
+                results['endpoints'][name] = summary = self.run_endpoint(name)
+            self.stderr.write(
+                f'{name:>7}: p50 {summary["p50_ms"]:.1f}ms  p95 {summary["p95_ms"]:.1f}ms  '
+                f'p99 {summary["p99_ms"]:.1f}ms  {summary["throughput_rps"]:.0f} req/s  '
+                f'errors {summary["errors"]}'
+            )
+
+        payload = json.dumps(results, indent=2)
+        if options['output'] == '-':
+            self.stdout.write(payload)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                stream.write(payload + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}.'))
+
+    # -----------------------
+
+    def new_session(self, name):
+        if self.options['mode'] == 'http':
+            session = HttpSession(self.options['base_url'])
+        else:
+            session = ClientSession()
+        if name == 'create':
+            session.login(self.options['username'], self.options['password'])
+        return session
+
+    def choice(self, values):
+        with self.lock:
+            return self.random.choice(values)
+
+    def request(self, name, session):
+        """Issue one request for ``name`` and return its status code."""
+        if name == 'list':
+            return session.get(reverse('post-list'))
+        if name == 'detail':
+            return session.get(reverse('post-detail', args=[self.choice(self.post_ids)]))
+        if name == 'search':
+            return session.get(reverse('post-list'), {'search': self.choice(WORDS)})
+        if name == 'create':
+            data = {
+                'title': f'Benchmark {self.choice(WORDS)}',
+                'briefing': f'Benchmark briefing about {self.choice(WORDS)}',
+                'text': ' '.join(self.choice(WORDS) for _ in range(40)),
+                'category': self.category_id,
+            }
+            return session.post(reverse('post-create'), data, files={'picture': ('bench.png', self.picture)})
+        # login: a fresh session each time so every request authenticates.
+        session = self.new_session(name)
+        return session.post(reverse('login'), {'username': self.options['username'], 'password': self.options['password']})
+
+    def worker(self, name, count, in_process, close=False):
+        session = self.new_session(name)
+        timings, queries, errors = [], [], 0
+        for _ in range(count):
+            started = time.perf_counter()
+            if in_process:
+                with CaptureQueriesContext(connection) as captured:
+                    status = self.request(name, session)
+                queries.append(len(captured))
+            else:
+                status = self.request(name, session)
+            timings.append((time.perf_counter() - started) * 1000)
+            if status not in OK_STATUSES:
+                errors += 1
+        if close:
+            # Each pool thread opened its own connection.
+            connection.close()
+        return timings, queries, errors
+
+    def run_endpoint(self, name):
+        options = self.options
+        in_process = options['mode'] == 'client'
+        workers = options['concurrency']
+
+        if options['warmup']:
+            self.worker(name, options['warmup'], in_process=False)
+
+        shares = [options['requests'] // workers + (i < options['requests'] % workers) for i in range(workers)]
+        started = time.perf_counter()
+        if workers == 1:
+            outcomes = [self.worker(name, shares[0], in_process)]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                outcomes = list(executor.map(lambda count: self.worker(name, count, in_process, close=True), shares))
+        elapsed = time.perf_counter() - started
+
+        timings = sorted(timing for outcome in outcomes for timing in outcome[0])
+        queries = [count for outcome in outcomes for count in outcome[1]]
+        summary = {
+            'requests': len(timings),
+            'errors': sum(outcome[2] for outcome in outcomes),
+            'p50_ms': percentile(timings, 0.50),
+            'p95_ms': percentile(timings, 0.95),
+            'p99_ms': percentile(timings, 0.99),
+            'mean_ms': sum(timings) / len(timings),
+            'max_ms': timings[-1],
+            'throughput_rps': len(timings) / elapsed,
+            'queries_mean': sum(queries) / len(queries) if queries else None,
+            'queries_max': max(queries) if queries else None,
+            'peak_memory_kb': None,
+        }
+        # Memory is traced in a separate short run: tracemalloc would skew the latencies.
+        if in_process and options['memory_requests']:
+            session = self.new_session(name)
+            tracemalloc.start()
+            try:
+                for _ in range(options['memory_requests']):
+                    self.request(name, session)
+                summary['peak_memory_kb'] = tracemalloc.get_traced_memory()[1] / 1024
+            finally:
+                tracemalloc.stop()
+        return summary
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+# -----------------------
+
+from ...utils.bundles import AssetBundles
+
+# -----------------------
+
+class Command(BaseCommand):
+    help = 'Concatenate the ASSET_BUNDLES into static/bundles/; run collectstatic afterwards to fingerprint and compress them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='Bundles to build (default: all).')
+
+    def handle(self, *args, **options):
+        bundles = AssetBundles()
+        names = options['names'] or list(bundles.bundles)
+        if not names:
+            raise CommandError('No ASSET_BUNDLES are configured.')
+        for name in names:
+            for path in bundles.build(name):
+                self.stdout.write(f'{name}: {path} ({path.stat().st_size / 1024:.1f} KiB)')
+        self.stdout.write(self.style.SUCCESS(f'Built {len(names)} bundles.'))
@@ -0,0 +1,70 @@
+import csv
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+# -----------------------
+
+from ...models import Post
+
+# -----------------------
+
+FIELDS = ('title', 'briefing', 'text', 'picture', 'created_at', 'updated_at', 'author', 'category')
+
+# -----------------------
+
+class Command(BaseCommand):
+    help = 'Stream every post to JSONL or CSV in constant memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', nargs='?', default='-', help="Output file ('-' for stdout).")
+        parser.add_argument('--format', choices=('jsonl', 'csv'), help='Defaults to the output file extension, else jsonl.')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched per database round trip.')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        fmt = options['format'] or ('csv' if output.endswith('.csv') else 'jsonl')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive.')
+
+        rows = Post.objects.order_by('pk').values_list(
+            'title', 'briefing', 'text', 'picture', 'created_at', 'updated_at',
+            'author__email', 'category__title',
+        ).iterator(chunk_size=options['chunk_size'])
+
+        stream = sys.stdout if output == '-' else open(output, 'w', newline='', encoding='utf-8')
+        started = time.monotonic()
+        try:
+            count = self.write_csv(stream, rows) if fmt == 'csv' else self.write_jsonl(stream, rows)
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stderr.write(f'Exported {count} posts in {elapsed:.1f}s ({count / elapsed:.0f} rows/s).')
+
+    def serialize(self, row):
+        record = dict(zip(FIELDS, row))
+        for field in ('created_at', 'updated_at'):
+            if record[field] is not None:
+                record[field] = record[field].isoformat()
+        return record
+
+    def write_jsonl(self, stream, rows):
+        count = 0
+        for row in rows:
+            stream.write(json.dumps(self.serialize(row), ensure_ascii=False))
+            stream.write('\n')
+            count += 1
+        return count
+
+    def write_csv(self, stream, rows):
+        writer = csv.DictWriter(stream, fieldnames=FIELDS)
+        writer.writeheader()
+        count = 0
+        for row in rows:
+            writer.writerow(self.serialize(row))
+            count += 1
+        return count
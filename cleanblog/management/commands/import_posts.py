@@ -0,0 +1,179 @@
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# -----------------------
+
+from ...models import Author, Category, Post
+from ...sitemaps import SitemapCache
+from ...utils.cache import ContentCache
+from ...utils.counts import PostCounts
+from ...utils.records import ObjectVersions
+
+# -----------------------
+
+class Command(BaseCommand):
+    help = (
+        'Import posts from JSONL or CSV (as written by export_posts) with batched '
+        'bulk inserts. Authors are matched by email and categories by title. Every record '
+        'is validated first; by default one invalid record aborts the whole import.'
+    )
+
+    required = ('title', 'briefing', 'text', 'picture', 'author', 'category')
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="Input file ('-' for stdin).")
+        parser.add_argument('--format', choices=('jsonl', 'csv'), help='Defaults to the input file extension, else jsonl.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Posts per INSERT.')
+        parser.add_argument('--create-categories', action='store_true', help='Create categories that do not exist yet.')
+        parser.add_argument(
+            '--skip-invalid', action='store_true',
+            help='Report and skip invalid records, committing each batch, instead of importing nothing.',
+        )
+
+    def handle(self, *args, **options):
+        source = options['input']
+        fmt = options['format'] or ('csv' if source.endswith('.csv') else 'jsonl')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        # Resolved once up front, so rows never trigger per-row lookups.
+        self.authors = dict(Author.objects.values_list('email', 'id'))
+        self.categories = dict(Category.objects.values_list('title', 'id'))
+        self.create_categories = options['create_categories']
+        self.skip_invalid = options['skip_invalid']
+        self.invalid = 0
+
+        stream = sys.stdin if source == '-' else open(source, newline='', encoding='utf-8')
+        self.started = time.monotonic()
+        try:
+            records = self.read_csv(stream) if fmt == 'csv' else self.read_jsonl(stream)
+            posts = self.build_posts(records)
+            if self.skip_invalid:
+                imported = self.insert(posts, batch_size)
+            else:
+                # All or nothing: an invalid record rolls back every batch and category created so far.
+                with transaction.atomic():
+                    imported = self.insert(posts, batch_size)
+                    if self.invalid:
+                        raise CommandError(f'{self.invalid} invalid record(s); nothing was imported.')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        # bulk_create sends no post_save signals.
+        PostCounts().rebuild()
+        ContentCache().bump()
+        ObjectVersions().bump_all(Post)
+        SitemapCache().invalidate_all()
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} posts in {elapsed:.1f}s ({imported / elapsed:.0f} rows/s); skipped {self.invalid}.'
+        ))
+
+    # -----------------------
+
+    def insert(self, posts, batch_size):
+        imported = 0
+        while True:
+            batch = list(islice(posts, batch_size))
+            if not batch:
+                return imported
+            if self.invalid and not self.skip_invalid:
+                # Aborting anyway; keep reading only to report every invalid record.
+                continue
+            with transaction.atomic():
+                Post.objects.bulk_create(batch, batch_size=batch_size)
+            imported += len(batch)
+            elapsed = max(time.monotonic() - self.started, 1e-9)
+            self.stderr.write(f'{imported} posts ({imported / elapsed:.0f} rows/s)')
+
+    def report(self, number, messages):
+        self.invalid += 1
+        self.stderr.write(f"Line {number}: {' '.join(messages)}")
+
+    # -----------------------
+
+    def read_jsonl(self, stream):
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                self.report(number, [f'invalid JSON ({error}).'])
+                continue
+            if not isinstance(record, dict):
+                self.report(number, ['expected a JSON object.'])
+                continue
+            yield number, record
+
+    def read_csv(self, stream):
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+
+    def build_posts(self, records):
+        for number, record in records:
+            try:
+                post = self.build_post(record)
+                # The owners were already checked against the preloaded ids.
+                post.full_clean(exclude=['author', 'category'])
+            except ValidationError as error:
+                self.report(number, error.messages)
+                continue
+            # bulk_create skips Post.save(), which renders the Markdown body.
+            post.render_text()
+            yield post
+
+    def build_post(self, record):
+        missing = [name for name in self.required if not record.get(name)]
+        if missing:
+            raise ValidationError(f"Missing {', '.join(missing)}.")
+        author_id = self.authors.get(record['author'])
+        if author_id is None:
+            raise ValidationError(f"Unknown author {record['author']!r}.")
+        category_id = self.resolve_category(record['category'])
+        if category_id is None:
+            raise ValidationError(f"Unknown category {record['category']!r} (see --create-categories).")
+        return Post(
+            author_id=author_id,
+            category_id=category_id,
+            title=record['title'],
+            briefing=record['briefing'],
+            text=record['text'],
+            picture=record['picture'],
+            created_at=self.parse_date(record, 'created_at') or timezone.now(),
+            updated_at=self.parse_date(record, 'updated_at'),
+        )
+
+    def resolve_category(self, title):
+        if not title:
+            return None
+        if title not in self.categories and self.create_categories:
+            self.categories[title] = Category.objects.get_or_create(title=title)[0].pk
+        return self.categories.get(title)
+
+    def parse_date(self, record, name):
+        value = record.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_datetime(value)
+        except (TypeError, ValueError):
+            parsed = None
+        if parsed is None:
+            raise ValidationError(f'{name} must be an ISO 8601 datetime.')
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+# -----------------------
+
+from ...utils.cache import ContentCache
+from ...utils.counts import PostCounts
+
+# -----------------------
+
+class Command(BaseCommand):
+    help = 'Recompute the post_count of every author and category from the post table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        with transaction.atomic(using=options['database']):
+            PostCounts().rebuild(using=options['database'])
+        ContentCache().bump()
+        self.stdout.write(self.style.SUCCESS('Post counts rebuilt.'))
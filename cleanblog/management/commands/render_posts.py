@@ -0,0 +1,77 @@
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+# -----------------------
+
+from ...models import Post
+from ...utils.cache import ContentCache
+from ...utils.records import ObjectVersions
+from ...utils.rendering import render_batch
+
+# -----------------------
+
+class Command(BaseCommand):
+    help = (
+        'Re-render the Markdown body of every post into text_html, excerpt and reading_time. '
+        'Run it after changing PostRenderer; rendering is spread over worker processes and '
+        'the results are written back in batches by this process.'
+    )
+
+    fields = ('text_html', 'excerpt', 'reading_time')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Rendering processes (1 renders inline).')
+        parser.add_argument('--batch-size', type=int, default=500, help='Posts per rendering task and UPDATE batch.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--workers and --batch-size must be positive.')
+        self.using = options['database']
+        self.rendered = 0
+        batches = self.batches(options['batch_size'])
+
+        if options['workers'] == 1:
+            for rows in batches:
+                self.write(render_batch(rows))
+        else:
+            # Forked workers must not inherit the open database connection.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+                pending = set()
+                for rows in batches:
+                    pending.add(executor.submit(render_batch, rows))
+                    # Bound the work in flight so memory stays flat on large tables.
+                    if len(pending) >= options['workers'] * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            self.write(future.result())
+                for future in pending:
+                    self.write(future.result())
+
+        ContentCache().bump()
+        ObjectVersions().bump_all(Post)
+        self.stdout.write(self.style.SUCCESS(f'{self.rendered} posts rendered.'))
+
+    def batches(self, size):
+        # Keyset pagination: each batch is a short, independent read.
+        queryset = Post.objects.using(self.using).order_by('pk')
+        last = 0
+        while True:
+            rows = list(queryset.filter(pk__gt=last).values_list('id', 'text')[:size])
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield rows
+
+    def write(self, results):
+        posts = [
+            Post(pk=pk, text_html=html, excerpt=excerpt, reading_time=reading_time)
+            for pk, html, excerpt, reading_time in results
+        ]
+        with transaction.atomic(using=self.using):
+            Post.objects.using(self.using).bulk_update(posts, self.fields)
+        self.rendered += len(posts)
+        self.stderr.write(f'{self.rendered} posts rendered.')
@@ -0,0 +1,58 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+# -----------------------
+
+from ...jobs import Worker
+
+# -----------------------
+
+def work(threads, poll_interval, burst):
+    worker = Worker(threads=threads, poll_interval=poll_interval)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.work(burst=burst)
+
+# -----------------------
+
+class Command(BaseCommand):
+    help = (
+        'Run background jobs from the database queue. Each process polls for due jobs '
+        'and runs them on its own thread pool; SIGTERM/SIGINT finish the running jobs and exit.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Worker processes (CPU-bound jobs).')
+        parser.add_argument('--threads', type=int, default=4, help='Jobs run concurrently per process (I/O-bound jobs).')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds between polls of an idle queue.')
+        parser.add_argument('--burst', action='store_true', help='Exit once no job is due instead of waiting for more.')
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1 or options['threads'] < 1:
+            raise CommandError('--processes and --threads must be positive.')
+        arguments = (options['threads'], options['poll_interval'], options['burst'])
+        self.stdout.write(f"Running {options['processes']} worker process(es) with {options['threads']} thread(s) each.")
+
+        if options['processes'] == 1:
+            work(*arguments)
+        else:
+            # Forked children must open their own database connections.
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            children = [context.Process(target=work, args=arguments, daemon=False) for _ in range(options['processes'])]
+            for child in children:
+                child.start()
+
+            def stop(*args):
+                for child in children:
+                    if child.is_alive():
+                        child.terminate()
+
+            signal.signal(signal.SIGTERM, stop)
+            signal.signal(signal.SIGINT, stop)
+            for child in children:
+                child.join()
+        self.stdout.write(self.style.SUCCESS('Workers stopped.'))
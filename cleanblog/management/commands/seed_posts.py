@@ -0,0 +1,124 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+# -----------------------
+
+from ...models import Author, Category, Post
+from ...sitemaps import SitemapCache
+from ...utils.cache import ContentCache
+from ...utils.counts import PostCounts
+from ...utils.records import ObjectVersions
+
+# -----------------------
+
+USERNAME_PREFIX = 'bench-author-'
+CATEGORY_PREFIX = 'Bench category '
+
+WORDS = (
+    'django', 'python', 'sqlite', 'cache', 'query', 'index', 'server', 'request',
+    'template', 'session', 'stream', 'search', 'design', 'travel', 'science', 'music',
+    'garden', 'history', 'coffee', 'kitchen', 'winter', 'summer', 'ocean', 'mountain',
+    'planet', 'rocket', 'camera', 'letter', 'market', 'bridge', 'forest', 'signal',
+)
+
+# -----------------------
+
+class Command(BaseCommand):
+    help = (
+        'Seed a synthetic dataset for benchmarks: bench authors and categories are '
+        'created up to the requested counts, then posts are appended with batched bulk inserts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000, help='Posts to add (1k to 1M is typical).')
+        parser.add_argument('--authors', type=int, default=50, help='Bench authors to ensure exist.')
+        parser.add_argument('--categories', type=int, default=20, help='Bench categories to ensure exist.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Posts inserted per transaction.')
+        parser.add_argument('--password', default='benchmark', help='Password of the bench authors.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for reproducible datasets.')
+
+    def handle(self, *args, **options):
+        for name in ('posts', 'authors', 'categories', 'batch_size'):
+            if options[name] < 1:
+                raise CommandError(f'--{name.replace("_", "-")} must be positive.')
+        self.random = random.Random(options['seed'])
+        started = time.monotonic()
+
+        authors = self.ensure_authors(options['authors'], options['password'])
+        categories = self.ensure_categories(options['categories'])
+        self.stdout.write(f'{len(authors)} authors, {len(categories)} categories.')
+
+        total = options['posts']
+        batch_size = options['batch_size']
+        now = timezone.now()
+        created = 0
+        while created < total:
+            count = min(batch_size, total - created)
+            batch = [self.build_post(authors, categories, now) for _ in range(count)]
+            with transaction.atomic():
+                Post.objects.bulk_create(batch, batch_size=batch_size)
+            created += count
+            elapsed = max(time.monotonic() - started, 1e-9)
+            self.stderr.write(f'{created} posts ({created / elapsed:.0f} rows/s)')
+
+        # bulk_create sends no post_save signals.
+        PostCounts().rebuild()
+        ContentCache().bump()
+        ObjectVersions().bump_all(Post)
+        SitemapCache().invalidate_all()
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(self.style.SUCCESS(f'Seeded {created} posts in {elapsed:.1f}s.'))
+
+    # -----------------------
+
+    def ensure_authors(self, count, password):
+        usernames = [f'{USERNAME_PREFIX}{i}' for i in range(count)]
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        missing = [username for username in usernames if username not in existing]
+        if missing:
+            # Hashed once: every bench user shares the same password.
+            hashed = make_password(password)
+            with transaction.atomic():
+                User.objects.bulk_create([User(username=username, password=hashed) for username in missing])
+                users = User.objects.filter(username__in=missing).values_list('id', 'username')
+                Author.objects.bulk_create([
+                    Author(
+                        user_id=user_id,
+                        name=f'Bench Author {username.removeprefix(USERNAME_PREFIX)}',
+                        email=f'{username}@example.com',
+                        occupation='Benchmark writer',
+                        description='Synthetic author created by seed_posts.',
+                        picture='authors/bench.png',
+                    )
+                    for user_id, username in users
+                ])
+        return list(Author.objects.filter(user__username__in=usernames).values_list('id', flat=True))
+
+    def ensure_categories(self, count):
+        titles = [f'{CATEGORY_PREFIX}{i}' for i in range(count)]
+        Category.objects.bulk_create([Category(title=title) for title in titles], ignore_conflicts=True)
+        return list(Category.objects.filter(title__in=titles).values_list('id', flat=True))
+
+    def sentence(self, words):
+        return ' '.join(self.random.choice(WORDS) for _ in range(words))
+
+    def build_post(self, authors, categories, now):
+        created_at = now - timedelta(seconds=self.random.randrange(365 * 24 * 3600))
+        post = Post(
+            author_id=self.random.choice(authors),
+            category_id=self.random.choice(categories),
+            title=self.sentence(3).capitalize()[:45],
+            briefing=self.sentence(8).capitalize()[:100],
+            text=self.sentence(self.random.randint(40, 300)).capitalize(),
+            picture='posts/bench.png',
+            created_at=created_at,
+        )
+        post.render_text()
+        return post
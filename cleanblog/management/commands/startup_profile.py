@@ -0,0 +1,118 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# -----------------------
+
+# "import time:  self [us] | cumulative | imported package", nesting shown by indentation.
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+# Runs in a fresh interpreter: boots the application the way a server worker
+# does, optionally warms up, then times requests through the WSGI callable.
+CHILD = r'''
+import io, json, sys, time
+from importlib import import_module
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+module_name, attribute = sys.argv[1].rsplit('.', 1)
+application = getattr(import_module(module_name), attribute)
+report = {'boot_s': time.perf_counter() - started, 'warmup': None, 'requests': []}
+
+if sys.argv[2] == '1':
+    from cleanblog.warmup import warm_up
+    report['warmup'] = warm_up()
+
+for path in sys.argv[3:]:
+    environ = {'PATH_INFO': path, 'wsgi.errors': io.StringIO()}
+    setup_testing_defaults(environ)
+    status = []
+    started = time.perf_counter()
+    body = b''.join(application(environ, lambda code, headers, exc_info=None: status.append(code)))
+    report['requests'].append([path, status[0], (time.perf_counter() - started) * 1000])
+
+sys.stdout.write(json.dumps(report))
+'''
+
+# -----------------------
+
+class Command(BaseCommand):
+    help = (
+        'Boot the WSGI application in a fresh interpreter under -X importtime and report '
+        'the slowest imports, boot time and first-request latency (with or without warmup).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25, help='Modules listed.')
+        parser.add_argument('--sort', choices=('self', 'cumulative'), default='cumulative')
+        parser.add_argument('--warmup', action='store_true', help='Run cleanblog.warmup before the requests.')
+        parser.add_argument('--path', action='append', dest='paths', help="URL requested after boot (repeatable; default '/' twice).")
+        parser.add_argument('--json', action='store_true', help='Print the full report as JSON.')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or ['/', '/']
+        environment = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'pjcleanblog.settings')}
+        # Measure this process's configuration, not the warmup environment flag.
+        environment['WARMUP_ON_START'] = '0'
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', CHILD, settings.WSGI_APPLICATION, '1' if options['warmup'] else '0', *paths],
+            capture_output=True, text=True, env=environment, cwd=settings.BASE_DIR,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Application failed to boot:\n{result.stderr[-4000:]}')
+
+        imports = self.parse_imports(result.stderr)
+        report = json.loads(result.stdout)
+        report['imports'] = sorted(imports, key=lambda row: row[options['sort']], reverse=True)
+        report['packages'] = self.by_package(imports)
+
+        if options['json']:
+            report['imports'] = report['imports'][:options['limit']]
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.write_report(report, options['limit'], options['sort'])
+
+    # -----------------------
+
+    def parse_imports(self, stderr):
+        rows = []
+        for line in stderr.splitlines():
+            match = IMPORT_LINE.match(line)
+            if match:
+                own, cumulative, indent, module = match.groups()
+                rows.append({
+                    'module': module,
+                    'self': int(own) / 1000,
+                    'cumulative': int(cumulative) / 1000,
+                    'depth': len(indent) // 2,
+                })
+        return rows
+
+    def by_package(self, imports):
+        """Self time in milliseconds per top-level package, largest first."""
+        totals = defaultdict(float)
+        for row in imports:
+            totals[row['module'].split('.')[0]] += row['self']
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def write_report(self, report, limit, sort):
+        total = sum(row['self'] for row in report['imports'])
+        self.stdout.write(f"Boot: {report['boot_s'] * 1000:.0f}ms ({len(report['imports'])} modules, {total:.0f}ms importing)")
+        self.stdout.write(f'\nSlowest imports by {sort} time (ms):')
+        self.stdout.write(f"{'self':>9} {'cumulative':>11}  module")
+        for row in report['imports'][:limit]:
+            self.stdout.write(f"{row['self']:9.1f} {row['cumulative']:11.1f}  {row['module']}")
+        self.stdout.write('\nSelf time by package (ms):')
+        for package, milliseconds in list(report['packages'].items())[:10]:
+            self.stdout.write(f'{milliseconds:9.1f}  {package}')
+        if report['warmup'] is not None:
+            self.stdout.write('\nWarmup (ms): ' + ', '.join(f'{name} {seconds * 1000:.1f}' for name, seconds in report['warmup']))
+        self.stdout.write('\nRequests after boot:')
+        for path, status, milliseconds in report['requests']:
+            self.stdout.write(f'{milliseconds:9.1f}ms  {status}  {path}')
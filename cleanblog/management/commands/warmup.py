@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+# -----------------------
+
+from ...warmup import warm_up
+
+# -----------------------
+
+class Command(BaseCommand):
+    help = (
+        'Run the worker warmup (URL resolvers, template compilation, database connections, '
+        'reference-data caches) and report the time of each step.'
+    )
+
+    def handle(self, *args, **options):
+        timings = warm_up()
+        for name, seconds in timings:
+            self.stdout.write(f'{name:>10}: {seconds * 1000:.1f}ms')
+        self.stdout.write(self.style.SUCCESS(f'Warmed up in {sum(seconds for _, seconds in timings) * 1000:.1f}ms.'))
@@ -0,0 +1,228 @@
+import ipaddress
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.template.backends.django import DjangoTemplates, Template
+from django.utils.crypto import constant_time_compare
+
+# -----------------------
+
+from .utils.http import client_ip
+
+# -----------------------
+
+logger = logging.getLogger('cleanblog.slow_requests')
+
+# Statistics of the request being handled. sync_to_async() copies the context
+# into its worker thread, so queries run there add to the same object.
+current_request = ContextVar('cleanblog_current_request', default=None)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# -----------------------
+
+class RequestStats:
+    """Per-request totals filled in by the query, template and session hooks."""
+
+    __slots__ = ('queries', 'query_time', 'template_time', 'session_time', 'statements')
+
+    max_statements = 100
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+        self.session_time = 0.0
+        self.statements = []
+
+# -----------------------
+
+class MetricsRegistry:
+    """
+    In-process counters and histograms, rendered in the Prometheus text format.
+
+    Each worker process keeps its own registry; scrape every worker (or sum
+    them in Prometheus) when running several.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.help = {}
+
+    def describe(self, name, kind, text):
+        self.help[name] = (kind, text)
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, tuple(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=(), buckets=LATENCY_BUCKETS):
+        key = (name, tuple(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [buckets, [0] * len(buckets), 0.0, 0]
+            counts = histogram[1]
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            histogram[2] += value
+            histogram[3] += 1
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    # -----------------------
+
+    def format_labels(self, labels, extra=()):
+        pairs = [*labels, *extra]
+        if not pairs:
+            return ''
+        escaped = []
+        for name, value in pairs:
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            escaped.append(f'{name}="{value}"')
+        return '{' + ','.join(escaped) + '}'
+
+    def render(self):
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {key: (h[0], list(h[1]), h[2], h[3]) for key, h in self.histograms.items()}
+
+        lines = []
+        described = set()
+        for (name, labels), value in sorted(counters.items()):
+            if name not in described and name in self.help:
+                kind, text = self.help[name]
+                lines += [f'# HELP {name} {text}', f'# TYPE {name} {kind}']
+                described.add(name)
+            lines.append(f'{name}{self.format_labels(labels)} {value}')
+        for (name, labels), (buckets, counts, total, count) in sorted(histograms.items()):
+            if name not in described and name in self.help:
+                kind, text = self.help[name]
+                lines += [f'# HELP {name} {text}', f'# TYPE {name} {kind}']
+                described.add(name)
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{self.format_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_bucket{self.format_labels(labels, [("le", "+Inf")])} {count}')
+            lines.append(f'{name}_sum{self.format_labels(labels)} {total}')
+            lines.append(f'{name}_count{self.format_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+registry.describe('cleanblog_requests_total', 'counter', 'Requests by view, method and status code.')
+registry.describe('cleanblog_request_duration_seconds', 'histogram', 'Time until the response is returned, by view.')
+registry.describe('cleanblog_sql_queries_per_request', 'histogram', 'SQL queries issued per request, by view.')
+registry.describe('cleanblog_sql_duration_seconds_total', 'counter', 'Time spent executing SQL, by view.')
+registry.describe('cleanblog_template_render_seconds', 'histogram', 'Template render time per request, by view.')
+registry.describe('cleanblog_session_seconds', 'histogram', 'Session backend time, by operation.')
+
+# -----------------------
+
+def record_query(execute, sql, params, many, context):
+    """Connection execute wrapper, installed on every connection when instrumentation is on."""
+    stats = current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        stats.queries += 1
+        stats.query_time += elapsed
+        if len(stats.statements) < stats.max_statements:
+            stats.statements.append((context['connection'].alias, sql, elapsed))
+
+
+def record_session(operation, elapsed):
+    stats = current_request.get()
+    if stats is not None:
+        stats.session_time += elapsed
+    registry.observe('cleanblog_session_seconds', elapsed, [('operation', operation)])
+
+# -----------------------
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = current_request.get()
+        if stats is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_time += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Django template backend that adds top-level render times to the request's stats."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+# -----------------------
+
+def finish_request(request, response, stats, elapsed):
+    match = getattr(request, 'resolver_match', None)
+    view = match.view_name if match else 'unresolved'
+    status = getattr(response, 'status_code', 500)
+    labels = [('view', view)]
+
+    registry.inc('cleanblog_requests_total', [('view', view), ('method', request.method), ('status', status)])
+    registry.observe('cleanblog_request_duration_seconds', elapsed, labels)
+    registry.observe('cleanblog_sql_queries_per_request', stats.queries, labels, buckets=QUERY_BUCKETS)
+    registry.inc('cleanblog_sql_duration_seconds_total', labels, stats.query_time)
+    registry.observe('cleanblog_template_render_seconds', stats.template_time, labels)
+
+    threshold = getattr(settings, 'INSTRUMENTATION_SLOW_REQUEST_MS', 500) / 1000
+    if elapsed >= threshold:
+        lines = [
+            f'Slow request {request.method} {request.get_full_path()} ({view}) {status} in {elapsed * 1000:.0f}ms: '
+            f'{stats.queries} queries ({stats.query_time * 1000:.0f}ms), '
+            f'templates {stats.template_time * 1000:.0f}ms, session {stats.session_time * 1000:.0f}ms'
+        ]
+        lines += [f'  [{alias}] {duration * 1000:.1f}ms {sql}' for alias, sql, duration in stats.statements]
+        logger.warning('\n'.join(lines))
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint.
+
+    With ``INSTRUMENTATION_TOKEN`` set, scrapers must send it as a bearer
+    token; otherwise only clients in ``INSTRUMENTATION_ALLOWED_IPS`` are
+    answered, resolved through ``TRUSTED_PROXIES`` so the proxy's own
+    address does not open it to everyone.
+    """
+    token = getattr(settings, 'INSTRUMENTATION_TOKEN', '')
+    if token:
+        scheme, _, credentials = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+        if scheme.lower() != 'bearer' or not constant_time_compare(credentials.strip(), token):
+            raise Http404()
+    else:
+        allowed = getattr(settings, 'INSTRUMENTATION_ALLOWED_IPS', ('127.0.0.1/32', '::1/128'))
+        try:
+            address = ipaddress.ip_address(client_ip(request))
+        except ValueError:
+            raise Http404()
+        if not any(address in ipaddress.ip_network(network) for network in allowed):
+            raise Http404()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
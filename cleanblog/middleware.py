@@ -0,0 +1,95 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+
+# -----------------------
+
+from .metrics import RequestStats, current_request, finish_request
+from .models import Author
+
+# -----------------------
+
+def get_author(request):
+    if not hasattr(request, '_cached_author'):
+        author = None
+        if request.user.is_authenticated:
+            try:
+                author = request.user.author
+            except Author.DoesNotExist:
+                author = None
+        request._cached_author = author
+    return request._cached_author
+
+# -----------------------
+
+class AuthorMiddleware:
+    """
+    Expose the current user's Author as ``request.author``.
+
+    It is resolved lazily, at most once per request, and comes for free when
+    the user was loaded by ``AuthorModelBackend``. Anonymous users and users
+    without an Author get a falsy ``request.author``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        request.author = SimpleLazyObject(lambda: get_author(request))
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+# -----------------------
+
+class InstrumentationMiddleware:
+    """
+    Record latency, SQL, template and session timings per URL name.
+
+    Enabled with ``INSTRUMENTATION=1``, which puts it first in ``MIDDLEWARE``.
+    Totals are aggregated by ``cleanblog.metrics.registry`` and requests slower
+    than ``INSTRUMENTATION_SLOW_REQUEST_MS`` are logged with their SQL.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        response = None
+        try:
+            response = self.get_response(request)
+            return response
+        finally:
+            finish_request(request, response, stats, time.perf_counter() - started)
+            current_request.reset(token)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        response = None
+        try:
+            response = await self.get_response(request)
+            return response
+        finally:
+            finish_request(request, response, stats, time.perf_counter() - started)
+            current_request.reset(token)
@@ -0,0 +1,65 @@
+from django.db import migrations
+
+# The DDL is frozen here rather than read from utils.search.PostSearch, so
+# later changes to the search code cannot change what this migration does.
+
+CREATE_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5("
+    "title, briefing, text, content='post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+
+CREATE_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS post_fts_ai AFTER INSERT ON post BEGIN "
+    "INSERT INTO post_fts(rowid, title, briefing, text) VALUES (new.id, new.title, new.briefing, new.text); END",
+
+    "CREATE TRIGGER IF NOT EXISTS post_fts_ad AFTER DELETE ON post BEGIN "
+    "INSERT INTO post_fts(post_fts, rowid, title, briefing, text) "
+    "VALUES ('delete', old.id, old.title, old.briefing, old.text); END",
+
+    "CREATE TRIGGER IF NOT EXISTS post_fts_au AFTER UPDATE OF title, briefing, text ON post BEGIN "
+    "INSERT INTO post_fts(post_fts, rowid, title, briefing, text) "
+    "VALUES ('delete', old.id, old.title, old.briefing, old.text); "
+    "INSERT INTO post_fts(rowid, title, briefing, text) VALUES (new.id, new.title, new.briefing, new.text); END",
+)
+
+REBUILD = "INSERT INTO post_fts(post_fts) VALUES ('rebuild')"
+
+DROP = (
+    "DROP TRIGGER IF EXISTS post_fts_ai",
+    "DROP TRIGGER IF EXISTS post_fts_ad",
+    "DROP TRIGGER IF EXISTS post_fts_au",
+    "DROP TABLE IF EXISTS post_fts",
+)
+
+
+def install_post_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(CREATE_TABLE)
+        except Exception:
+            # SQLite compiled without FTS5: searches use the fallback.
+            return
+        for statement in (*CREATE_TRIGGERS, REBUILD):
+            cursor.execute(statement)
+
+
+def uninstall_post_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in DROP:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cleanblog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_post_fts, uninstall_post_fts),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cleanblog', '0002_post_fts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-created_at', '-id'], name='idx_post_created_at_id'),
+        ),
+    ]
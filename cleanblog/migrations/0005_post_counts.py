@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# The recount is frozen here rather than read from utils.counts.PostCounts, so
+# later changes to the counters cannot change what this migration does.
+
+
+def rebuild_post_counts(apps, schema_editor):
+    using = schema_editor.connection.alias
+    post = apps.get_model('cleanblog', 'Post')
+    for field, model_name in (('author_id', 'Author'), ('category_id', 'Category')):
+        model = apps.get_model('cleanblog', model_name)
+        counts = (
+            post.objects.using(using).filter(**{field: OuterRef('pk')})
+            .order_by().values(field).annotate(total=Count('pk')).values('total')
+        )
+        model.objects.using(using).update(post_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cleanblog', '0004_picture_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='author',
+            field=models.ForeignKey(db_index=False, error_messages={'null': 'Author is required to create a post.'}, on_delete=django.db.models.deletion.CASCADE, to='cleanblog.author'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='category',
+            field=models.ForeignKey(db_index=False, error_messages={'null': 'Category is required to create a post.'}, on_delete=django.db.models.deletion.CASCADE, to='cleanblog.category'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='idx_post_author_created_at'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='idx_post_category_created_at'),
+        ),
+        migrations.RunPython(rebuild_post_counts, migrations.RunPython.noop),
+    ]
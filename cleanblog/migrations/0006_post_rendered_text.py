@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:57
+
+import math
+import re
+from html import unescape
+from urllib.parse import urlsplit
+
+import django.core.validators
+from django.db import migrations, models
+
+# The renderer is frozen here rather than read from utils.rendering, so later
+# changes to it cannot change what this migration does; run
+# ``manage.py render_posts`` to bring posts up to the current renderer.
+
+ALLOWED_SCHEMES = ('', 'http', 'https', 'mailto')
+URL_IGNORED = re.compile(r'[\x00-\x20\x7f]+')
+TAGS = re.compile(r'<[^>]+>')
+EXCERPT_LENGTH = 280
+WORDS_PER_MINUTE = 200
+
+
+class SafeLinks:
+
+    def run(self, root):
+        for element in root.iter():
+            for attribute in ('href', 'src'):
+                value = element.get(attribute)
+                if value is None:
+                    continue
+                try:
+                    url = urlsplit(URL_IGNORED.sub('', unescape(value)).replace('\\', '/'))
+                except ValueError:
+                    url = None
+                if url is None or url.scheme.lower() not in ALLOWED_SCHEMES:
+                    del element.attrib[attribute]
+                elif attribute == 'href' and url.netloc:
+                    element.set('rel', 'nofollow noopener')
+
+
+def render(md, text):
+    html = md.reset().convert(text or '')
+    plain = ' '.join(unescape(TAGS.sub(' ', html)).split())
+    excerpt = plain
+    if len(plain) > EXCERPT_LENGTH:
+        excerpt = f"{plain[:EXCERPT_LENGTH].rsplit(' ', 1)[0]}…"
+    return html, excerpt, max(1, math.ceil(len(plain.split()) / WORDS_PER_MINUTE))
+
+
+def render_posts(apps, schema_editor):
+    import markdown
+
+    md = markdown.Markdown(extensions=['fenced_code', 'tables', 'sane_lists'], output_format='html')
+    md.preprocessors.deregister('html_block')
+    md.inlinePatterns.deregister('html')
+    md.treeprocessors.register(SafeLinks(), 'safe_links', 5)
+
+    Post = apps.get_model('cleanblog', 'Post')
+    manager = Post.objects.using(schema_editor.connection.alias)
+    last = 0
+    while True:
+        rows = list(manager.filter(id__gt=last).order_by('id').values_list('id', 'text')[:500])
+        if not rows:
+            break
+        last = rows[-1][0]
+        posts = []
+        for pk, text in rows:
+            html, excerpt, reading_time = render(md, text)
+            posts.append(Post(id=pk, text_html=html, excerpt=excerpt, reading_time=reading_time))
+        manager.bulk_update(posts, ['text_html', 'excerpt', 'reading_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cleanblog', '0005_post_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', editable=False, max_length=300),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, verbose_name='Reading time (minutes)'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='text',
+            field=models.TextField(error_messages={'blank': 'Please enter the post text.', 'null': 'Text cannot be null.'}, validators=[django.core.validators.MinLengthValidator(100, message='Text must be at least 100 characters long.'), django.core.validators.MaxLengthValidator(50000, message='Text cannot exceed 50000 characters.')]),
+        ),
+        migrations.RunPython(render_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:42
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cleanblog', '0008_post_picture_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='job',
+            options={'managed': True, 'ordering': ['-id'], 'verbose_name': 'Job', 'verbose_name_plural': 'Jobs'},
+        ),
+        migrations.AlterModelTable(
+            name='job',
+            table='job',
+        ),
+    ]
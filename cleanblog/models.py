@@ -1,12 +1,17 @@
 from django.contrib.auth.models import User
-from django.core.validators import MinLengthValidator, EmailValidator
-from django.db import models
+from django.core.validators import MinLengthValidator, MaxLengthValidator, EmailValidator
+from django.db import models, router, transaction
 from django.db.models import Q, F
 from django.db.models.constraints import UniqueConstraint, CheckConstraint
 from django.utils import timezone
 
 # --------------------------------------------------------------------
 
+from .utils.counts import PostCounts
+from .utils.rendering import PostRenderer
+
+# --------------------------------------------------------------------
+
 class Author(models.Model):
     user = models.OneToOneField(
         User, 
@@ -77,6 +82,12 @@ class Author(models.Model):
         }
     )
 
+    # Resized copies of ``picture``, filled in by utils.images.ImageVariants.
+    picture_variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    # Maintained by utils.counts.PostCounts.
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         ordering = ['name']
         db_table = 'author'
@@ -109,6 +120,9 @@ class Category(models.Model):
         }
     )
 
+    # Maintained by utils.counts.PostCounts.
+    post_count = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         ordering = ['title']
         db_table = 'category'
@@ -129,16 +143,32 @@ class Category(models.Model):
 
 # -----------------------
 
+class PostQuerySet(models.QuerySet):
+    # Columns rendered by post listings; the wide ``text`` and ``picture``
+    # columns are left out.
+    summary_fields = (
+        'id', 'title', 'briefing', 'created_at', 'updated_at',
+        'author__id', 'author__name',
+    )
+
+    def summary(self):
+        return self.select_related('author').only(*self.summary_fields)
+
+# -----------------------
+
 class Post(models.Model):
+    # Indexed by the (author|category, -created_at, -id) indexes below.
     author = models.ForeignKey(
         Author, 
         on_delete=models.CASCADE,
+        db_index=False,
         error_messages={'null': 'Author is required to create a post.'}
     )
 
     category = models.ForeignKey(
         Category, 
         on_delete=models.CASCADE,
+        db_index=False,
         error_messages={'null': 'Category is required to create a post.'}
     )
 
@@ -166,18 +196,25 @@ class Post(models.Model):
         }
     )
 
-    text = models.CharField(
-        max_length=3000, 
+    # Markdown source; rendered into ``text_html`` on save.
+    text = models.TextField(
         blank=False, 
         null=False,
-        validators=[MinLengthValidator(100, message="Text must be at least 100 characters long.")],
+        validators=[
+            MinLengthValidator(100, message="Text must be at least 100 characters long."),
+            MaxLengthValidator(50000, message="Text cannot exceed 50000 characters."),
+        ],
         error_messages={
             'blank': 'Please enter the post text.',
             'null': 'Text cannot be null.',
-            'max_length': 'Text cannot exceed 3000 characters.',
         }
     )
 
+    # Sanitized HTML, excerpt and reading time, filled in by utils.rendering.PostRenderer.
+    text_html = models.TextField(blank=True, default='', editable=False)
+    excerpt = models.CharField(max_length=300, blank=True, default='', editable=False)
+    reading_time = models.PositiveSmallIntegerField('Reading time (minutes)', default=1, editable=False)
+
     picture = models.ImageField(
         upload_to='posts', 
         blank=False, 
@@ -188,6 +225,9 @@ class Post(models.Model):
         }
     )
 
+    # Resized copies of ``picture``, filled in by utils.images.ImageVariants.
+    picture_variants = models.JSONField(default=dict, blank=True, editable=False)
+
     created_at = models.DateTimeField(
         blank=False, 
         null=False, 
@@ -201,12 +241,21 @@ class Post(models.Model):
         error_messages={'null': 'Update date cannot be null.'}
     )
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         db_table = 'post'
         managed = True
         verbose_name = 'Post'
         verbose_name_plural = 'Posts'
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='idx_post_created_at_id'),
+            models.Index(fields=['author', '-created_at', '-id'], name='idx_post_author_created_at'),
+            models.Index(fields=['category', '-created_at', '-id'], name='idx_post_category_created_at'),
+            # Bulk deletes check whether a picture file is still used by another post.
+            models.Index(fields=['picture'], name='idx_post_picture'),
+        ]
         constraints = [
             CheckConstraint(
                 check=Q(updated_at__isnull=True) | Q(updated_at__gte=F('created_at')),
@@ -216,4 +265,77 @@ class Post(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.title[0:15]}:{self.briefing[0:25]} | {self.text[0:50]}"
\ No newline at end of file
+        return f"{self.title[0:15]}:{self.briefing[0:25]} | {self.text[0:50]}"
+
+    def render_text(self):
+        self.text_html, self.excerpt, self.reading_time = PostRenderer().render(self.text)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_owners = (instance.__dict__.get('author_id'), instance.__dict__.get('category_id'))
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            self.render_text()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'text_html', 'excerpt', 'reading_time'}
+        # Post counts move in the same transaction as the row (deletes: see signals).
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            adding = self._state.adding
+            previous = None if adding else getattr(self, '_loaded_owners', (None, None))
+            if previous is not None and None in previous:
+                previous = Post.objects.using(using).filter(pk=self.pk).values_list('author_id', 'category_id').first()
+            super().save(*args, **kwargs)
+            current = (self.author_id, self.category_id)
+            if adding:
+                PostCounts().adjust(1, using, author_id=self.author_id, category_id=self.category_id)
+            elif previous is not None and previous != current:
+                PostCounts().move(previous, current, using)
+            self._loaded_owners = current
+
+# --------------------------------------------------------------------
+
+class Job(models.Model):
+    """A unit of background work, enqueued by ``cleanblog.jobs`` and run by ``manage.py run_workers``."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField('Task', max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField('Run at', default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField('Created at', default=timezone.now)
+    finished_at = models.DateTimeField('Finished at', null=True, blank=True)
+
+    class Meta:
+        ordering = ['-id']
+        db_table = 'job'
+        managed = True
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        indexes = [
+            # Workers poll for (status='queued', run_at <= now) in run_at order.
+            models.Index(fields=['status', 'run_at'], name='idx_job_status_run_at'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} [{self.status}]"
@@ -0,0 +1,32 @@
+from django.db import connections
+
+# -----------------------
+
+class ReadWriteRouter:
+    """
+    Send reads to the read-only ``replica`` connection and writes to ``default``.
+
+    Both aliases open the same SQLite file; in WAL mode readers never wait for
+    the writer. Reads issued inside a transaction on ``default`` stay there so
+    they see that transaction's own uncommitted writes.
+    """
+
+    read_alias = 'replica'
+    write_alias = 'default'
+
+    def db_for_read(self, model, **hints):
+        if connections[self.write_alias].in_atomic_block:
+            return self.write_alias
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db == self.write_alias:
+            return self.write_alias
+        return self.read_alias
+
+    def db_for_write(self, model, **hints):
+        return self.write_alias
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == self.write_alias
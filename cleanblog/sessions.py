@@ -0,0 +1,46 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+
+# -----------------------
+
+from .metrics import record_session
+
+# -----------------------
+
+# The engine actually storing sessions; this module only times it.
+base = import_module(getattr(settings, 'INSTRUMENTATION_SESSION_ENGINE', 'django.contrib.sessions.backends.db'))
+
+# -----------------------
+
+class SessionStore(base.SessionStore):
+    """Session engine that reports load and save times to ``cleanblog.metrics``."""
+
+    def load(self):
+        started = time.perf_counter()
+        try:
+            return super().load()
+        finally:
+            record_session('load', time.perf_counter() - started)
+
+    async def aload(self):
+        started = time.perf_counter()
+        try:
+            return await super().aload()
+        finally:
+            record_session('load', time.perf_counter() - started)
+
+    def save(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().save(*args, **kwargs)
+        finally:
+            record_session('save', time.perf_counter() - started)
+
+    async def asave(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await super().asave(*args, **kwargs)
+        finally:
+            record_session('save', time.perf_counter() - started)
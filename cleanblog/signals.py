@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+# -----------------------
+
+from .metrics import record_query
+from .models import Author, Category, Post
+from .sitemaps import SitemapCache
+from .tasks import generate_image_variants
+from .utils.cache import ContentCache
+from .utils.categories import CategoryCache
+from .utils.counts import PostCounts
+from .utils.images import ImageVariants
+from .utils.records import ObjectVersions
+from .utils.search import PostSearch
+
+# -----------------------
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_content_cache(sender, using, **kwargs):
+    content = ContentCache()
+    content.bump()
+    # Again once committed: a page rendered in between saw the old rows.
+    transaction.on_commit(content.bump, using=using)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_object_version(sender, instance, using, **kwargs):
+    versions = ObjectVersions()
+    versions.bump(sender, instance.pk)
+    # Again once committed: a reader may have cached the old row in between.
+    transaction.on_commit(lambda: versions.bump(sender, instance.pk), using=using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cache(sender, **kwargs):
+    CategoryCache().bump()
+
+
+@receiver(post_delete, sender=Post)
+def decrement_post_counts(sender, instance, using, **kwargs):
+    # Also covers queryset and cascade deletes, inside their transaction.
+    PostCounts().adjust(-1, using, author_id=instance.author_id, category_id=instance.category_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_sitemap(sender, instance, **kwargs):
+    SitemapCache().invalidate(instance.pk)
+
+# -----------------------
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Author)
+def schedule_image_variants(sender, instance, raw=False, **kwargs):
+    # Enqueued in the save's transaction; a worker picks it up once it commits.
+    if not raw and ImageVariants().is_stale(instance):
+        generate_image_variants.delay(instance._meta.label, instance.pk)
+
+# -----------------------
+
+def install_search_triggers(sender, using, **kwargs):
+    # Connected to post_migrate in CleanblogConfig.ready().
+    PostSearch().install_triggers(connections[using])
+
+# -----------------------
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    if settings.INSTRUMENTATION:
+        connection.execute_wrappers.append(record_query)
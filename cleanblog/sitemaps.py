@@ -0,0 +1,141 @@
+import hashlib
+import time
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Max
+from django.db.models.functions import Coalesce
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.feedgenerator import rfc3339_date
+
+# -----------------------
+
+from .models import Post
+
+# -----------------------
+
+SHARD_SIZE = 50000
+CONTENT_TYPE = 'application/xml; charset=utf-8'
+
+# -----------------------
+
+class SitemapCache:
+    """
+    Cached sitemap bodies, invalidated per shard.
+
+    Shard ``n`` holds the posts with ids ``n * SHARD_SIZE + 1`` to
+    ``(n + 1) * SHARD_SIZE``. Saving or deleting a post bumps the version of its
+    shard and of the index only; ``invalidate_all()`` is for bulk changes that
+    bypass model signals. Bodies hold absolute URLs, so the site URL they
+    were built with is part of the key.
+    """
+
+    prefix = 'cleanblog:sitemap'
+    timeout = getattr(settings, 'SITEMAP_CACHE_TIMEOUT', 86400)
+
+    def shard_for(self, pk):
+        return (pk - 1) // SHARD_SIZE
+
+    def _version(self, name):
+        key = f'{self.prefix}:version:{name}'
+        version = cache.get(key)
+        if version is None:
+            # Seeded from the clock so an evicted version never reuses the
+            # number of a body cached before the eviction.
+            cache.add(key, int(time.time() * 1000), None)
+            version = cache.get(key)
+        return version
+
+    def _bump(self, name):
+        key = f'{self.prefix}:version:{name}'
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), None)
+
+    def key(self, name, site_url):
+        digest = hashlib.md5(site_url.encode()).hexdigest()
+        return f'{self.prefix}:{name}:{digest}:{self._version("all")}:{self._version(name)}'
+
+    def invalidate(self, pk):
+        self._bump(f'shard-{self.shard_for(pk)}')
+        self._bump('index')
+
+    def invalidate_all(self):
+        self._bump('all')
+
+# -----------------------
+
+def site_url(request):
+    """``SITE_URL`` when configured, else the scheme and (validated) host of the request."""
+    return getattr(settings, 'SITE_URL', '') or request.build_absolute_uri('/')[:-1]
+
+
+def cached_stream(key, chunks):
+    """
+    Stream ``chunks`` to the client and cache the full body once it is complete.
+
+    ``key`` is taken before the rows are read, so a post saved meanwhile
+    leaves the body under the superseded version.
+    """
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    cache.set(key, ''.join(parts), SitemapCache.timeout)
+
+
+def sitemap_index(request):
+    base = site_url(request)
+    key = SitemapCache().key('index', base)
+    body = cache.get(key)
+    if body is not None:
+        return HttpResponse(body, content_type=CONTENT_TYPE)
+    return StreamingHttpResponse(cached_stream(key, render_index(base)), content_type=CONTENT_TYPE)
+
+
+def sitemap_shard(request, shard):
+    base = site_url(request)
+    key = SitemapCache().key(f'shard-{shard}', base)
+    body = cache.get(key)
+    if body is not None:
+        return HttpResponse(body, content_type=CONTENT_TYPE)
+    if not Post.objects.filter(pk__gt=shard * SHARD_SIZE, pk__lte=(shard + 1) * SHARD_SIZE).exists():
+        raise Http404('Empty sitemap shard.')
+    return StreamingHttpResponse(cached_stream(key, render_shard(base, shard)), content_type=CONTENT_TYPE)
+
+# -----------------------
+
+def render_index(base):
+    # One grouped pass over (id, created_at, updated_at) gives every shard's lastmod.
+    shards = (
+        Post.objects.order_by()
+        .annotate(shard=(F('id') - 1) / SHARD_SIZE)
+        .values('shard')
+        .annotate(lastmod=Max(Coalesce('updated_at', 'created_at')))
+        .order_by('shard')
+        .values_list('shard', 'lastmod')
+    )
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    for shard, lastmod in shards.iterator():
+        location = base + reverse('sitemap-shard', args=[shard])
+        yield f'<sitemap><loc>{escape(location)}</loc><lastmod>{rfc3339_date(lastmod)}</lastmod></sitemap>'
+    yield '</sitemapindex>\n'
+
+
+def render_shard(base, shard):
+    rows = (
+        Post.objects.filter(pk__gt=shard * SHARD_SIZE, pk__lte=(shard + 1) * SHARD_SIZE)
+        .order_by('pk')
+        .values_list('pk', 'created_at', 'updated_at')
+    )
+    # Resolve the URL pattern once and fill in ids, instead of reverse() per row.
+    prefix, suffix = (base + reverse('post-detail', args=[0])).rsplit('0', 1)
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    for pk, created_at, updated_at in rows.iterator(chunk_size=2000):
+        yield f'<url><loc>{escape(f"{prefix}{pk}{suffix}")}</loc><lastmod>{rfc3339_date(updated_at or created_at)}</lastmod></url>'
+    yield '</urlset>\n'
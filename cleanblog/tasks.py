@@ -0,0 +1,10 @@
+from .jobs import job
+from .utils.images import ImageVariants
+
+# -----------------------
+
+# Background work run by `manage.py run_workers` (see cleanblog.jobs).
+
+@job(max_attempts=3)
+def generate_image_variants(label, pk, field_name='picture'):
+    ImageVariants().process(label, pk, field_name)
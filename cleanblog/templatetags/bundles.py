@@ -0,0 +1,29 @@
+from django import template
+from django.utils.html import format_html_join
+from django.utils.safestring import mark_safe
+
+# -----------------------
+
+from ..utils.bundles import AssetBundles
+
+# -----------------------
+
+register = template.Library()
+
+@register.simple_tag
+def bundle(name, kind=None):
+    """
+    Usage: ``{% bundle 'base' %}`` in ``<head>``, or ``{% bundle 'base' 'css' %}`` for one kind.
+
+    Emits the bundle's preload hints, stylesheets and ``defer`` scripts, so
+    scripts download in parallel and never block the first render.
+    """
+    bundles = AssetBundles()
+    tags = []
+    if kind is None:
+        tags.append(format_html_join('', '<link rel="preload" href="{}" as="{}">', bundles.preloads(name)))
+    if kind in (None, 'css'):
+        tags.append(format_html_join('', '<link rel="stylesheet" href="{}">', ((url,) for url in bundles.urls(name, 'css'))))
+    if kind in (None, 'js'):
+        tags.append(format_html_join('', '<script src="{}" defer></script>', ((url,) for url in bundles.urls(name, 'js'))))
+    return mark_safe(''.join(tags))
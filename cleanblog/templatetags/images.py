@@ -0,0 +1,39 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+# -----------------------
+
+from ..utils.images import ImageVariants
+
+# -----------------------
+
+register = template.Library()
+
+@register.filter
+def srcset(picture, variants):
+    """Usage: ``<img src="{{ post.picture.url }}" srcset="{{ post.picture|srcset:post.picture_variants }}">``"""
+    if not picture:
+        return ''
+    return ImageVariants().srcset(picture, variants)
+
+
+@register.simple_tag
+def responsive_background(selector, picture, variants):
+    """
+    Emit a ``<style>`` block giving ``selector`` the smallest adequate
+    background variant for the viewport, falling back to the original file.
+
+    Storage URLs are percent-encoded, so they are safe inside ``<style>``.
+    """
+    if not picture:
+        return ''
+    images = ImageVariants()
+    rules = [f'{selector} {{ background-image: url("{picture.url}"); }}']
+    widths = sorted({int(width) for key, *_ in images.formats for width in (variants or {}).get(key, {})}, reverse=True)
+    for index, width in enumerate(widths):
+        image_set = images.image_set(picture, variants, str(width))
+        if not image_set:
+            continue
+        rule = f'{selector} {{ background-image: {image_set}; }}'
+        rules.append(rule if index == 0 else f'@media (max-width: {width}px) {{ {rule} }}')
+    return mark_safe('<style>%s</style>' % '\n'.join(rules))
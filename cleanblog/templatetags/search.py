@@ -0,0 +1,13 @@
+from django import template
+
+# -----------------------
+
+from ..utils.search import PostSearch
+
+# -----------------------
+
+register = template.Library()
+
+@register.filter
+def highlight(snippet):
+    return PostSearch().highlight(snippet)
@@ -1,3 +1,1348 @@
-from django.test import TestCase
+import json
+import os
+import re
+import runpy
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.hashers import identify_hasher
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, transaction
+from django.db.utils import ConnectionHandler
+from django.http import Http404
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path, resolve, reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from . import urls as blog_urls
+from .backends import AuthorModelBackend
+from .form import PostForm
+from .jobs import Worker, job
+from .metrics import metrics_view, record_query, registry
+from .middleware import AuthorMiddleware
+from .models import Author, Category, Job, Post
+from .routers import ReadWriteRouter
+from .signals import install_search_triggers
+from .sitemaps import SitemapCache
+from .tasks import generate_image_variants
+from .templatetags.images import srcset
+from .utils.bulk import BulkPostChanges
+from .utils.bundles import AssetBundles
+from .utils.cache import ContentCache
+from .utils.http import client_ip
+from .utils.images import ImageVariants
+from .utils.paginator import CachedCountPaginator, CursorPaginator, InvalidCursor
+from .utils.records import ObjectVersions, PostRecords
+from .utils.rendering import PostRenderer
+from .utils.search import PostSearch
+from .views import AsyncPostDetailView, AsyncPostListView, login_auth, logout_auth
+from .warmup import warm_up
+
+# --------------------------------------------------------------------
+
+def create_author(username, **fields):
+    fields = {
+        'name': username.title(), 'email': f'{username}@example.com', 'occupation': 'Writer',
+        'description': 'A description long enough.', 'picture': 'authors/author.png', **fields,
+    }
+    return Author.objects.create(user=User.objects.create_user(username, password='secret123'), **fields)
+
+
+def create_post(author, category, **fields):
+    fields = {
+        'title': 'A post title', 'briefing': 'A short briefing here', 'text': 'Post text. ' * 12,
+        'picture': 'posts/post.png', **fields,
+    }
+    return Post.objects.create(author=author, category=category, **fields)
+
+# --------------------------------------------------------------------
+
+class PostListQueryBudgetTest(TestCase):
+    """The post list must not issue per-row queries as posts and authors grow."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(title='General')
+        now = timezone.now()
+        for i in range(6):
+            user = User.objects.create_user(f'author{i}', password='secret')
+            author = Author.objects.create(
+                user=user,
+                name=f'Author {i}',
+                email=f'author{i}@example.com',
+                occupation='Writer',
+                description='A description long enough.',
+                picture='authors/author.png',
+            )
+            Post.objects.create(
+                author=author,
+                category=category,
+                title=f'Post title {i}',
+                briefing=f'Post briefing {i}',
+                text='Post text. ' * 20,
+                picture='posts/post.png',
+                created_at=now - timedelta(minutes=i),
+            )
+        # FTS5 availability is introspected once per process.
+        PostSearch().is_available()
+
+    def setUp(self):
+        cache.clear()
+        PostRecords.clear_local()
+
+    def test_list_page_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('post-list'))
+        self.assertContains(response, 'Author 0')
+
+    def test_search_page_is_count_plus_page(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('post-list'), {'search': 'briefing'})
+        self.assertContains(response, 'Author 0')
+
+    def test_summary_defers_wide_columns(self):
+        post = Post.objects.summary().first()
+        self.assertIn('text', post.get_deferred_fields())
+        self.assertIn('picture', post.get_deferred_fields())
+
+    def test_list_query_joins_the_author_and_skips_the_body(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('post-list'), {'page': 2})
+        sql = queries.captured_queries[-1]['sql']
+        self.assertIn('INNER JOIN "author"', sql)
+        self.assertNotIn('"post"."text"', sql)
+        self.assertNotIn('"post"."text_html"', sql)
+
+        author = Author.objects.first()
+        for i in range(10):
+            create_post(author, Category.objects.get(), title=f'Extra title {i}')
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('post-list'))
+        self.assertEqual(len(response.context['posts']), 5)
+
+# --------------------------------------------------------------------
+
+class ContentCacheTest(TestCase):
+    """List fragments are shared between sessions and dropped once a change commits."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_author('writer')
+        self.category = Category.objects.create(title='General')
+        self.post = create_post(self.author, self.category, title='Cached post')
+
+    def test_fragment_is_shared_and_only_the_shell_is_per_session(self):
+        self.client.get(reverse('post-list'))
+        with self.assertNumQueries(0):
+            anonymous = self.client.get(reverse('post-list'))
+        self.assertContains(anonymous, 'Cached post')
+        self.assertContains(anonymous, '>Login</a>')
+
+        self.client.login(username='writer', password='secret123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('post-list'))
+        self.assertContains(response, 'Cached post')
+        self.assertContains(response, '>Logout</a>')
+        self.assertNotContains(response, '>Login</a>')
+        self.assertFalse([query for query in queries.captured_queries if '"post"' in query['sql']])
+
+    def test_cached_list_is_invalidated_on_post_save(self):
+        self.client.get(reverse('post-list'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('post-list'))
+        self.post.title = 'Renamed post'
+        self.post.save()
+        self.assertContains(self.client.get(reverse('post-list')), 'Renamed post')
+
+    def test_version_is_bumped_again_on_commit(self):
+        content = ContentCache()
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.post.title = 'Renamed post'
+                self.post.save()
+                # A concurrent reader caches the old rows under the bumped version.
+                during = content.version()
+        self.assertGreater(content.version(), during)
+
+# --------------------------------------------------------------------
+
+def png(width, height):
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'teal').save(buffer, 'PNG')
+    return ContentFile(buffer.getvalue())
+
+
+class ImageVariantsTest(TestCase):
+    """Saved pictures get resized WebP/JPEG copies, used by the detail masthead."""
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        media = override_settings(MEDIA_ROOT=directory.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.author = create_author('writer')
+        self.category = Category.objects.create(title='General')
+
+    def create(self, name, width, height):
+        default_storage.save(name, png(width, height))
+        with self.captureOnCommitCallbacks(execute=True):
+            return create_post(self.author, self.category, picture=name)
+
+    def test_variants_are_generated_once_the_post_commits(self):
+        with override_settings(JOBS_RUN_INLINE=True):
+            post = self.create('posts/wide.png', 1200, 600)
+        post.refresh_from_db()
+        variants = post.picture_variants
+        self.assertEqual(variants['source'], 'posts/wide.png')
+        self.assertEqual(sorted(variants['webp'], key=int), ['480', '960', '1200'])
+        self.assertEqual(variants['jpeg']['480'], 'posts/variants/wide-480w.jpg')
+        from PIL import Image
+        with default_storage.open(variants['webp']['480']) as stream:
+            self.assertEqual(Image.open(stream).size, (480, 240))
+        self.assertFalse(ImageVariants().is_stale(post))
+
+        response = self.client.get(reverse('post-detail', args=[post.pk]))
+        self.assertContains(response, 'url("/media/posts/variants/wide-1200w.webp") type("image/webp")')
+        self.assertContains(response, '@media (max-width: 480px)')
+
+    def test_job_is_enqueued_and_replaced_variants_are_removed(self):
+        post = self.create('posts/first.png', 500, 500)
+        self.assertTrue(Job.objects.filter(name=generate_image_variants.name, args=['cleanblog.Post', post.pk]).exists())
+        generate_image_variants(post._meta.label, post.pk)
+        post.refresh_from_db()
+        old = post.picture_variants['webp']['480']
+
+        default_storage.save('posts/second.png', png(300, 200))
+        post.picture = 'posts/second.png'
+        post.save()
+        ImageVariants().process(post._meta.label, post.pk)
+        post.refresh_from_db()
+        self.assertEqual(post.picture_variants['webp'], {'300': 'posts/variants/second-300w.webp'})
+        self.assertFalse(default_storage.exists(old))
+        self.assertEqual(srcset(post.picture, post.picture_variants), '/media/posts/variants/second-300w.jpg 300w')
+
+# --------------------------------------------------------------------
+
+class FlashMessageTest(TestCase):
+    """Flash messages ride a signed cookie to the next page and are shown once."""
+
+    def setUp(self):
+        cache.clear()
+        create_author('writer')
+
+    def test_message_survives_the_redirect_without_a_session(self):
+        self.client.login(username='writer', password='secret123')
+        response = self.client.get(reverse('logout'))
+        self.assertRedirects(response, reverse('post-list'), fetch_redirect_response=False)
+        self.assertIn('messages', response.cookies)
+        self.assertFalse(Session.objects.exists())
+
+        page = self.client.get(reverse('post-list'))
+        self.assertContains(page, '<p id="messageModal">Successfully logged off.</p>', html=True)
+        self.assertEqual(page.cookies['messages']['max-age'], 0)
+        self.assertNotContains(self.client.get(reverse('post-list')), 'id="modalInfo"')
+
+    def test_message_is_shown_on_the_page_that_sets_it(self):
+        response = self.client.post(reverse('login'), {'username': 'writer', 'password': 'wrong-password'})
+        self.assertContains(response, 'Invalid username and password.')
+        # Consumed by this render, so nothing is carried to the next page.
+        self.assertEqual(response.cookies['messages'].value, '')
+
+    def test_clear_data_round_trip_is_gone(self):
+        self.assertEqual(self.client.post('/clear-data/').status_code, 404)
+
+# --------------------------------------------------------------------
+
+class AuthorMiddlewareTest(TestCase):
+    """request.author comes with the session's user; views never look the Author up again."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_author('writer')
+        self.category = Category.objects.create(title='General')
+        self.post = create_post(self.author, self.category)
+
+    def resolve(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        AuthorMiddleware(lambda request: None)(request)
+        return request.author
+
+    def test_author_is_loaded_with_the_user(self):
+        with self.assertNumQueries(1):
+            user = AuthorModelBackend().get_user(self.author.user_id)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.resolve(user).name, 'Writer')
+        self.assertFalse(self.resolve(AnonymousUser()))
+        self.assertFalse(self.resolve(User.objects.create_user('reader', password='secret123')))
+
+    def test_edit_view_uses_request_author(self):
+        self.client.login(username='writer', password='secret123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('post-update', args=[self.post.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([query for query in queries.captured_queries if 'FROM "author"' in query['sql']])
+
+    def test_other_authors_posts_are_refused(self):
+        create_author('other')
+        self.client.login(username='other', password='secret123')
+        response = self.client.get(reverse('post-update', args=[self.post.pk]))
+        self.assertRedirects(response, reverse('post-list'), fetch_redirect_response=False)
+        self.assertContains(self.client.get(reverse('post-list')), 'You cannot edit or delete posts from this author.')
+
+# --------------------------------------------------------------------
+
+class SqliteProductionTest(TestCase):
+    """SQLITE_PRODUCTION=1 gives a tuned WAL writer and a read-only replica that reads go to."""
+
+    def production_settings(self, directory, **environ):
+        environ = {'SQLITE_PRODUCTION': '1', 'DATABASE_PATH': f'{directory}/db.sqlite3', **environ}
+        with mock.patch.dict(os.environ, environ):
+            return runpy.run_path(settings.BASE_DIR / 'pjcleanblog' / 'settings.py')
+
+    def test_connections_apply_the_pragmas(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        production = self.production_settings(directory.name, SQLITE_BUSY_TIMEOUT='1234')
+        self.assertEqual(production['DATABASE_ROUTERS'], ['cleanblog.routers.ReadWriteRouter'])
+        handler = ConnectionHandler(production['DATABASES'])
+        self.addCleanup(handler.close_all)
+
+        with handler['default'].cursor() as cursor:
+            for pragma, value in (('journal_mode', 'wal'), ('synchronous', 1), ('busy_timeout', 1234), ('temp_store', 2)):
+                cursor.execute(f'PRAGMA {pragma}')
+                self.assertEqual(cursor.fetchone()[0], value, pragma)
+            cursor.execute('CREATE TABLE note (body TEXT)')
+        with handler['replica'].cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM note')
+            self.assertEqual(cursor.fetchone()[0], 0)
+            with self.assertRaisesMessage(OperationalError, 'readonly database'):
+                cursor.execute("INSERT INTO note VALUES ('no')")
+
+    def test_router_keeps_transactions_on_the_writer(self):
+        router = ReadWriteRouter()
+        self.assertEqual(router.db_for_write(Post), 'default')
+        with mock.patch.object(connection, 'in_atomic_block', False):
+            self.assertEqual(router.db_for_read(Post), 'replica')
+            self.assertEqual(router.db_for_read(Post, instance=Post(author_id=1)), 'replica')
+            written = Post()
+            written._state.db = 'default'
+            self.assertEqual(router.db_for_read(Author, instance=written), 'default')
+        with mock.patch.object(connection, 'in_atomic_block', True):
+            self.assertEqual(router.db_for_read(Post), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'cleanblog'))
+        self.assertTrue(router.allow_migrate('default', 'cleanblog'))
+
+# --------------------------------------------------------------------
+
+def async_read_patterns():
+    # What cleanblog.urls builds with ASYNC_READ_VIEWS=1 (set by asgi.py).
+    views = {'post-list': AsyncPostListView, 'post-detail': AsyncPostDetailView}
+    return [
+        *(
+            path(str(pattern.pattern), views[pattern.name].as_view(), name=pattern.name) if pattern.name in views else pattern
+            for pattern in blog_urls.urlpatterns
+        ),
+        path('login/', login_auth, name='login'),
+        path('logout/', logout_auth, name='logout'),
+    ]
+
+
+class AsyncReadUrls:
+    urlpatterns = async_read_patterns()
+
+
+class AsyncViewsTest(TestCase):
+    """Under ASGI the list, search and detail pages are served by the async views."""
+
+    def setUp(self):
+        cache.clear()
+        PostRecords.clear_local()
+        urlconf = override_settings(ROOT_URLCONF=AsyncReadUrls)
+        urlconf.enable()
+        self.addCleanup(urlconf.disable)
+        author = create_author('writer')
+        category = Category.objects.create(title='General')
+        now = timezone.now()
+        self.posts = [
+            create_post(author, category, title=f'Async post {i}', created_at=now - timedelta(minutes=i))
+            for i in range(7)
+        ]
+
+    async def test_list_pages_and_search(self):
+        self.assertTrue(resolve('/').func.view_class.view_is_async)
+        response = await self.async_client.get('/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Async post 0')
+        self.assertNotContains(response, 'Async post 5')
+        self.assertEqual(response['ETag'], (await self.async_client.get('/')).get('ETag'))
+
+        cursor = re.search(r'\?cursor=([\w-]+)', response.content.decode()).group(1)
+        older = await self.async_client.get('/', {'cursor': cursor})
+        self.assertContains(older, 'Async post 5')
+        self.assertNotContains(older, 'Async post 0')
+        self.assertEqual((await self.async_client.get('/', {'cursor': 'bogus'})).status_code, 404)
+
+        found = await self.async_client.get('/', {'search': 'async', 'page': 2})
+        self.assertContains(found, 'Async post 6')
+        self.assertContains(found, '&page=1">1</a>')
+
+    async def test_detail_renders_and_revalidates(self):
+        post = self.posts[0]
+        self.assertTrue(resolve(f'/{post.pk}/').func.view_class.view_is_async)
+        response = await self.async_client.get(f'/{post.pk}/')
+        self.assertContains(response, 'Async post 0')
+        revalidated = await self.async_client.get(f'/{post.pk}/', headers={'If-None-Match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual((await self.async_client.get('/0/')).status_code, 404)
+
+        # The user is resolved with auser() before the shell is rendered.
+        await self.async_client.alogin(username='writer', password='secret123')
+        response = await self.async_client.get(f'/{post.pk}/')
+        self.assertContains(response, 'Async post 0')
+        self.assertContains(response, '>Logout</a>')
+
+# --------------------------------------------------------------------
+
+class FeedTest(TestCase):
+    """RSS, Atom and JSON feeds list the newest posts and answer unchanged polls with a 304."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_author('writer')
+        self.category = Category.objects.create(title='Science')
+        self.other = Category.objects.create(title='Travel')
+        now = timezone.now()
+        self.first = create_post(self.author, self.category, title='Cats & <dogs>', created_at=now - timedelta(days=1))
+        self.second = create_post(self.author, self.other, title='Second post', created_at=now)
+
+    def fetch(self, url, **headers):
+        response = self.client.get(url, **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body.decode()
+
+    def test_formats_list_newest_first(self):
+        response, body = self.fetch(reverse('post-feed', args=['rss']))
+        self.assertEqual(response['Content-Type'], 'application/rss+xml; charset=utf-8')
+        items = ElementTree.fromstring(body).findall('channel/item')
+        self.assertEqual([item.findtext('title') for item in items], ['Second post', 'Cats & <dogs>'])
+        self.assertEqual(items[1].findtext('link'), f'http://testserver/{self.first.pk}/')
+        self.assertEqual(items[1].findtext('category'), 'Science')
+
+        response, body = self.fetch(reverse('post-feed', args=['atom']))
+        atom = '{http://www.w3.org/2005/Atom}'
+        entries = ElementTree.fromstring(body).findall(f'{atom}entry')
+        self.assertEqual([entry.findtext(f'{atom}title') for entry in entries], ['Second post', 'Cats & <dogs>'])
+        self.assertEqual(entries[0].findtext(f'{atom}author/{atom}name'), 'Writer')
+
+        response, body = self.fetch(reverse('post-feed', args=['json']))
+        feed = json.loads(body)
+        self.assertEqual(feed['version'], 'https://jsonfeed.org/version/1.1')
+        self.assertEqual([item['title'] for item in feed['items']], ['Second post', 'Cats & <dogs>'])
+        self.assertEqual(feed['items'][1]['tags'], ['Science'])
+
+    def test_category_and_author_scopes(self):
+        response, body = self.fetch(reverse('category-feed', args=[self.category.pk, 'json']))
+        feed = json.loads(body)
+        self.assertEqual(feed['title'], 'CleanBlog: Science')
+        self.assertEqual([item['title'] for item in feed['items']], ['Cats & <dogs>'])
+        response, body = self.fetch(reverse('author-feed', args=[self.author.pk, 'json']))
+        self.assertEqual(len(json.loads(body)['items']), 2)
+        self.assertEqual(self.client.get(reverse('category-feed', args=[0, 'rss'])).status_code, 404)
+
+    def test_unchanged_feed_is_a_304_without_reading_posts(self):
+        response, _ = self.fetch(reverse('post-feed', args=['rss']))
+        with CaptureQueriesContext(connection) as queries:
+            revalidated = self.client.get(reverse('post-feed', args=['rss']), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('MAX(', queries.captured_queries[0]['sql'])
+        since = self.client.get(reverse('post-feed', args=['rss']), HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(since.status_code, 304)
+
+        create_post(self.author, self.category, title='Third post')
+        changed, body = self.fetch(reverse('post-feed', args=['rss']), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertIn('Third post', body)
+
+# --------------------------------------------------------------------
+
+class HttpCacheTest(TestCase):
+    """Anonymous reads are public and revalidated by validators; session requests stay private."""
+
+    def setUp(self):
+        cache.clear()
+        PostRecords.clear_local()
+        self.author = create_author('writer')
+        self.category = Category.objects.create(title='General')
+        self.post = create_post(self.author, self.category, title='Cacheable post')
+
+    def test_list_is_public_and_revalidates_without_queries(self):
+        response = self.client.get(reverse('post-list'))
+        self.assertEqual(set(response['Cache-Control'].split(', ')), {'public', 'max-age=60', 's-maxage=300'})
+        self.assertEqual(response['Vary'], 'Cookie')
+        self.assertNotIn('Last-Modified', response)
+        with self.assertNumQueries(0):
+            revalidated = self.client.get(reverse('post-list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+
+        self.assertNotEqual(self.client.get(reverse('post-list'), {'search': 'post'})['ETag'], response['ETag'])
+        create_post(self.author, self.category, title='Newer post')
+        changed = self.client.get(reverse('post-list'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertContains(changed, 'Newer post')
+
+    def test_detail_has_last_modified(self):
+        url = reverse('post-detail', args=[self.post.pk])
+        response = self.client.get(url)
+        self.assertEqual(response['Last-Modified'], http_date(int(self.post.created_at.timestamp())))
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+        self.post.title = 'Edited post'
+        self.post.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_session_requests_are_private(self):
+        self.client.login(username='writer', password='secret123')
+        response = self.client.get(reverse('post-list'))
+        self.assertEqual(set(response['Cache-Control'].split(', ')), {'private', 'no-cache'})
+        self.assertNotIn('ETag', response)
+        self.assertContains(response, '>Logout</a>')
+
+# --------------------------------------------------------------------
+
+class AssetBundlesTest(TestCase):
+    """{% bundle %} links each page's own files, or one built file per kind, with deferred scripts."""
+
+    bundles = {
+        'base': {'css': ['css/styles/index.css'], 'js': ['js/vendor/jquery.min.js', 'js/vendor/clean-blog.min.js']},
+        'fonts': {'css': ['fonts/font-awesome.css'], 'preload': ['images/intro.jpg', 'fonts/fontawesome-webfont.woff2']},
+    }
+
+    def render(self, source):
+        return Template('{% load bundles %}' + source).render(Context())
+
+    def test_development_links_every_source(self):
+        with override_settings(ASSET_BUNDLES=self.bundles, ASSET_BUNDLES_BUILT=False):
+            html = self.render("{% bundle 'base' %}{% bundle 'fonts' 'css' %}")
+        self.assertEqual(html, (
+            '<link rel="stylesheet" href="/static/css/styles/index.css">'
+            '<script src="/static/js/vendor/jquery.min.js" defer></script>'
+            '<script src="/static/js/vendor/clean-blog.min.js" defer></script>'
+            '<link rel="stylesheet" href="/static/fonts/font-awesome.css">'
+        ))
+        with override_settings(ASSET_BUNDLES=self.bundles):
+            self.assertEqual(AssetBundles().preloads('fonts'), [
+                ('/static/images/intro.jpg', 'image'), ('/static/fonts/fontawesome-webfont.woff2', 'font'),
+            ])
+            with self.assertRaises(ImproperlyConfigured):
+                self.render("{% bundle 'missing' %}")
+
+    def test_built_bundles_concatenate_and_rebase_urls(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        with override_settings(ASSET_BUNDLES=self.bundles, ASSET_BUNDLES_BUILT=True, ASSET_BUNDLES_ROOT=root.name):
+            call_command('build_bundles', stdout=StringIO())
+            self.assertEqual(
+                self.render("{% bundle 'base' %}"),
+                '<link rel="stylesheet" href="/static/bundles/base.css"><script src="/static/bundles/base.js" defer></script>',
+            )
+        script = Path(root.name, 'base.js').read_text(encoding='utf-8')
+        self.assertTrue(script.startswith('/* js/vendor/jquery.min.js */'))
+        self.assertIn(';\n/* js/vendor/clean-blog.min.js */', script)
+        self.assertNotIn('sourceMappingURL', script)
+        fonts = Path(root.name, 'fonts.css').read_text(encoding='utf-8')
+        self.assertIn("url('../fonts/fontawesome-webfont.woff2?v=4.7.0')", fonts)
+        self.assertFalse(Path(root.name, 'fonts.js').exists())
+
+    def test_pages_load_only_their_bundles(self):
+        response = self.client.get(reverse('post-list'))
+        self.assertContains(response, '<link rel="preload" href="/static/images/intro.jpg" as="image">')
+        self.assertContains(response, '/static/css/styles/index.css')
+        self.assertNotContains(response, 'login.css')
+        self.assertNotContains(response, 'dataTables')
+        self.assertNotContains(response, '<script src="/static/js/vendor/jquery.min.js"></script>')
+
+# --------------------------------------------------------------------
+
+class PostSearchTest(TestCase):
+    """post_fts ranks title matches first, follows post writes, and has a LIKE fallback."""
+
+    def setUp(self):
+        if not PostSearch().is_available():
+            self.skipTest('SQLite without FTS5.')
+        self.author = create_author('writer')
+        self.category = Category.objects.create(title='Science')
+
+    def search(self, term):
+        return list(PostSearch().filter(Post.objects.all(), term).values_list('title', flat=True))
+
+    def indexed(self, term):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT rowid FROM post_fts WHERE post_fts MATCH %s', [term])
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_title_matches_rank_first(self):
+        create_post(self.author, self.category, title='About llamas', text='Mentions nebula once. ' * 6)
+        create_post(self.author, self.category, title='Nebula guide')
+        create_post(self.author, self.category, title='Nebula briefs', briefing='Another nebula briefing')
+        self.assertEqual(self.search('nebula'), ['Nebula briefs', 'Nebula guide', 'About llamas'])
+        self.assertEqual(self.search('nebul'), self.search('nebula'))
+        self.assertEqual(self.search('nebula llamas'), ['About llamas'])
+
+    def test_index_follows_insert_update_and_delete(self):
+        post = create_post(self.author, self.category, title='Quasar notes')
+        self.assertEqual(self.indexed('quasar'), [post.pk])
+        post.title = 'Pulsar notes'
+        post.save()
+        self.assertEqual(self.indexed('quasar'), [])
+        self.assertEqual(self.indexed('pulsar'), [post.pk])
+        Post.objects.filter(pk=post.pk).update(briefing='Mentions a magnetar')
+        self.assertEqual(self.indexed('magnetar'), [post.pk])
+        post.delete()
+        self.assertEqual(self.indexed('pulsar'), [])
+
+    def test_triggers_are_reinstalled_after_migrate(self):
+        with connection.cursor() as cursor:
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER post_fts_{suffix}')
+        install_search_triggers(sender=None, using='default')
+        post = create_post(self.author, self.category, title='Comet notes')
+        self.assertEqual(self.indexed('comet'), [post.pk])
+
+    def test_like_fallback(self):
+        create_post(self.author, self.category, title='Quasar notes', text='Deep *space* text. ' * 8)
+        create_post(self.author, self.category, title='Other notes')
+        with mock.patch.object(PostSearch, '_available', False):
+            self.assertEqual(self.search('QUASAR'), ['Quasar notes'])
+            self.assertEqual(self.search('space quasar'), ['Quasar notes'])
+            self.assertEqual(self.search('notes nothing'), [])
+            self.assertNotIn('post_fts', str(PostSearch().filter(Post.objects.all(), 'notes').query))
+
+# --------------------------------------------------------------------
+
+class PostRendererTest(TestCase):
+    """Post bodies are rendered from Markdown on save, without any executable link."""
+
+    def assertLinkDropped(self, markdown):
+        html = PostRenderer().render(markdown)[0]
+        self.assertNotIn('href', html)
+        self.assertNotIn('src', html)
+
+    def test_body_is_rendered_and_sanitized_on_save(self):
+        post = create_post(create_author('writer'), Category.objects.create(title='General'))
+        post.text = '**Bold** [x](javascript:alert(1)) <script>alert(1)</script> ' + 'word ' * 300
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertIn('<strong>Bold</strong>', post.text_html)
+        self.assertNotIn('javascript:', post.text_html)
+        self.assertNotIn('<script>', post.text_html)
+        self.assertEqual(post.reading_time, 2)
+        self.assertTrue(post.excerpt.startswith('Bold x'))
+
+    def test_unsafe_schemes_are_dropped_however_they_are_written(self):
+        for markdown in (
+            '[a](JaVa&#115;cript:alert(1))',
+            '[a](&#x6A;avascript:alert(1))',
+            '[a](java&#09;script:alert(1))',
+            '[a](java\tscript:alert(1))',
+            '![a](javascript&colon;alert(1))',
+            '[a](data:text/html;base64,PHNjcmlwdD4=)',
+            '[a](vbscript:msgbox(1))',
+        ):
+            with self.subTest(markdown=markdown):
+                self.assertLinkDropped(markdown)
+
+    def test_safe_links_are_kept(self):
+        html = PostRenderer().render('[a](https://example.com/?a=1&b=2) [b](/1/) [c](mailto:a@example.com)')[0]
+        self.assertIn('href="https://example.com/?a=1&amp;b=2" rel="nofollow noopener"', html)
+        self.assertIn('href="/1/"', html)
+        self.assertIn('href="mailto:a@example.com"', html)
+        self.assertNotIn('nofollow', html.split('href="/1/"')[1].split('>')[0])
+
+    def test_protocol_relative_links_are_external(self):
+        for markdown in ('[a](//evil.example/)', '[a](&#47;/evil.example/)', '[a](/\\evil.example/)'):
+            with self.subTest(markdown=markdown):
+                self.assertIn('rel="nofollow noopener"', PostRenderer().render(markdown)[0])
+
+# --------------------------------------------------------------------
+
+class PaginationTest(TestCase):
+    """The list is walked with keyset cursors; offset pages count once per content version."""
+
+    def setUp(self):
+        cache.clear()
+        author = create_author('writer')
+        category = Category.objects.create(title='General')
+        now = timezone.now()
+        # Pairs share a created_at, so the id breaks the ties.
+        self.posts = [
+            create_post(author, category, title=f'Paged post {i}', created_at=now - timedelta(hours=i // 2))
+            for i in range(7)
+        ]
+        self.newest_first = sorted(self.posts, key=lambda post: (post.created_at, post.pk), reverse=True)
+
+    def test_cursor_pages_walk_forward_and_back_without_gaps(self):
+        paginator = CursorPaginator(Post.objects.all(), 3)
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        self.assertEqual([post.pk for page in pages for post in page], [post.pk for post in self.newest_first])
+        self.assertFalse(pages[0].has_previous())
+
+        back = paginator.page(pages[-1].previous_cursor)
+        self.assertEqual([post.pk for post in back], [post.pk for post in pages[-2]])
+        with self.assertRaises(InvalidCursor):
+            paginator.page('not-a-cursor')
+
+    def test_list_uses_cursor_links_and_rejects_bad_cursors(self):
+        response = self.client.get(reverse('post-list'))
+        self.assertContains(response, '?cursor=')
+        self.assertNotIn('page_range', response.context)
+        self.assertEqual(self.client.get(reverse('post-list'), {'cursor': 'bogus'}).status_code, 404)
+
+    def test_offset_pages_cache_their_count(self):
+        queryset = Post.objects.order_by('-created_at', '-id')
+        self.assertEqual(CachedCountPaginator(queryset, 5).count, 7)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(CachedCountPaginator(queryset, 5).page(2)), 2)
+        create_post(self.posts[0].author, self.posts[0].category)
+        self.assertEqual(CachedCountPaginator(queryset, 5).count, 8)
+        self.assertEqual(self.client.get(reverse('post-list'), {'search': '!!!'}).status_code, 200)
+
+    def test_offset_pages_show_a_window_of_page_links(self):
+        paginator = CachedCountPaginator(range(100), 5)
+        ellipsis = paginator.ELLIPSIS
+        self.assertEqual(paginator.get_page_range(1), [1, 2, 3, ellipsis, 20])
+        self.assertEqual(paginator.get_page_range(10), [1, ellipsis, 8, 9, 10, 11, 12, ellipsis, 20])
+
+        response = self.client.get(reverse('post-list'), {'page': 2})
+        self.assertEqual(response.context['page_range'], [1, 2])
+        self.assertEqual([post.pk for post in response.context['posts']], [post.pk for post in self.newest_first[5:]])
+        self.assertContains(response, '&page=1">1</a>')
+
+# --------------------------------------------------------------------
+
+class ArchiveTest(TestCase):
+    """Category and author archives page by cursor and show the maintained post_count."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = create_author('writer')
+        self.other_author = create_author('other')
+        self.category = Category.objects.create(title='General')
+        self.other = Category.objects.create(title='Elsewhere')
+        now = timezone.now()
+        self.posts = [
+            create_post(self.author, self.category, title=f'Archived post {i}', created_at=now - timedelta(minutes=i))
+            for i in range(6)
+        ]
+        create_post(self.other_author, self.other, title='Unrelated post')
+
+    def counts(self):
+        return (
+            list(Category.objects.order_by('pk').values_list('post_count', flat=True)),
+            list(Author.objects.order_by('pk').values_list('post_count', flat=True)),
+        )
+
+    def test_archive_page_is_owner_plus_page(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('category-posts', args=[self.category.pk]))
+        self.assertContains(response, '6 posts')
+        self.assertEqual([post.title for post in response.context['posts']], [f'Archived post {i}' for i in range(5)])
+
+        cursor = response.context['page_obj'].next_cursor
+        older = self.client.get(reverse('category-posts', args=[self.category.pk]), {'cursor': cursor})
+        self.assertEqual([post.title for post in older.context['posts']], ['Archived post 5'])
+
+        response = self.client.get(reverse('author-posts', args=[self.other_author.pk]))
+        self.assertContains(response, '1 post<')
+        self.assertEqual([post.title for post in response.context['posts']], ['Unrelated post'])
+        self.assertEqual(self.client.get(reverse('category-posts', args=[0])).status_code, 404)
+
+    def test_post_counts_follow_create_move_and_delete(self):
+        self.assertEqual(self.counts(), ([6, 1], [6, 1]))
+        post = self.posts[0]
+        post.category = self.other
+        post.author = self.other_author
+        post.save()
+        self.posts[1].delete()
+        Post.objects.filter(pk=self.posts[2].pk).delete()
+        self.assertEqual(self.counts(), ([3, 2], [3, 2]))
+
+        self.other.delete()
+        self.assertEqual(self.counts(), ([3], [3, 0]))
+
+    def test_rebuild_repairs_counts_changed_behind_the_model(self):
+        Post.objects.filter(pk=self.posts[0].pk).update(category=self.other)
+        self.assertEqual(self.counts()[0], [6, 1])
+        call_command('rebuild_post_counts', stdout=StringIO())
+        self.assertEqual(self.counts()[0], [5, 2])
+
+# --------------------------------------------------------------------
+
+class CategoryCacheTest(TestCase):
+    """PostForm reads categories from the process-local cache."""
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(title='General')
+
+    def test_form_renders_and_cleans_category_without_queries(self):
+        str(PostForm()['category'])
+        with self.assertNumQueries(0):
+            self.assertIn('General', str(PostForm()['category']))
+            form = PostForm(data={'category': self.category.pk})
+            form.is_valid()
+        self.assertEqual(form.cleaned_data['category'], self.category)
+
+    def test_valid_form_sets_the_category_without_model_lookups(self):
+        str(PostForm()['category'])
+        data = {'title': 'A post title', 'briefing': 'A short briefing here', 'text': 'Post text. ' * 12, 'category': self.category.pk}
+        files = {'picture': SimpleUploadedFile('post.png', b'image', content_type='image/png')}
+        with self.assertNumQueries(0):
+            form = PostForm(data=data, files=files)
+            self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.instance.category, self.category)
+
+        post = create_post(create_author('writer'), self.category)
+        self.assertEqual(PostForm(instance=post)['category'].value(), self.category.pk)
+
+    def test_category_changes_invalidate_the_cache(self):
+        str(PostForm()['category'])
+        Category.objects.create(title='Science')
+        self.assertIn('Science', str(PostForm()['category']))
+        pk = self.category.pk
+        self.category.delete()
+        self.assertIn('category', PostForm(data={'category': pk}).errors)
+        self.assertNotIn(f'value="{pk}"', str(PostForm()['category']))
+
+# --------------------------------------------------------------------
+
+class BenchmarkCommandTest(TestCase):
+    """seed_posts and benchmark produce a complete, machine-readable report."""
+
+    def test_seed_and_benchmark_read_endpoints(self):
+        call_command('seed_posts', posts=30, authors=3, categories=2, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertEqual(Author.objects.count(), 3)
+
+        output = StringIO()
+        call_command(
+            'benchmark', endpoints='list,detail,search', requests=4, warmup=1,
+            memory_requests=2, output='-', stdout=output, stderr=StringIO(),
+        )
+        report = json.loads(output.getvalue())
+        self.assertEqual(report['meta']['posts'], 30)
+        for name in ('list', 'detail', 'search'):
+            summary = report['endpoints'][name]
+            self.assertEqual(summary['requests'], 4)
+            self.assertEqual(summary['errors'], 0)
+            self.assertLessEqual(summary['p50_ms'], summary['p99_ms'])
+            self.assertIsNotNone(summary['queries_max'])
+            self.assertIsNotNone(summary['peak_memory_kb'])
+
+# --------------------------------------------------------------------
+
+class ImportExportTest(TestCase):
+    """export_posts output imports back unchanged; invalid records are reported by line."""
+
+    def setUp(self):
+        self.author = create_author('writer')
+        self.category = Category.objects.create(title='Science')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name, content=None):
+        path = f'{self.directory.name}/{name}'
+        if content is not None:
+            with open(path, 'w', encoding='utf-8') as stream:
+                stream.write(content)
+        return path
+
+    def record(self, **fields):
+        return {
+            'title': 'Imported title', 'briefing': 'An imported briefing', 'text': 'Imported *text*. ' * 10,
+            'picture': 'posts/post.png', 'created_at': '2024-01-02T03:04:05+00:00', 'updated_at': None,
+            'author': self.author.email, 'category': self.category.title, **fields,
+        }
+
+    def rows(self):
+        return list(Post.objects.order_by('created_at', 'pk').values_list(
+            'title', 'briefing', 'text', 'text_html', 'picture', 'created_at', 'updated_at', 'author_id', 'category_id',
+        ))
+
+    def test_round_trip(self):
+        now = timezone.now()
+        create_post(self.author, self.category, title='First post', text='Some **bold** text. ' * 8, created_at=now - timedelta(days=2))
+        create_post(self.author, self.category, title='Second post', created_at=now - timedelta(days=1), updated_at=now)
+        for fmt in ('jsonl', 'csv'):
+            with self.subTest(fmt=fmt):
+                path = self.path(f'posts.{fmt}')
+                expected = self.rows()
+                call_command('export_posts', path, stderr=StringIO())
+                Post.objects.all().delete()
+                call_command('import_posts', path, stdout=StringIO(), stderr=StringIO())
+                self.assertEqual(self.rows(), expected)
+                self.author.refresh_from_db()
+                self.assertEqual(self.author.post_count, 2)
+
+    def test_invalid_record_aborts_the_import(self):
+        lines = [
+            json.dumps(self.record()),
+            json.dumps({'title': 'No owners at all'}),
+            json.dumps(self.record(briefing='short')),
+            '{not json',
+            json.dumps(self.record(author='nobody@example.com')),
+            json.dumps(self.record(updated_at='2020-01-01T00:00:00+00:00')),
+            json.dumps(self.record(created_at='yesterday')),
+        ]
+        path = self.path('posts.jsonl', '\n'.join(lines))
+        errors = StringIO()
+        with self.assertRaisesMessage(CommandError, '6 invalid record(s); nothing was imported.'):
+            call_command('import_posts', path, '--create-categories', stdout=StringIO(), stderr=errors)
+        self.assertFalse(Post.objects.exists())
+        report = errors.getvalue()
+        self.assertIn('Line 2: Missing briefing, text, picture, author, category.', report)
+        self.assertIn('Line 3: Briefing must be at least 10 characters long.', report)
+        self.assertIn('Line 4: invalid JSON', report)
+        self.assertIn("Line 5: Unknown author 'nobody@example.com'.", report)
+        self.assertIn('Line 6: Update date cannot be earlier than creation date.', report)
+        self.assertIn('Line 7: created_at must be an ISO 8601 datetime.', report)
+
+    def test_skip_invalid(self):
+        header = 'title,briefing,text,picture,created_at,updated_at,author,category'
+        good = self.record()
+        rows = [header, ','.join(str(good[name] or '') for name in header.split(','))]
+        rows.append(rows[1].replace(self.category.title, 'Missing category'))
+        path = self.path('posts.csv', '\n'.join(rows))
+        errors = StringIO()
+        call_command('import_posts', path, '--skip-invalid', stdout=StringIO(), stderr=errors)
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertIn("Line 3: Unknown category 'Missing category'", errors.getvalue())
+        self.assertFalse(Category.objects.filter(title='Missing category').exists())
+
+# --------------------------------------------------------------------
+
+class InstrumentationTest(TestCase):
+    """Requests are aggregated per URL name and exposed in Prometheus format."""
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+
+    def test_request_metrics_are_exported(self):
+        middleware = ['cleanblog.middleware.InstrumentationMiddleware', *settings.MIDDLEWARE]
+        with override_settings(MIDDLEWARE=middleware, INSTRUMENTATION_SLOW_REQUEST_MS=10000):
+            with connection.execute_wrapper(record_query):
+                self.client.get(reverse('post-list'))
+        body = registry.render()
+        self.assertIn('cleanblog_requests_total{view="post-list",method="GET",status="200"} 1', body)
+        self.assertIn('cleanblog_sql_queries_per_request_count{view="post-list"} 1', body)
+        self.assertIn('cleanblog_request_duration_seconds_bucket{view="post-list",le="+Inf"} 1', body)
+
+    @override_settings(TRUSTED_PROXIES=['127.0.0.1/32'])
+    def test_metrics_endpoint_checks_the_client_behind_the_proxy(self):
+        request = RequestFactory().get('/internal/metrics', HTTP_X_FORWARDED_FOR='203.0.113.9')
+        with self.assertRaises(Http404):
+            metrics_view(request)
+        self.assertEqual(metrics_view(RequestFactory().get('/internal/metrics')).status_code, 200)
+
+    @override_settings(INSTRUMENTATION_TOKEN='scrape-secret')
+    def test_metrics_endpoint_requires_the_token_when_set(self):
+        with self.assertRaises(Http404):
+            metrics_view(RequestFactory().get('/internal/metrics'))
+        request = RequestFactory().get('/internal/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret', REMOTE_ADDR='203.0.113.9')
+        self.assertEqual(metrics_view(request).status_code, 200)
+
+# --------------------------------------------------------------------
+
+@job(max_attempts=2, backoff=60)
+def append_to_category(pk, suffix):
+    category = Category.objects.get(pk=pk)
+    if suffix == 'fail':
+        raise ValueError('Failing on purpose.')
+    category.title += suffix
+    category.save()
+
+
+class JobQueueTest(TestCase):
+    """Jobs are enqueued with the caller's transaction and retried with backoff."""
+
+    def setUp(self):
+        self.category = Category.objects.create(title='General')
+        self.worker = Worker(threads=1)
+
+    def run_due_jobs(self):
+        return [self.worker.execute(pk) for pk in self.worker.claim(10)]
+
+    def test_job_rolls_back_with_the_transaction_and_runs_once_committed(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            append_to_category.delay(self.category.pk, ' (rolled back)')
+            raise RuntimeError()
+        append_to_category.delay(self.category.pk, ' news')
+        self.assertEqual(self.run_due_jobs(), [Job.DONE])
+        self.assertEqual(self.run_due_jobs(), [])
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.title, 'General news')
+
+    def test_failing_job_is_retried_with_backoff_then_marked_failed(self):
+        queued = append_to_category.delay(self.category.pk, 'fail')
+        with self.assertLogs('cleanblog.jobs', 'WARNING'):
+            self.assertEqual(self.run_due_jobs(), ['retried'])
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (Job.QUEUED, 1))
+        self.assertGreater(queued.run_at, timezone.now() + timedelta(seconds=50))
+        self.assertIn('Failing on purpose.', queued.last_error)
+        self.assertEqual(self.run_due_jobs(), [])
+        Job.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+        with self.assertLogs('cleanblog.jobs', 'ERROR'):
+            self.assertEqual(self.run_due_jobs(), [Job.FAILED])
+
+# --------------------------------------------------------------------
+
+class PostRecordCacheTest(TestCase):
+    """Detail records are read through a local LRU and the shared cache while their versions match."""
+
+    def setUp(self):
+        cache.clear()
+        PostRecords.clear_local()
+        self.author = create_author('writer')
+        self.category = Category.objects.create(title='General')
+        self.posts = [create_post(self.author, self.category, title=f'Record post {i}') for i in range(3)]
+
+    def test_detail_record_is_cached_until_its_author_changes(self):
+        post, other = self.posts[:2]
+        url = reverse('post-detail', args=[post.pk])
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            first = self.client.get(url)
+        Post.objects.filter(pk=other.pk).update(title='Unrelated')
+        Author.objects.filter(pk=post.author_id).update(name='Ignored')
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(url), 'Writer')
+        self.author.name = 'Renamed author'
+        self.author.save()
+        second = self.client.get(url)
+        self.assertContains(second, 'Renamed author')
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+    def test_tiers_and_invalidation(self):
+        records = PostRecords()
+        pk = self.posts[0].pk
+        with self.assertNumQueries(2):
+            versions, post = records.get(pk)
+        self.assertEqual(post.category.title, 'General')
+        self.assertIn('text', post.get_deferred_fields())
+        PostRecords.clear_local()
+        with self.assertNumQueries(0):
+            self.assertEqual(records.get(pk)[0], versions)
+        self.assertIsNone(records.get(0))
+
+        self.category.title = 'Renamed'
+        self.category.save()
+        with self.assertNumQueries(2):
+            self.assertEqual(records.get(pk)[1].category.title, 'Renamed')
+
+        Post.objects.update(title='Bulk title')
+        ObjectVersions().bump_all(Post)
+        self.assertEqual(records.get(pk)[1].title, 'Bulk title')
+
+    def test_change_committed_during_a_miss_is_not_cached_as_current(self):
+        records = PostRecords()
+        pk = self.posts[0].pk
+        get_many = ObjectVersions.get_many
+
+        def commit_then_read(versions, keys):
+            # A save commits and bumps the post while the miss is in flight.
+            if not hasattr(commit_then_read, 'done'):
+                commit_then_read.done = True
+                Post.objects.filter(pk=pk).update(title='Saved meanwhile')
+                versions.bump(Post, pk)
+            return get_many(versions, keys)
+
+        with mock.patch.object(ObjectVersions, 'get_many', commit_then_read):
+            self.assertEqual(records.get(pk)[1].title, 'Saved meanwhile')
+        self.assertEqual(records.get(pk)[1].title, 'Saved meanwhile')
+
+    def test_local_tier_is_bounded(self):
+        records = PostRecords()
+        with mock.patch.object(PostRecords, 'local_size', 2):
+            for post in self.posts:
+                records.get(post.pk)
+            self.assertEqual(list(PostRecords._local), [post.pk for post in self.posts[1:]])
+            records.get(self.posts[1].pk)
+            self.assertEqual(list(PostRecords._local), [self.posts[2].pk, self.posts[1].pk])
+
+# --------------------------------------------------------------------
+
+@override_settings(LOGIN_THROTTLE={'ip': (20, 10), 'username': (2, 1), 'account': (3, 1)})
+class LoginThrottleTest(TestCase):
+    """Excess login attempts are rejected before any password is hashed."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('writer', password='secret123')
+
+    def login(self, password):
+        return self.client.post(reverse('login'), {'username': 'Writer', 'password': password})
+
+    def test_attempts_beyond_the_username_bucket_skip_authentication(self):
+        self.assertEqual(self.login('wrong-one').status_code, 200)
+        self.assertEqual(self.login('wrong-two').status_code, 200)
+        with mock.patch('cleanblog.views.authenticate') as authenticate:
+            response = self.login('secret123')
+        authenticate.assert_not_called()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertContains(response, 'Too many login attempts', status_code=429)
+        self.assertIn('cleanblog_login_throttled_total{scope="username"} 1', registry.render())
+
+    def test_failures_from_one_client_do_not_lock_the_account_elsewhere(self):
+        for password in ('wrong-one', 'wrong-two', 'wrong-three'):
+            self.client.post(reverse('login'), {'username': 'writer', 'password': password}, REMOTE_ADDR='203.0.113.9')
+        response = self.client.post(reverse('login'), {'username': 'writer', 'password': 'secret123'}, REMOTE_ADDR='198.51.100.4')
+        self.assertEqual(response.status_code, 302)
+
+    def test_failures_spread_over_clients_are_limited_per_account(self):
+        for i in range(3):
+            self.client.post(reverse('login'), {'username': 'writer', 'password': 'wrong'}, REMOTE_ADDR=f'203.0.113.{i}')
+        with mock.patch('cleanblog.views.authenticate') as authenticate:
+            response = self.client.post(reverse('login'), {'username': 'WRITER', 'password': 'wrong'}, REMOTE_ADDR='198.51.100.4')
+        authenticate.assert_not_called()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('cleanblog_login_throttled_total{scope="account"} 1', registry.render())
+
+    def test_successful_logins_do_not_spend_the_account_bucket(self):
+        for i in range(4):
+            response = self.client.post(reverse('login'), {'username': 'writer', 'password': 'secret123'}, REMOTE_ADDR=f'203.0.113.{i}')
+            self.assertEqual(response.status_code, 302)
+            self.client.logout()
+
+    @override_settings(TRUSTED_PROXIES=['10.0.0.0/8'])
+    def test_client_ip_is_read_through_trusted_proxies_only(self):
+        factory = RequestFactory()
+        forwarded = {'HTTP_X_FORWARDED_FOR': '192.0.2.1, 203.0.113.9, 10.0.0.2'}
+        self.assertEqual(client_ip(factory.get('/', REMOTE_ADDR='10.0.0.1', **forwarded)), '203.0.113.9')
+        self.assertEqual(client_ip(factory.get('/', REMOTE_ADDR='198.51.100.4', **forwarded)), '198.51.100.4')
+        self.assertEqual(client_ip(factory.get('/', REMOTE_ADDR='10.0.0.1')), '10.0.0.1')
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_hashes_move_to_the_configured_iterations_on_login(self):
+        self.assertNotEqual(identify_hasher(self.user.password).decode(self.user.password)['iterations'], 1000)
+        self.assertEqual(self.client.post(reverse('login'), {'username': 'writer', 'password': 'secret123'}).status_code, 302)
+        self.user.refresh_from_db()
+        self.assertEqual(identify_hasher(self.user.password).decode(self.user.password)['iterations'], 1000)
+
+# --------------------------------------------------------------------
+
+class PostAdminTest(TestCase):
+    """The post changelist never loads post bodies and its bulk actions keep the counters right."""
+
+    def setUp(self):
+        self.author = create_author('admin')
+        User.objects.filter(pk=self.author.user_id).update(is_staff=True, is_superuser=True)
+        self.client.force_login(self.author.user)
+        self.science = Category.objects.create(title='Science')
+        self.history = Category.objects.create(title='History')
+        self.posts = [create_post(self.author, self.science, title=f'Admin post {i}') for i in range(6)]
+        self.url = reverse('admin:cleanblog_post_changelist')
+
+    def assertCounts(self, science, history):
+        self.science.refresh_from_db()
+        self.history.refresh_from_db()
+        self.author.refresh_from_db()
+        self.assertEqual((self.science.post_count, self.history.post_count), (science, history))
+        self.assertEqual(self.author.post_count, Post.objects.count())
+
+    def test_changelist_uses_counters_and_skips_post_bodies(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['cl'].result_count, 6)
+        sql = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('"post"."text"', sql)
+        # Neither the filters nor the action form list the categories.
+        self.assertNotIn('FROM "category" ORDER BY', sql)
+
+    def test_owner_filters_take_one_id(self):
+        self.posts[0].category = self.history
+        self.posts[0].save()
+        response = self.client.get(self.url, {'category': self.history.pk})
+        self.assertEqual([post.pk for post in response.context['cl'].result_list], [self.posts[0].pk])
+        self.assertEqual(self.client.get(self.url, {'category': 'x'}).context['cl'].result_count, 0)
+        self.assertEqual(self.client.get(self.url, {'author': 999}).context['cl'].result_count, 0)
+
+    def test_bulk_actions_keep_post_counts(self):
+        selected = [post.pk for post in self.posts[:4]]
+        self.client.post(self.url, {'action': 'recategorize_posts', '_selected_action': selected, 'category': self.history.pk})
+        self.assertCounts(science=2, history=4)
+
+        self.client.post(self.url, {'action': 'delete_posts', '_selected_action': selected[1:] + [self.posts[5].pk]})
+        self.assertCounts(science=1, history=1)
+
+    def test_batches_cover_every_row(self):
+        deleted = BulkPostChanges(batch_size=4).delete(Post.objects.all())
+        self.assertEqual(deleted, 6)
+        self.assertCounts(science=0, history=0)
+
+    def test_delete_removes_pictures_no_other_post_uses(self):
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            for name in ('posts/own.png', 'posts/variants/own-480w.webp', 'posts/post.png'):
+                default_storage.save(name, ContentFile(b'image'))
+            Post.objects.filter(pk=self.posts[0].pk).update(
+                picture='posts/own.png', picture_variants={'webp': {'480': 'posts/variants/own-480w.webp'}},
+            )
+            with self.captureOnCommitCallbacks(execute=True):
+                BulkPostChanges().delete(Post.objects.filter(pk__in=[self.posts[0].pk, self.posts[1].pk]))
+            self.assertFalse(default_storage.exists('posts/own.png'))
+            self.assertFalse(default_storage.exists('posts/variants/own-480w.webp'))
+            # Still the picture of four other posts.
+            self.assertTrue(default_storage.exists('posts/post.png'))
+
+# --------------------------------------------------------------------
+
+class PostApiTest(TestCase):
+    """The JSON API serializes only the requested fields and walks every post with its cursor."""
+
+    def setUp(self):
+        self.author = create_author('reader')
+        self.category = Category.objects.create(title='General')
+        now = timezone.now()
+        self.posts = [
+            create_post(self.author, self.category, title=f'Api post {i}', created_at=now - timedelta(hours=i // 2))
+            for i in range(7)
+        ]
+
+    def fetch(self, url, **headers):
+        response = self.client.get(url, **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, json.loads(body) if body else None
+
+    def test_cursor_pages_cover_every_post_with_sparse_fields(self):
+        response, page = self.fetch(reverse('api-post-list') + '?limit=3&fields=id,title')
+        ids = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(all(set(item) == {'id', 'title'} for item in page['results']))
+            ids += [item['id'] for item in page['results']]
+            if not page['next']:
+                break
+            response, page = self.fetch(page['next'])
+        self.assertEqual(ids, [post.pk for post in sorted(self.posts, key=lambda post: (post.created_at, post.pk), reverse=True)])
+
+    def test_bad_requests_are_400(self):
+        backward = CursorPaginator(Post.objects.all(), 3).encode_position(CursorPaginator.PREVIOUS, timezone.now(), 1)
+        cases = [
+            ('cursor=not-a-cursor', 'Invalid cursor.'),
+            (f'cursor={backward}', 'backward cursors are not supported'),
+            ('fields=id,secret', 'Unknown field(s): secret.'),
+            ('limit=0', 'limit must be between 1 and 500.'),
+            ('limit=501', 'limit must be between 1 and 500.'),
+            ('limit=ten', 'limit must be an integer.'),
+            ('category=general', 'category must be an id.'),
+            ('created_after=yesterday', 'created_after must be an ISO 8601 date or datetime.'),
+        ]
+        for query, message in cases:
+            with self.subTest(query=query):
+                response, error = self.fetch(f"{reverse('api-post-list')}?{query}")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(message, error['error'])
+                self.assertFalse(response.has_header('ETag'))
+        response, error = self.fetch(reverse('api-post-detail', args=[self.posts[0].pk]) + '?fields=secret')
+        self.assertEqual(response.status_code, 400)
+        response, error = self.fetch(reverse('api-post-detail', args=[0]))
+        self.assertEqual((response.status_code, error), (404, {'error': 'Post not found.'}))
+
+    def test_detail_omits_text_by_default_and_revalidates_with_etag(self):
+        url = reverse('api-post-detail', args=[self.posts[0].pk])
+        response, item = self.fetch(url)
+        self.assertEqual(item['author'], 'Reader')
+        self.assertNotIn('text', item)
+        self.assertEqual(self.fetch(url + '?fields=text')[1], {'text': self.posts[0].text})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.category.title = 'Renamed'
+        self.category.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+# --------------------------------------------------------------------
+
+class SitemapTest(TestCase):
+    """Sitemaps are sharded by id, cached per shard and never carry a forged host."""
+
+    def setUp(self):
+        cache.clear()
+        author = create_author('writer')
+        category = Category.objects.create(title='General')
+        self.posts = [create_post(author, category, title=f'Sitemap post {i}') for i in range(5)]
+        # Shard 0 ends at the third post; the last two fall into shard 1.
+        patcher = mock.patch('cleanblog.sitemaps.SHARD_SIZE', self.posts[2].pk)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def body(self, url, **headers):
+        response = self.client.get(url, **headers)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode() if response.streaming else response.content.decode()
+
+    def test_posts_are_split_into_shards_listed_by_the_index(self):
+        self.assertEqual(self.body(reverse('sitemap-index')).count('<sitemap>'), 2)
+        first = self.body(reverse('sitemap-shard', args=[0]))
+        second = self.body(reverse('sitemap-shard', args=[1]))
+        self.assertEqual((first.count('<url>'), second.count('<url>')), (3, 2))
+        self.assertIn(f'http://testserver/{self.posts[0].pk}/', first)
+        self.assertEqual(self.client.get(reverse('sitemap-shard', args=[9])).status_code, 404)
+
+    def test_shards_are_cached_until_one_of_their_posts_changes(self):
+        url = reverse('sitemap-shard', args=[1])
+        self.body(url)
+        with self.assertNumQueries(0):
+            self.body(url)
+        Post.objects.filter(pk=self.posts[-1].pk).delete()
+        self.assertNotIn(f'/{self.posts[-1].pk}/', self.body(url))
+
+    def test_evicted_shard_version_still_invalidates(self):
+        url = reverse('sitemap-shard', args=[1])
+        self.body(url)
+        cache.delete(f'{SitemapCache.prefix}:version:shard-1')
+        Post.objects.filter(pk=self.posts[-1].pk).delete()
+        self.assertNotIn(f'/{self.posts[-1].pk}/', self.body(url))
+
+    def test_forged_host_does_not_reach_other_clients(self):
+        url = reverse('sitemap-index')
+        self.assertIn('http://evil.example/', self.body(url, HTTP_HOST='evil.example'))
+        self.assertNotIn('evil.example', self.body(url))
+        with override_settings(SITE_URL='https://blog.example.com'):
+            self.assertIn('https://blog.example.com/sitemap-0.xml', self.body(url, HTTP_HOST='evil.example'))
+
+# --------------------------------------------------------------------
+
+class WarmupTest(TestCase):
+    """The worker warmup runs every step and compiles every project template."""
+
+    def test_warm_up_runs_all_steps_without_errors(self):
+        with self.assertNoLogs('cleanblog.warmup', 'ERROR'):
+            timings = warm_up()
+        self.assertEqual([name for name, _ in timings], ['urls', 'templates', 'database', 'caches'])
@@ -1,25 +1,44 @@
 from django.conf import settings
 from django.conf.urls.static import static
-from django.urls import path
+from django.urls import path, re_path
 
 # -----------------------
 
+from .api import PostDetailApiView, PostListApiView
+from .feeds import PostFeedView
+from .metrics import metrics_view
+from .sitemaps import sitemap_index, sitemap_shard
 from .views import (
-    PostListView, PostCreateView, PostDetailView, PostUpdateView
+    PostListView, PostCreateView, PostDetailView, PostUpdateView,
+    CategoryPostListView, AuthorPostListView,
+    AsyncPostListView, AsyncPostDetailView,
 )
 
-from . import views
-
 # -----------------------
 
+# Under ASGI the read path is served by native async views (see asgi.py).
+if settings.ASYNC_READ_VIEWS:
+    PostListView, PostDetailView = AsyncPostListView, AsyncPostDetailView
+
 urlpatterns = [
     path('', PostListView.as_view(), name='post-list'),
     path('create/', PostCreateView.as_view(), name='post-create'),
     path('<int:pk>/', PostDetailView.as_view(), name='post-detail'),
     path('<int:pk>/edit', PostUpdateView.as_view(), name='post-update'),
-    path('clear-data/', views.clear_data, name="clear-data")
+    path('category/<int:pk>/', CategoryPostListView.as_view(), name='category-posts'),
+    path('author/<int:pk>/', AuthorPostListView.as_view(), name='author-posts'),
+    path('sitemap.xml', sitemap_index, name='sitemap-index'),
+    path('sitemap-<int:shard>.xml', sitemap_shard, name='sitemap-shard'),
+    path('api/v1/posts/', PostListApiView.as_view(), name='api-post-list'),
+    path('api/v1/posts/<int:pk>/', PostDetailApiView.as_view(), name='api-post-detail'),
+    re_path(r'^feed/(?P<format>rss|atom|json)/$', PostFeedView.as_view(), name='post-feed'),
+    re_path(r'^category/(?P<pk>\d+)/feed/(?P<format>rss|atom|json)/$', PostFeedView.as_view(scope='category'), name='category-feed'),
+    re_path(r'^author/(?P<pk>\d+)/feed/(?P<format>rss|atom|json)/$', PostFeedView.as_view(scope='author'), name='author-feed'),
 ]
 
+if settings.INSTRUMENTATION:
+    urlpatterns.append(path('internal/metrics', metrics_view, name='metrics'))
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
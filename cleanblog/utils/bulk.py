@@ -0,0 +1,93 @@
+import logging
+from functools import partial
+
+from django.db import transaction
+from django.utils import timezone
+
+# -----------------------
+
+from .cache import ContentCache
+from .counts import PostCounts
+from .images import ImageVariants
+from .records import ObjectVersions
+
+# -----------------------
+
+logger = logging.getLogger(__name__)
+
+# -----------------------
+
+class BulkPostChanges:
+    """
+    Recategorize or delete any number of posts in short keyset batches.
+
+    Each batch is one transaction. Moves adjust the ``post_count`` columns
+    from one grouped read and change the rows with a single UPDATE, without
+    loading posts; caches are invalidated once at the end, as the bulk
+    commands do. Deletes go through ``QuerySet.delete()``, so the
+    ``post_delete`` handlers keep counters and caches right, and the
+    pictures nothing else uses are removed once the batch commits.
+    """
+
+    batch_size = 500
+    # What the post_delete handlers and the file cleanup read.
+    delete_fields = ('id', 'author_id', 'category_id', 'picture', 'picture_variants')
+
+    def __init__(self, using=None, batch_size=None):
+        self.using = using
+        if batch_size:
+            self.batch_size = batch_size
+
+    def batches(self, queryset):
+        """Yield a ``pk__in`` queryset per batch; safe while the batches are being deleted."""
+        queryset = queryset.using(self.using).order_by('pk')
+        last = 0
+        while True:
+            pks = list(queryset.filter(pk__gt=last).values_list('pk', flat=True)[:self.batch_size])
+            if not pks:
+                return
+            last = pks[-1]
+            yield queryset.model._base_manager.using(self.using).filter(pk__in=pks)
+
+    # -----------------------
+
+    def recategorize(self, queryset, category):
+        changed = 0
+        for batch in self.batches(queryset):
+            with transaction.atomic(using=self.using):
+                changed += PostCounts().reassign(batch, 'category_id', category.pk, self.using)
+                batch.exclude(category_id=category.pk).update(category=category, updated_at=timezone.now())
+        self.invalidate(queryset.model)
+        return changed
+
+    def delete(self, queryset):
+        deleted = 0
+        for batch in self.batches(queryset):
+            with transaction.atomic(using=self.using):
+                pictures = list(batch.values_list('picture', 'picture_variants'))
+                deleted += batch.only(*self.delete_fields).delete()[0]
+                transaction.on_commit(partial(self.delete_pictures, queryset.model, pictures), using=self.using)
+        return deleted
+
+    def delete_pictures(self, model, pictures):
+        """Remove the files of deleted rows unless another row still uses the same picture."""
+        storage = model._meta.get_field('picture').storage
+        names = {name for name, _ in pictures if name}
+        shared = set(
+            model._base_manager.using(self.using).filter(picture__in=names).values_list('picture', flat=True)
+        )
+        for name, variants in pictures:
+            if not name or name in shared:
+                continue
+            for path in ImageVariants().files(name, variants):
+                try:
+                    storage.delete(path)
+                except OSError:
+                    logger.warning('Could not delete %s.', path, exc_info=True)
+
+    def invalidate(self, model):
+        from ..sitemaps import SitemapCache
+
+        ContentCache().bump()
+        ObjectVersions().bump_all(model)
+        SitemapCache().invalidate_all()
@@ -0,0 +1,103 @@
+import posixpath
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.exceptions import ImproperlyConfigured
+from django.templatetags.static import static
+
+# -----------------------
+
+CSS_URL = re.compile(r'url\(\s*([\'"]?)(.*?)\1\s*\)')
+
+# Source maps of the individual files do not apply to a concatenation.
+SOURCE_MAP = re.compile(r'^\s*(/\*[#@] sourceMappingURL=.*?\*/|//[#@] sourceMappingURL=.*)$', re.MULTILINE)
+PRELOAD_TYPES = {
+    '.css': 'style', '.js': 'script',
+    '.woff2': 'font', '.woff': 'font', '.ttf': 'font',
+    '.jpg': 'image', '.jpeg': 'image', '.png': 'image', '.webp': 'image', '.svg': 'image',
+}
+
+# -----------------------
+
+class AssetBundles:
+    """
+    Named groups of static files declared in ``settings.ASSET_BUNDLES``::
+
+        {'base': {'css': [...], 'js': [...], 'preload': [...]}, ...}
+
+    While ``ASSET_BUNDLES_BUILT`` is off (development) every source file is
+    linked on its own. ``build_bundles`` concatenates each bundle into
+    ``static/bundles/<name>.css|js``; collectstatic then fingerprints and
+    compresses them, and WhiteNoise serves them with immutable caching.
+    """
+
+    kinds = ('css', 'js')
+    directory = 'bundles'
+
+    def __init__(self):
+        self.bundles = getattr(settings, 'ASSET_BUNDLES', {})
+        self.built = getattr(settings, 'ASSET_BUNDLES_BUILT', not settings.DEBUG)
+        self.root = Path(getattr(settings, 'ASSET_BUNDLES_ROOT', Path(__file__).resolve().parent.parent / 'static' / self.directory))
+
+    def get(self, name):
+        try:
+            return self.bundles[name]
+        except KeyError:
+            raise ImproperlyConfigured(f'Unknown asset bundle {name!r}.')
+
+    def bundle_path(self, name, kind):
+        return f'{self.directory}/{name}.{kind}'
+
+    def urls(self, name, kind):
+        sources = self.get(name).get(kind, ())
+        if not sources:
+            return []
+        if self.built:
+            return [static(self.bundle_path(name, kind))]
+        return [static(path) for path in sources]
+
+    def preloads(self, name):
+        return [(static(path), PRELOAD_TYPES.get(posixpath.splitext(path)[1], 'fetch')) for path in self.get(name).get('preload', ())]
+
+    # -----------------------
+
+    def build(self, name):
+        """Write the concatenated files of bundle ``name``; returns the written paths."""
+        written = []
+        for kind in self.kinds:
+            sources = self.get(name).get(kind, ())
+            if not sources:
+                continue
+            target = self.bundle_path(name, kind)
+            parts = []
+            for source in sources:
+                path = finders.find(source)
+                if path is None:
+                    raise ImproperlyConfigured(f'Bundle {name!r}: static file {source!r} not found.')
+                content = SOURCE_MAP.sub('', Path(path).read_text(encoding='utf-8'))
+                if kind == 'css':
+                    content = self.rebase_css_urls(content, source, target)
+                parts.append(f'/* {source} */\n{content.strip()}\n')
+            separator = ';\n' if kind == 'js' else '\n'
+            output = self.root / f'{name}.{kind}'
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(separator.join(parts), encoding='utf-8')
+            written.append(output)
+        return written
+
+    def rebase_css_urls(self, content, source, target):
+        """Rewrite relative ``url()`` references so they still resolve from ``target``."""
+        source_dir = posixpath.dirname(source)
+        target_dir = posixpath.dirname(target)
+
+        def rebase(match):
+            quote, url = match.groups()
+            if not url or url.startswith(('data:', 'http:', 'https:', '//', '/', '#')):
+                return match.group(0)
+            path, suffix = re.match(r'([^?#]*)(.*)', url).groups()
+            rebased = posixpath.relpath(posixpath.normpath(posixpath.join(source_dir, path)), target_dir)
+            return f'url({quote}{rebased}{suffix}{quote})'
+
+        return CSS_URL.sub(rebase, content)
@@ -0,0 +1,129 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.template.response import TemplateResponse
+from django.utils.safestring import mark_safe
+
+# -----------------------
+
+class ContentCache:
+    """
+    Shared cache for rendered, user-independent page fragments.
+
+    Every key embeds a global content version, which is bumped whenever a
+    Post, Author or Category is saved or deleted (see ``cleanblog.signals``),
+    so stale fragments are simply never read again and expire on their own.
+    """
+
+    version_key = 'cleanblog:content-version'
+    timeout = getattr(settings, 'CONTENT_CACHE_TIMEOUT', 600)
+
+    def version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            # Seeded from the clock so an evicted version never reuses the
+            # number of an older generation of fragments.
+            cache.add(self.version_key, int(time.time() * 1000), None)
+            version = cache.get(self.version_key)
+        return version
+
+    async def aversion(self):
+        version = await cache.aget(self.version_key)
+        if version is None:
+            await cache.aadd(self.version_key, int(time.time() * 1000), None)
+            version = await cache.aget(self.version_key)
+        return version
+
+    def bump(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, int(time.time() * 1000), None)
+
+    def key(self, name, *parts, version=None):
+        if version is None:
+            version = self.version()
+        digest = hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest()
+        return f'cleanblog:fragment:{name}:{version}:{digest}'
+
+    async def akey(self, name, *parts):
+        return self.key(name, *parts, version=await self.aversion())
+
+    def get(self, key):
+        return cache.get(key)
+
+    async def aget(self, key):
+        return await cache.aget(key)
+
+    def set(self, key, contents):
+        cache.set(key, contents, self.timeout)
+
+    async def aset(self, key, contents):
+        await cache.aset(key, contents, self.timeout)
+
+# -----------------------
+
+class CachedContentsMixin:
+    """
+    Render the shared part of a page from ``contents_template_name`` and cache it.
+
+    ``template_name`` is the page shell: it extends ``index.html`` (navbar
+    login state, flash modal) and outputs ``{{ contents }}``, so only the
+    per-session parts are rendered on a cache hit, without touching the view's
+    queryset at all.
+    """
+
+    contents_template_name = None
+
+    def get_contents_cache_key(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        self.contents_cache_key = self.get_contents_cache_key()
+        contents = ContentCache().get(self.contents_cache_key)
+        if contents is not None:
+            return self.render_contents(contents)
+        return super().get(request, *args, **kwargs)
+
+    def render_to_response(self, context, **response_kwargs):
+        contents = render_to_string(self.contents_template_name, context, self.request)
+        ContentCache().set(self.contents_cache_key, contents)
+        return self.render_contents(contents, **response_kwargs)
+
+    def render_contents(self, contents, **response_kwargs):
+        return TemplateResponse(
+            self.request, self.template_name, {'contents': mark_safe(contents)}, **response_kwargs
+        )
+
+# -----------------------
+
+class AsyncCachedContentsMixin(CachedContentsMixin):
+    """
+    Async counterpart of ``CachedContentsMixin`` for views served under ASGI.
+
+    Subclasses implement ``aget_contents_cache_key()`` and ``aget_contents_context()``;
+    the page is rendered in the event loop and returned as a plain
+    ``HttpResponse`` so nothing is handed off to the sync thread pool.
+    """
+
+    async def aget_contents_cache_key(self):
+        raise NotImplementedError
+
+    async def aget_contents_context(self):
+        raise NotImplementedError
+
+    async def get(self, request, *args, **kwargs):
+        # Resolve the user now: the lazy request.user would query the
+        # session and user tables synchronously while rendering the navbar.
+        request.user = await request.auser()
+        key = await self.aget_contents_cache_key()
+        contents = await ContentCache().aget(key)
+        if contents is None:
+            context = await self.aget_contents_context()
+            contents = render_to_string(self.contents_template_name, context, request)
+            await ContentCache().aset(key, contents)
+        return HttpResponse(render_to_string(self.template_name, {'contents': mark_safe(contents)}, request))
@@ -0,0 +1,93 @@
+import threading
+import time
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.forms.models import ModelChoiceField, ModelChoiceIterator
+
+# -----------------------
+
+class CategoryCache:
+    """
+    Process-local copy of the category list, checked against a shared version.
+
+    Categories are reference data: forms and validation read them on every
+    create/edit, but they rarely change. Each process keeps the list in
+    memory and reloads it only when the version in the shared cache, bumped
+    on Category save/delete (see ``cleanblog.signals``), differs from its own.
+    """
+
+    version_key = 'cleanblog:category-version'
+
+    _lock = threading.Lock()
+    # (version, categories ordered by title, categories by pk)
+    _local = (None, (), {})
+
+    def version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, int(time.time() * 1000), None)
+            version = cache.get(self.version_key)
+        return version
+
+    def bump(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, int(time.time() * 1000), None)
+
+    def load(self):
+        version = self.version()
+        local = CategoryCache._local
+        if local[0] != version:
+            with self._lock:
+                local = CategoryCache._local
+                if local[0] != version:
+                    model = apps.get_model('cleanblog', 'Category')
+                    categories = tuple(model.objects.only('id', 'title').order_by('title'))
+                    local = CategoryCache._local = (version, categories, {category.pk: category for category in categories})
+        return local
+
+    def all(self):
+        return self.load()[1]
+
+    def get(self, pk):
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return None
+        return self.load()[2].get(pk)
+
+# -----------------------
+
+class CachedCategoryIterator(ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for category in CategoryCache().all():
+            yield self.choice(category)
+
+    def __len__(self):
+        return len(CategoryCache().all()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(CategoryCache().all())
+
+
+class CategoryChoiceField(ModelChoiceField):
+    """ModelChoiceField over ``CategoryCache``: rendering and cleaning issue no queries."""
+
+    iterator = CachedCategoryIterator
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('queryset', apps.get_model('cleanblog', 'Category').objects.all())
+        super().__init__(**kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        category = CategoryCache().get(value.pk if hasattr(value, 'pk') else value)
+        if category is None:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value})
+        return category
@@ -0,0 +1,57 @@
+from django.apps import apps
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# -----------------------
+
+class PostCounts:
+    """
+    Denormalized ``post_count`` of authors and categories.
+
+    ``Post.save()`` and the ``post_delete`` signal adjust the counters in the
+    same transaction as the post row; bulk inserts and raw SQL bypass them,
+    so commands that use those call ``rebuild()`` afterwards.
+    """
+
+    owners = (('author_id', 'Author'), ('category_id', 'Category'))
+
+    def adjust(self, delta, using=None, **owner_ids):
+        """``adjust(1, author_id=3, category_id=5)``; owners that are None are skipped."""
+        for field, model_name in self.owners:
+            pk = owner_ids.get(field)
+            if pk is not None:
+                model = apps.get_model('cleanblog', model_name)
+                model.objects.using(using).filter(pk=pk).update(post_count=F('post_count') + delta)
+
+    def move(self, previous, current, using=None):
+        """Move one post between owners; both arguments are ``(author_id, category_id)``."""
+        for (field, _), old, new in zip(self.owners, previous, current):
+            if old != new:
+                self.adjust(-1, using, **{field: old})
+                self.adjust(1, using, **{field: new})
+
+    def reassign(self, queryset, field, pk, using=None):
+        """
+        Counter side of ``queryset.update(**{field: pk})``, in one grouped read.
+
+        Call it in the same transaction, before the update.
+        """
+        moving = queryset.exclude(**{field: pk}).order_by().values(field).annotate(total=Count('pk'))
+        total = 0
+        for row in moving:
+            self.adjust(-row['total'], using, **{field: row[field]})
+            total += row['total']
+        if total:
+            self.adjust(total, using, **{field: pk})
+        return total
+
+    def rebuild(self, using=None):
+        """Recount every author and category with one correlated UPDATE each."""
+        post = apps.get_model('cleanblog', 'Post')
+        for field, model_name in self.owners:
+            model = apps.get_model('cleanblog', model_name)
+            counts = (
+                post.objects.using(using).filter(**{field: OuterRef('pk')})
+                .order_by().values(field).annotate(total=Count('pk')).values('total')
+            )
+            model.objects.using(using).update(post_count=Coalesce(Subquery(counts), Value(0)))
@@ -0,0 +1,119 @@
+import hashlib
+import ipaddress
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+# -----------------------
+
+class HttpCacheMixin:
+    """
+    Conditional GET and shared-cache headers for public read views.
+
+    Requests without a session or messages cookie are anonymous by
+    construction: they are answered without loading the session, get
+    ``Cache-Control: public`` and are validated with ``get_validators()``
+    (``ETag`` and ``Last-Modified``) before the view loads anything, so a
+    reverse proxy or browser can revalidate with a 304. Requests that carry
+    those cookies get a private, always-revalidated response.
+    """
+
+    max_age = getattr(settings, 'HTTP_CACHE_MAX_AGE', 60)
+    shared_max_age = getattr(settings, 'HTTP_CACHE_SHARED_MAX_AGE', 300)
+    private_cookies = (settings.SESSION_COOKIE_NAME, getattr(settings, 'MESSAGE_COOKIE_NAME', 'messages'))
+
+    def get_validators(self):
+        """Return ``(etag, last_modified)``; ``last_modified`` is a datetime or None."""
+        raise NotImplementedError
+
+    async def aget_validators(self):
+        return self.get_validators()
+
+    def make_etag(self, *parts):
+        return quote_etag(hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest())
+
+    def is_shared_request(self):
+        return self.request.method in ('GET', 'HEAD') and not any(
+            name in self.request.COOKIES for name in self.private_cookies
+        )
+
+    # -----------------------
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._adispatch(request, *args, **kwargs)
+        if not self.is_shared_request():
+            return self.patch_private(super().dispatch(request, *args, **kwargs))
+        request.user = AnonymousUser()
+        etag, last_modified = self.get_validators()
+        response = self.conditional_response(etag, last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        return self.patch_shared(response, etag, last_modified)
+
+    async def _adispatch(self, request, *args, **kwargs):
+        if not self.is_shared_request():
+            return self.patch_private(await super().dispatch(request, *args, **kwargs))
+        request.user = AnonymousUser()
+        etag, last_modified = await self.aget_validators()
+        response = self.conditional_response(etag, last_modified)
+        if response is None:
+            response = await super().dispatch(request, *args, **kwargs)
+        return self.patch_shared(response, etag, last_modified)
+
+    def conditional_response(self, etag, last_modified):
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return get_conditional_response(self.request, etag=etag, last_modified=timestamp)
+
+    def patch_shared(self, response, etag, last_modified):
+        if response.status_code in (200, 304):
+            response.headers['ETag'] = etag
+            if last_modified:
+                response.headers['Last-Modified'] = http_date(int(last_modified.timestamp()))
+            patch_cache_control(response, public=True, max_age=self.max_age, s_maxage=self.shared_max_age)
+        # Logged-in visitors (session cookie) see a different navbar.
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    def patch_private(self, response):
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+# -----------------------
+
+@lru_cache(maxsize=8)
+def _networks(networks):
+    return tuple(ipaddress.ip_network(network, strict=False) for network in networks)
+
+
+def _is_trusted(address, networks):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(address in network for network in networks)
+
+
+def client_ip(request):
+    """
+    The address of the client that sent ``request``.
+
+    ``REMOTE_ADDR``, unless it is one of ``TRUSTED_PROXIES``: then the
+    ``CLIENT_IP_HEADER`` chain (``X-Forwarded-For``) is read from the right
+    and the first hop that is not a trusted proxy is the client. Hops
+    further left are written by the client and never trusted.
+    """
+    networks = _networks(tuple(getattr(settings, 'TRUSTED_PROXIES', ())))
+    address = request.META.get('REMOTE_ADDR', '')
+    if not _is_trusted(address, networks):
+        return address
+    header = request.META.get(getattr(settings, 'CLIENT_IP_HEADER', 'HTTP_X_FORWARDED_FOR'), '')
+    for hop in reversed([hop.strip() for hop in header.split(',') if hop.strip()]):
+        address = hop
+        if not _is_trusted(hop, networks):
+            break
+    return address
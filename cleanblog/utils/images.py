@@ -0,0 +1,122 @@
+import posixpath
+from io import BytesIO
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+
+# -----------------------
+
+from .cache import ContentCache
+from .records import ObjectVersions
+
+# -----------------------
+
+class ImageVariants:
+    """
+    Resized WebP/JPEG copies of an uploaded picture.
+
+    Variants are written next to the original (``posts/variants/...``) and
+    recorded on the model's ``picture_variants`` field as::
+
+        {'source': 'posts/a.png', 'webp': {'480': 'posts/variants/a-480w.webp', ...}, 'jpeg': {...}}
+    """
+
+    widths = (480, 960, 1600)
+    formats = (
+        # (key, Pillow format, extension, MIME type)
+        ('webp', 'WEBP', 'webp', 'image/webp'),
+        ('jpeg', 'JPEG', 'jpg', 'image/jpeg'),
+    )
+    quality = 80
+
+    # -----------------------
+
+    def is_stale(self, instance, field_name='picture'):
+        picture = getattr(instance, field_name)
+        if not picture:
+            return False
+        return (instance.picture_variants or {}).get('source') != picture.name
+
+    def process(self, label, pk, field_name='picture', force=False, invalidate=True):
+        """
+        Generate and record the variants of one row; run by the ``generate_image_variants`` job.
+
+        ``invalidate=False`` leaves the content version to the caller, which
+        bumps it once per batch (see ``backfill_image_variants``).
+        """
+        model = apps.get_model(label)
+        instance = model.objects.filter(pk=pk).first()
+        if instance is None or not (force or self.is_stale(instance, field_name)):
+            return
+        variants = self.generate(getattr(instance, field_name))
+        model.objects.filter(pk=pk).update(picture_variants=variants)
+        ObjectVersions().bump(model, pk)
+        self.delete_unused(getattr(instance, field_name).storage, instance.picture_variants, variants)
+        if invalidate:
+            ContentCache().bump()
+
+    # -----------------------
+
+    def target_widths(self, width):
+        widths = [target for target in self.widths if target < width]
+        widths.append(min(width, self.widths[-1]))
+        return sorted(set(widths))
+
+    def variant_name(self, name, width, extension):
+        directory, filename = posixpath.split(name)
+        stem = posixpath.splitext(filename)[0]
+        return posixpath.join(directory, 'variants', f'{stem}-{width}w.{extension}')
+
+    def generate(self, picture):
+        from PIL import Image
+
+        storage = picture.storage
+        with picture.open('rb') as source:
+            image = Image.open(source)
+            image.load()
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+        variants = {'source': picture.name}
+        for width in self.target_widths(image.width):
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+            for key, image_format, extension, _ in self.formats:
+                frame = resized.convert('RGB') if image_format == 'JPEG' else resized
+                buffer = BytesIO()
+                frame.save(buffer, image_format, quality=self.quality, optimize=True)
+                name = self.variant_name(picture.name, width, extension)
+                if storage.exists(name):
+                    storage.delete(name)
+                name = storage.save(name, ContentFile(buffer.getvalue()))
+                variants.setdefault(key, {})[str(width)] = name
+        return variants
+
+    def files(self, name, variants):
+        """The original picture and every recorded variant of it."""
+        return [name, *(path for key, *_ in self.formats for path in (variants or {}).get(key, {}).values())]
+
+    def delete_unused(self, storage, old, new):
+        keep = {name for key, *_ in self.formats for name in new.get(key, {}).values()}
+        for key, *_ in self.formats:
+            for name in (old or {}).get(key, {}).values():
+                if name not in keep and storage.exists(name):
+                    storage.delete(name)
+
+    # -----------------------
+
+    def srcset(self, picture, variants, key='jpeg'):
+        names = (variants or {}).get(key, {})
+        return ', '.join(
+            f'{picture.storage.url(name)} {width}w'
+            for width, name in sorted(names.items(), key=lambda item: int(item[0]))
+        )
+
+    def image_set(self, picture, variants, width):
+        """CSS ``image-set()`` with every format available at ``width``."""
+        candidates = [
+            f'url("{picture.storage.url(variants[key][width])}") type("{mime}")'
+            for key, _, _, mime in self.formats
+            if width in variants.get(key, {})
+        ]
+        return f'image-set({", ".join(candidates)})' if candidates else ''
@@ -1,16 +1,17 @@
+from django.contrib import messages
 
-class Modal(object):
-    __instance = None
+# -----------------------
 
-    def __new__(cls, request):
-        if cls.__instance is None:
-            cls.__instance = super(Modal, cls).__new__(cls)
-        cls.request = request
-        return cls.__instance
-    
-    def create_message(self, request, message):
-        request.session['open_modal'] = True
-        request.session['message'] = message
+class Modal:
+    """
+    Flash messages shown in the info modal on the next rendered page.
 
-    
-        
\ No newline at end of file
+    Messages travel in a signed cookie (``MESSAGE_STORAGE``), so setting one
+    writes no session row and reading it needs no extra request.
+    """
+
+    def __init__(self, request):
+        self.request = request
+
+    def create_message(self, message):
+        messages.info(self.request, message)
@@ -0,0 +1,188 @@
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+# -----------------------
+
+from .cache import ContentCache
+
+# -----------------------
+
+class CachedCountPaginator(Paginator):
+    """
+    Offset paginator whose ``COUNT(*)`` is cached per query and content version.
+
+    Deep offset pages still pay for ``OFFSET n``; use ``CursorPaginator``
+    where the ordering allows it.
+    """
+
+    count_timeout = getattr(settings, 'PAGINATOR_COUNT_TIMEOUT', 300)
+
+    def get_count_cache_key(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None:
+            return None
+        try:
+            sql, params = query.sql_with_params()
+        except EmptyResultSet:
+            # ``.none()`` (e.g. a search without terms) counts as 0 without a query.
+            return None
+        return ContentCache().key('count', sql, repr(params))
+
+    @cached_property
+    def count(self):
+        key = self.get_count_cache_key()
+        if key is None:
+            return super().count
+        count = cache.get(key)
+        if count is None:
+            count = super().count
+            cache.set(key, count, self.count_timeout)
+        return count
+
+    async def acount(self):
+        """Async ``count``; primes the cached property so ``page()`` can run without I/O."""
+        if 'count' not in self.__dict__:
+            key = self.get_count_cache_key()
+            count = await cache.aget(key) if key else None
+            if count is None:
+                count = await self.object_list.acount()
+                if key:
+                    await cache.aset(key, count, self.count_timeout)
+            self.__dict__['count'] = count
+        return self.count
+
+    def get_page_range(self, number, on_each_side=2, on_ends=1):
+        return list(self.get_elided_page_range(number, on_each_side=on_each_side, on_ends=on_ends))
+
+
+class CountHintPaginator(CachedCountPaginator):
+    """
+    ``CachedCountPaginator`` that first asks ``count_hint()`` for the count.
+
+    The hint returns an exact total from denormalized counters when it can,
+    or None to fall back to the cached ``COUNT(*)``.
+    """
+
+    def __init__(self, *args, count_hint=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_hint = count_hint
+
+    @cached_property
+    def count(self):
+        count = self.count_hint() if self.count_hint else None
+        if count is None:
+            return CachedCountPaginator.count.func(self)
+        return count
+
+# -----------------------
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage:
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Keyset paginator over ``(created_at, id)``, newest first.
+
+    Each page is fetched with ``created_at <= c AND (created_at < c OR id < i)``
+    and ``LIMIT per_page + 1``, which walks the ``(created_at, id)`` index, so
+    deep pages cost the same as the first one and no ``COUNT(*)`` is issued.
+    """
+
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+
+    # -----------------------
+
+    def encode_cursor(self, direction, obj):
+        return self.encode_position(direction, obj.created_at, obj.pk)
+
+    def encode_position(self, direction, created_at, pk):
+        raw = f'{direction}|{created_at.isoformat()}|{pk}'
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+            if direction not in (self.NEXT, self.PREVIOUS):
+                raise ValueError(direction)
+            return direction, datetime.fromisoformat(created_at), int(pk)
+        except (ValueError, TypeError, UnicodeDecodeError) as error:
+            raise InvalidCursor(cursor) from error
+
+    # -----------------------
+
+    def get_page_queryset(self, cursor):
+        if not cursor:
+            return self.NEXT, False, self.queryset.order_by('-created_at', '-id')
+        direction, created_at, pk = self.decode_cursor(cursor)
+        if direction == self.NEXT:
+            queryset = self.queryset.filter(
+                Q(created_at__lt=created_at) | Q(id__lt=pk),
+                created_at__lte=created_at,
+            ).order_by('-created_at', '-id')
+        else:
+            queryset = self.queryset.filter(
+                Q(created_at__gt=created_at) | Q(id__gt=pk),
+                created_at__gte=created_at,
+            ).order_by('created_at', 'id')
+        return direction, True, queryset
+
+    def page(self, cursor=None):
+        direction, from_cursor, queryset = self.get_page_queryset(cursor)
+        rows = list(queryset[:self.per_page + 1])
+        return self._page_from_rows(rows, direction, from_cursor)
+
+    async def apage(self, cursor=None):
+        direction, from_cursor, queryset = self.get_page_queryset(cursor)
+        rows = [row async for row in queryset[:self.per_page + 1]]
+        return self._page_from_rows(rows, direction, from_cursor)
+
+    def _page_from_rows(self, rows, direction, from_cursor):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == self.NEXT:
+            return self._build_page(rows, has_next=has_more, has_previous=from_cursor)
+        rows.reverse()
+        return self._build_page(rows, has_next=True, has_previous=has_more)
+
+    def _build_page(self, rows, has_next, has_previous):
+        next_cursor = self.encode_cursor(self.NEXT, rows[-1]) if rows and has_next else None
+        previous_cursor = self.encode_cursor(self.PREVIOUS, rows[0]) if rows and has_previous else None
+        return CursorPage(rows, next_cursor, previous_cursor)
@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+
+# -----------------------
+
+from ..metrics import registry
+
+# -----------------------
+
+registry.describe('cleanblog_post_record_cache_total', 'counter', 'Post detail record lookups, by result (local_hit, shared_hit, miss).')
+
+# -----------------------
+
+class ObjectVersions:
+    """
+    Per-object version numbers in the shared cache.
+
+    ``bump(model, pk)`` is called on every save/delete (see ``cleanblog.signals``);
+    cached records remember the versions they were built from and are only
+    served while those still match. ``bump_all(model)`` retires every record
+    of a model at once, for bulk updates that send no signals.
+    """
+
+    prefix = 'cleanblog:object-version'
+
+    def key(self, model, pk):
+        return f'{self.prefix}:{model._meta.label_lower}:{pk}'
+
+    def all_key(self, model):
+        return self.key(model, '*')
+
+    def get_many(self, keys):
+        found = cache.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            # Seeded from the clock so an evicted version never reuses an old number.
+            seed = int(time.time() * 1000)
+            for key in missing:
+                cache.add(key, seed, None)
+            found.update(cache.get_many(missing))
+        return tuple(found.get(key) for key in keys)
+
+    async def aget_many(self, keys):
+        found = await cache.aget_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            seed = int(time.time() * 1000)
+            for key in missing:
+                await cache.aadd(key, seed, None)
+            found.update(await cache.aget_many(missing))
+        return tuple(found.get(key) for key in keys)
+
+    def bump(self, model, pk):
+        key = self.key(model, pk)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), None)
+
+    def bump_all(self, model):
+        self.bump(model, '*')
+
+# -----------------------
+
+class PostRecords:
+    """
+    Read-through cache of post detail records, checked against object versions.
+
+    A record is the ``Post`` with its author and category loaded (everything
+    ``post/_detail.html`` reads), stored with the versions of the post, its
+    author and its category. Lookups go through a bounded LRU in this process,
+    then the shared cache, then the database; either cache tier is used only
+    while the stored versions are current, so editing a post, renaming its
+    author or its category retires exactly the records that show them.
+    """
+
+    # Part of the shared key; bump when the cached instance's shape changes.
+    schema = 1
+    timeout = getattr(settings, 'POST_RECORD_CACHE_TIMEOUT', 3600)
+    local_size = getattr(settings, 'POST_RECORD_LOCAL_SIZE', 1000)
+
+    _lock = threading.Lock()
+    _local = OrderedDict()
+
+    def queryset(self):
+        return apps.get_model('cleanblog', 'Post').objects.select_related('author', 'category').defer('text')
+
+    def key(self, pk):
+        return f'cleanblog:post-record:{self.schema}:{pk}'
+
+    def version_keys(self, post):
+        return self.keys_for(post.pk, post.author_id, post.category_id)
+
+    def keys_for(self, pk, author_id, category_id):
+        versions = ObjectVersions()
+        post_model = apps.get_model('cleanblog', 'Post')
+        return [
+            versions.all_key(post_model),
+            versions.key(post_model, pk),
+            versions.key(apps.get_model('cleanblog', 'Author'), author_id),
+            versions.key(apps.get_model('cleanblog', 'Category'), category_id),
+        ]
+
+    def count(self, result):
+        registry.inc('cleanblog_post_record_cache_total', [('result', result)])
+
+    # -----------------------
+
+    def get(self, pk):
+        """Return ``(versions, post)``, or None when there is no such post."""
+        pk = int(pk)
+        entry = self.local_get(pk)
+        if entry is not None and entry[0] == ObjectVersions().get_many(self.version_keys(entry[1])):
+            self.count('local_hit')
+            return entry
+        entry = cache.get(self.key(pk))
+        if entry is not None and entry[0] == ObjectVersions().get_many(self.version_keys(entry[1])):
+            self.local_set(pk, entry)
+            self.count('shared_hit')
+            return entry
+        self.count('miss')
+        # Versions are read before the row: a change committed in between
+        # bumps them after this read, so the stored entry is already stale
+        # instead of pairing old data with new versions.
+        owners = self.queryset().filter(pk=pk).values_list('author_id', 'category_id').first()
+        if owners is None:
+            return None
+        versions = ObjectVersions().get_many(self.keys_for(pk, *owners))
+        post = self.queryset().filter(pk=pk).first()
+        if post is None:
+            return None
+        entry = (versions, post)
+        if (post.author_id, post.category_id) == owners:
+            cache.set(self.key(pk), entry, self.timeout)
+            self.local_set(pk, entry)
+        return entry
+
+    async def aget(self, pk):
+        pk = int(pk)
+        entry = self.local_get(pk)
+        if entry is not None and entry[0] == await ObjectVersions().aget_many(self.version_keys(entry[1])):
+            self.count('local_hit')
+            return entry
+        entry = await cache.aget(self.key(pk))
+        if entry is not None and entry[0] == await ObjectVersions().aget_many(self.version_keys(entry[1])):
+            self.local_set(pk, entry)
+            self.count('shared_hit')
+            return entry
+        self.count('miss')
+        owners = await self.queryset().filter(pk=pk).values_list('author_id', 'category_id').afirst()
+        if owners is None:
+            return None
+        versions = await ObjectVersions().aget_many(self.keys_for(pk, *owners))
+        post = await self.queryset().filter(pk=pk).afirst()
+        if post is None:
+            return None
+        entry = (versions, post)
+        if (post.author_id, post.category_id) == owners:
+            await cache.aset(self.key(pk), entry, self.timeout)
+            self.local_set(pk, entry)
+        return entry
+
+    # -----------------------
+
+    def local_get(self, pk):
+        with self._lock:
+            entry = self._local.get(pk)
+            if entry is not None:
+                self._local.move_to_end(pk)
+            return entry
+
+    def local_set(self, pk, entry):
+        with self._lock:
+            self._local[pk] = entry
+            self._local.move_to_end(pk)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    @classmethod
+    def clear_local(cls):
+        with cls._lock:
+            cls._local.clear()
@@ -0,0 +1,135 @@
+import re
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+# -----------------------
+
+class PostSearch:
+    """
+    Full-text search over Post title, briefing and text.
+
+    On SQLite the search runs against the ``post_fts`` FTS5 shadow table,
+    which is kept in sync with ``post`` by triggers. Other backends (or an
+    SQLite build without FTS5) fall back to ``icontains`` lookups.
+    """
+
+    table = 'post_fts'
+    columns = ('title', 'briefing', 'text')
+    # bm25() weights, in the same order as ``columns``.
+    weights = (10.0, 5.0, 1.0)
+    max_terms = 10
+    snippet_tokens = 16
+
+    # Markers placed around matched tokens by snippet(); they are swapped for
+    # <mark> tags only after the rest of the snippet has been escaped.
+    match_start = '\x02'
+    match_end = '\x03'
+    ellipsis = '…'
+
+    _available = None
+
+    # -----------------------
+
+    def install_triggers(self, conn):
+        """
+        (Re)create the triggers that keep ``post_fts`` in sync with ``post``.
+
+        Migration 0002 creates the table and the first triggers. SQLite
+        migrations that alter ``post`` rebuild the table, which drops its
+        triggers; this runs after every ``migrate`` to put them back.
+        """
+        if conn.vendor != 'sqlite' or self.table not in conn.introspection.table_names():
+            return
+        columns = ', '.join(self.columns)
+        new_values = ', '.join(f'new.{column}' for column in self.columns)
+        old_values = ', '.join(f'old.{column}' for column in self.columns)
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {self.table}_ai AFTER INSERT ON post BEGIN "
+                f"INSERT INTO {self.table}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {self.table}_ad AFTER DELETE ON post BEGIN "
+                f"INSERT INTO {self.table}({self.table}, rowid, {columns}) "
+                f"VALUES ('delete', old.id, {old_values}); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {self.table}_au AFTER UPDATE OF {columns} ON post BEGIN "
+                f"INSERT INTO {self.table}({self.table}, rowid, {columns}) "
+                f"VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {self.table}(rowid, {columns}) VALUES (new.id, {new_values}); END"
+            )
+
+    def rebuild(self, conn):
+        """Re-index every post from the ``post`` table."""
+        with conn.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')")
+
+    def is_available(self):
+        if PostSearch._available is None:
+            PostSearch._available = (
+                connection.vendor == 'sqlite'
+                and self.table in connection.introspection.table_names()
+            )
+        return PostSearch._available
+
+    async def ais_available(self):
+        # Introspection has no async API; this hops to a thread once per process.
+        if PostSearch._available is None:
+            await sync_to_async(self.is_available)()
+        return PostSearch._available
+
+    # -----------------------
+
+    def terms(self, search):
+        return re.findall(r'\w+', search or '')[:self.max_terms]
+
+    def match_expression(self, terms):
+        # Every term is quoted (so FTS5 operators typed by users are inert)
+        # and prefix-matched; terms are implicitly AND-ed.
+        return ' '.join('"%s"*' % term.replace('"', '""') for term in terms)
+
+    def filter(self, queryset, search):
+        """
+        Restrict ``queryset`` to posts matching ``search``, best match first.
+
+        Matching rows get a ``snippet`` attribute that can be rendered with
+        the ``highlight`` template filter.
+        """
+        terms = self.terms(search)
+        if not terms:
+            return queryset.none()
+        if not self.is_available():
+            return self._fallback(queryset, terms)
+
+        weights = ', '.join(str(weight) for weight in self.weights)
+        text_column = self.columns.index('text')
+        return queryset.extra(
+            tables=[self.table],
+            where=[f'{self.table}.rowid = post.id', f'{self.table} MATCH %s'],
+            params=[self.match_expression(terms)],
+            select={
+                'rank': f'bm25({self.table}, {weights})',
+                'snippet': f"snippet({self.table}, {text_column}, %s, %s, %s, {self.snippet_tokens})",
+            },
+            select_params=(self.match_start, self.match_end, self.ellipsis),
+        ).order_by('rank', '-created_at')
+
+    def _fallback(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(briefing__icontains=term) | Q(text__icontains=term)
+            )
+        return queryset
+
+    def highlight(self, snippet):
+        """Escape a snippet and turn the match markers into <mark> tags."""
+        if not snippet or self.match_start not in snippet:
+            return ''
+        html = escape(snippet)
+        html = html.replace(self.match_start, '<mark>').replace(self.match_end, '</mark>')
+        return mark_safe(html)
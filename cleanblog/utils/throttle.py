@@ -0,0 +1,144 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+# -----------------------
+
+from ..metrics import registry
+from .http import client_ip
+
+# -----------------------
+
+logger = logging.getLogger(__name__)
+
+registry.describe('cleanblog_login_attempts_total', 'counter', 'Login attempts, by outcome (throttled, success, failure).')
+registry.describe('cleanblog_login_throttled_total', 'counter', 'Login attempts rejected before authentication, by bucket scope.')
+
+# -----------------------
+
+class TokenBucket:
+    """
+    Token bucket of ``capacity`` tokens refilled at ``rate`` tokens per second.
+
+    State is a ``(tokens, updated)`` pair in the shared cache, so every worker
+    sees the same buckets; concurrent attempts can race on a read-modify-write,
+    which only lets a few extra attempts through. If the cache backend fails,
+    the bucket falls back to a bounded per-process store.
+    """
+
+    local_size = 10000
+
+    _lock = threading.Lock()
+    _local = OrderedDict()
+
+    def __init__(self, scope, capacity, rate):
+        self.scope = scope
+        self.capacity = capacity
+        self.rate = rate
+
+    def key(self, identifier):
+        digest = hashlib.md5(identifier.encode()).hexdigest()
+        return f'cleanblog:throttle:{self.scope}:{digest}'
+
+    def tokens(self, key, now):
+        state = self.load(key)
+        if state is None:
+            return self.capacity
+        return min(self.capacity, state[0] + (now - state[1]) * self.rate)
+
+    def wait(self, identifier):
+        """Seconds until a token is available (0 if one is), without taking it."""
+        tokens = self.tokens(self.key(identifier), time.time())
+        return 0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def consume(self, identifier):
+        """Take one token; returns 0 when allowed, else the seconds until a token is available."""
+        key = self.key(identifier)
+        now = time.time()
+        tokens = self.tokens(key, now)
+        if tokens < 1:
+            return (1 - tokens) / self.rate
+        # Kept until the bucket would be full again.
+        self.store(key, (tokens - 1, now), math.ceil(self.capacity / self.rate))
+        return 0
+
+    # -----------------------
+
+    def load(self, key):
+        try:
+            return cache.get(key)
+        except Exception:
+            logger.warning('Throttle cache unavailable, using the process-local store.', exc_info=True)
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                return None
+            return entry[0]
+
+    def store(self, key, state, timeout):
+        try:
+            cache.set(key, state, timeout)
+            return
+        except Exception:
+            pass
+        with self._lock:
+            self._local[key] = (state, time.monotonic() + timeout)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+# -----------------------
+
+class LoginThrottle:
+    """
+    Per-client, per-(client, username) and per-account token buckets checked before ``authenticate()``.
+
+    Every password check costs a full PBKDF2 hash, so attempts beyond the
+    buckets are rejected before any hashing. The client is resolved through
+    ``TRUSTED_PROXIES``. The ``account`` bucket is keyed on the username
+    alone, so guessing one password from many addresses is limited too; it
+    is only spent by failed attempts, which keeps its owner logging in
+    normally unless that account is actually under attack.
+    ``LOGIN_THROTTLE`` maps each scope to ``(burst, attempts per minute)``.
+    """
+
+    defaults = {'ip': (20, 10), 'username': (5, 3), 'account': (10, 2)}
+    # Checked on every attempt, spent by ``record(..., success=False)`` only.
+    failure_scopes = ('account',)
+
+    def __init__(self):
+        rates = {**self.defaults, **getattr(settings, 'LOGIN_THROTTLE', {})}
+        self.buckets = {scope: TokenBucket(scope, burst, per_minute / 60) for scope, (burst, per_minute) in rates.items()}
+
+    def identifiers(self, request, username):
+        ip = client_ip(request)
+        username = (username or '').lower()
+        return {'ip': ip, 'username': f'{ip}|{username}', 'account': username}
+
+    def attempt(self, request, username):
+        """Spend one attempt from each bucket; returns 0 when allowed, else the seconds to wait."""
+        identifiers = self.identifiers(request, username)
+        for scope, bucket in self.buckets.items():
+            if scope in self.failure_scopes:
+                retry_after = bucket.wait(identifiers[scope])
+            else:
+                retry_after = bucket.consume(identifiers[scope])
+            if retry_after:
+                registry.inc('cleanblog_login_throttled_total', [('scope', scope)])
+                registry.inc('cleanblog_login_attempts_total', [('outcome', 'throttled')])
+                return retry_after
+        return 0
+
+    def record(self, request, username, success):
+        registry.inc('cleanblog_login_attempts_total', [('outcome', 'success' if success else 'failure')])
+        if not success:
+            identifiers = self.identifiers(request, username)
+            for scope in self.failure_scopes:
+                if scope in self.buckets:
+                    self.buckets[scope].consume(identifiers[scope])
@@ -1,8 +1,7 @@
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
-from django.shortcuts import get_object_or_404
 # -----------------------
-from ..models import Author, Category
+from .categories import CategoryCache
 # -----------------------
 
 class Validator:
@@ -30,8 +29,7 @@ class Validator:
     def validate_category(self, category):
         if not category:
             raise ValidationError('Category is empty')
-        exists = Category.objects.filter(pk=category.pk).exists()
-        if not exists:
+        if CategoryCache().get(category.pk) is None:
             raise ValidationError("Category does not exist.")
         return category
 
@@ -40,7 +38,6 @@ class Validator:
             raise ValidationError('Picture is empty.')
         return picture
     
-    def validate_author_for_edition(self, post, _user):
-        author =  get_object_or_404(Author, user=_user)
-        return post.author != author
+    def validate_author_for_edition(self, post, author):
+        return not author or post.author_id != author.pk
         
@@ -1,7 +1,11 @@
+import math
+
 from django.contrib.auth import authenticate, login, logout 
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404, render, redirect
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.shortcuts import render, redirect
 from django.urls import reverse_lazy
 from django.utils import timezone
 from django.views.generic import(
@@ -9,44 +13,172 @@ from django.views.generic import(
 )
 
 # -----------------------
-from .models import Post, Author
+from .models import Author, Category, Post
 from .form import LoginForm, PostForm, SearchPostForm
 from .utils.validators import Validator
+from .utils.cache import AsyncCachedContentsMixin, CachedContentsMixin, ContentCache
+from .utils.http import HttpCacheMixin
 from .utils.modal import Modal
+from .utils.paginator import CachedCountPaginator, CursorPaginator, InvalidCursor
+from .utils.records import PostRecords
+from .utils.search import PostSearch
+from .utils.throttle import LoginThrottle
 # -----------------------
 
-from django.http import JsonResponse
-
-from django.views.decorators.csrf import csrf_exempt
-
-@csrf_exempt
-def clear_data(request):
-    request.session.pop("open_modal", False)
-    request.session.pop("message", None)
-    return JsonResponse({})
-
-class PostListView(ListView):
+class PostListView(HttpCacheMixin, CachedContentsMixin, ListView):
     model = Post
     context_object_name = 'posts'
     template_name = 'post/list.html'
+    contents_template_name = 'post/_list.html'
     paginate_by = 5
+    paginator_class = CachedCountPaginator
+    cache_name = 'post-list'
+
+    def get_search(self):
+        return self.request.GET.get('search', '').strip()
+
+    def get_contents_cache_parts(self):
+        return (
+            self.get_search(),
+            self.request.GET.get('page', ''),
+            self.request.GET.get('cursor', ''),
+        )
+
+    def get_contents_cache_key(self):
+        return ContentCache().key(self.cache_name, *self.get_contents_cache_parts())
+
+    def get_validators(self):
+        # The content version changes whenever anything on the list could.
+        return self.make_etag(self.cache_name, ContentCache().version(), *self.get_contents_cache_parts()), None
+
+    def use_cursor(self):
+        # Ranked search results and explicit ?page= links use offset pages;
+        # the plain newest-first listing is walked with a keyset cursor.
+        return not self.get_search() and 'page' not in self.request.GET
 
     def get_queryset(self):
-        queryset = super().get_queryset().order_by('-created_at')
-        search = self.request.GET.get('search', '').strip()
+        queryset = super().get_queryset().summary().order_by('-created_at', '-id')
+        search = self.get_search()
         if search:
-            queryset = queryset.filter(title__icontains=search)
+            queryset = PostSearch().filter(queryset, search)
         return queryset
 
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Invalid cursor.')
+        return (paginator, page, page.object_list, page.has_other_pages())
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        search = self.request.GET.get('search', '').strip()
-        context['form'] = SearchPostForm(initial={'search': search})
-        context['search'] = search
+        context.update(self.get_listing_context(context['paginator'], context['page_obj'], context['is_paginated']))
+        return context
+
+    def get_listing_context(self, paginator, page, is_paginated):
+        search = self.get_search()
+        context = {
+            'form': SearchPostForm(initial={'search': search}),
+            'search': search,
+        }
+        if is_paginated and not getattr(page, 'is_cursor', False):
+            context['page_range'] = paginator.get_page_range(page.number)
+        return context
+
+# -----------------------
+
+class AsyncPostListView(AsyncCachedContentsMixin, PostListView):
+    """PostListView for ASGI: search and pagination run on the async ORM."""
+
+    async def aget_contents_cache_key(self):
+        return await ContentCache().akey(self.cache_name, *self.get_contents_cache_parts())
+
+    async def aget_validators(self):
+        return self.make_etag(self.cache_name, await ContentCache().aversion(), *self.get_contents_cache_parts()), None
+
+    async def aget_contents_context(self):
+        if self.get_search():
+            await PostSearch().ais_available()
+        queryset = self.get_queryset()
+        if self.use_cursor():
+            paginator = CursorPaginator(queryset, self.paginate_by)
+            try:
+                page = await paginator.apage(self.request.GET.get('cursor'))
+            except InvalidCursor:
+                raise Http404('Invalid cursor.')
+        else:
+            paginator = self.get_paginator(queryset, self.paginate_by)
+            await paginator.acount()
+            number = self.request.GET.get('page') or 1
+            if number == 'last':
+                number = paginator.num_pages
+            try:
+                page = paginator.page(number)
+            except InvalidPage as error:
+                raise Http404(f'Invalid page ({number}): {error}')
+            page.object_list = [post async for post in page.object_list]
+
+        is_paginated = page.has_other_pages()
+        context = {
+            'view': self,
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': is_paginated,
+            'object_list': page.object_list,
+            self.context_object_name: page.object_list,
+        }
+        context.update(self.get_listing_context(paginator, page, is_paginated))
         return context
 
 # -----------------------
 
+class PostArchiveView(PostListView):
+    """
+    Newest-first posts of one category or author.
+
+    Always walked with a keyset cursor over the (owner, -created_at, -id)
+    index; the total comes from the owner's denormalized ``post_count``.
+    """
+
+    template_name = 'post/archive.html'
+    contents_template_name = 'post/_archive.html'
+    cache_name = 'post-archive'
+    archive_model = None
+    archive_field = None
+
+    def get_search(self):
+        return ''
+
+    def use_cursor(self):
+        return True
+
+    def get_contents_cache_parts(self):
+        return (self.archive_field, self.kwargs['pk'], self.request.GET.get('cursor', ''))
+
+    def get_queryset(self):
+        self.archive = self.archive_model.objects.filter(pk=self.kwargs['pk']).first()
+        if self.archive is None:
+            raise Http404(f'{self.archive_model._meta.verbose_name} not found.')
+        return super().get_queryset().filter(**{self.archive_field: self.archive.pk})
+
+    def get_listing_context(self, paginator, page, is_paginated):
+        return {'archive': self.archive, 'archive_field': self.archive_field}
+
+
+class CategoryPostListView(PostArchiveView):
+    archive_model = Category
+    archive_field = 'category'
+
+
+class AuthorPostListView(PostArchiveView):
+    archive_model = Author
+    archive_field = 'author'
+
+# -----------------------
+
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
     form_class = PostForm
@@ -62,21 +194,74 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         form = self.get_form()
         if form.is_valid():
             try:
-                form.instance.author = get_object_or_404(Author, user=self.request.user)
+                if not request.author:
+                    raise Http404('No author registered for this user.')
+                form.instance.author = request.author
                 form.save()
-                modal.create_message(request, 'Successfully created.')
+                modal.create_message('Successfully created.')
             except Exception as error:
                 print(error)
-                modal.create_message(request, 'Error creating.')
+                modal.create_message('Error creating.')
         else:
             return render(request, self.template_name, {'form':form})
         return redirect(reverse_lazy('post-list'))
 
 # -----------------------
 
-class PostDetailView(DetailView):
+class PostDetailView(HttpCacheMixin, CachedContentsMixin, DetailView):
     model = Post
     template_name='post/detail.html'
+    contents_template_name = 'post/_detail.html'
+
+    # (versions, post) from PostRecords; validators, fragment key and page
+    # all come from it, so a warm cache serves the page without a query.
+    record = None
+
+    def get_record(self):
+        if self.record is None:
+            self.set_record(PostRecords().get(self.kwargs['pk']))
+        return self.record
+
+    def set_record(self, record):
+        if record is None:
+            raise Http404('No post found matching the query.')
+        self.record = record
+
+    def get_object(self, queryset=None):
+        return self.get_record()[1]
+
+    def get_contents_cache_key(self):
+        return self.build_contents_cache_key(*self.get_record())
+
+    def build_contents_cache_key(self, versions, post):
+        # Keyed on the record's versions instead of the global content version.
+        return ContentCache().key('post-detail', post.pk, version='.'.join(str(version) for version in versions))
+
+    def get_validators(self):
+        return self.build_validators(*self.get_record())
+
+    def build_validators(self, versions, post):
+        return self.make_etag('post-detail', post.pk, *versions), post.updated_at or post.created_at
+
+# -----------------------
+
+class AsyncPostDetailView(AsyncCachedContentsMixin, PostDetailView):
+    """PostDetailView for ASGI: the record is read with the async cache and ORM APIs."""
+
+    async def aget_record(self):
+        if self.record is None:
+            self.set_record(await PostRecords().aget(self.kwargs['pk']))
+        return self.record
+
+    async def aget_contents_cache_key(self):
+        return self.build_contents_cache_key(*await self.aget_record())
+
+    async def aget_validators(self):
+        return self.build_validators(*await self.aget_record())
+
+    async def aget_contents_context(self):
+        self.object = (await self.aget_record())[1]
+        return self.get_context_data(object=self.object)
 
 # -----------------------
 
@@ -86,10 +271,19 @@ class PostUpdateView(LoginRequiredMixin, UpdateView):
     template_name = 'post/form.html'
     login_url = 'login'
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('author')
+
+    def get_object(self, queryset=None):
+        # Already loaded by dispatch(); UpdateView.get() would fetch it again.
+        if getattr(self, 'object', None) is not None:
+            return self.object
+        return super().get_object(queryset)
+
     def dispatch(self, request, *args, **kwargs):
         self.object = self.get_object()
-        if Validator().validate_author_for_edition(self.object, self.request.user):
-            Modal(request).create_message(request, 'You cannot edit or delete posts from this author.')
+        if Validator().validate_author_for_edition(self.object, request.author):
+            Modal(request).create_message('You cannot edit or delete posts from this author.')
             return redirect('post-list')  
         self.request.session['edition'] = True
         return super().dispatch(request, *args, **kwargs)
@@ -101,27 +295,24 @@ class PostUpdateView(LoginRequiredMixin, UpdateView):
         return context
     
     def post(self, request, *args, **kwargs):
+        # dispatch() has already checked that the post belongs to request.author.
         modal = Modal(request)
-        if Validator().validate_author_for_edition(self.object, self.request.user):
-            modal.create_message(request, 'You cannot edit or delete posts from this author.')
-            return redirect(reverse_lazy('post-list'))    
-        
         obj = self.object
         if 'delete' in request.POST:
             try:
                 obj.delete()
-                modal.create_message(request, 'Successfully deleted.')
+                modal.create_message('Successfully deleted.')
             except:
-                modal.create_message(request, 'Error deleting.')
+                modal.create_message('Error deleting.')
         else:
             form = self.form_class(request.POST, request.FILES, instance=obj)
             if form.is_valid():
                 try:
                     form.instance.updated_at = timezone.now()
                     form.save()
-                    modal.create_message(request, 'Successfully edited.')
+                    modal.create_message('Successfully edited.')
                 except:
-                    modal.create_message(request, 'Error editing.')
+                    modal.create_message('Error editing.')
             else:
                 return render(request, self.template_name, {'form':form, 'author_name': self.object.author.name, 'picture_url': f"/media/{self.object.picture}"})
         return redirect(reverse_lazy('post-list'))    
@@ -136,20 +327,29 @@ def login_auth(request):
             if form.is_valid():
                 username = form.cleaned_data['username']
                 password = form.cleaned_data['password']
+                # Rejected before authenticate(): each check is a full password hash.
+                throttle = LoginThrottle()
+                retry_after = throttle.attempt(request, username)
+                if retry_after:
+                    form.add_error(None, f'Too many login attempts. Try again in {math.ceil(retry_after)} seconds.')
+                    response = render(request, 'login/form.html', {'form':form}, status=429)
+                    response['Retry-After'] = str(math.ceil(retry_after))
+                    return response
                 user = authenticate(request, username=username, password=password)
+                throttle.record(request, username, user is not None)
                 if not user is None:
                     login(request, user)
-                    modal.create_message(request, 'Sucessfully logged in.')
+                    modal.create_message('Sucessfully logged in.')
                     return redirect(reverse_lazy('post-list'))
                 else:
-                    modal.create_message(request, 'Invalid username and password.')
+                    modal.create_message('Invalid username and password.')
             else:
                 return render(request, 'login/form.html', {'form':form})
         else:
             form = LoginForm()
         return render(request, 'login/form.html', {'form':form})
     else:
-        modal.create_message(request, 'User is already logged in.')
+        modal.create_message('User is already logged in.')
         return redirect(reverse_lazy('post-list'))
     
 # -----------------------
@@ -159,9 +359,9 @@ def logout_auth(request):
     modal = Modal(request)
     if request.user.is_authenticated:
         logout(request)
-        modal.create_message(request, 'Successfully logged off.')    
+        modal.create_message('Successfully logged off.')    
     else:
-        modal.create_message(request, 'User is already logged off.')    
+        modal.create_message('User is already logged off.')    
     return redirect(reverse_lazy('post-list'))
 
 # -----------------------
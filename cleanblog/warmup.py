@@ -0,0 +1,90 @@
+import logging
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.urls import get_resolver, reverse
+
+# -----------------------
+
+logger = logging.getLogger('cleanblog.warmup')
+
+# -----------------------
+
+def warm_up_urls():
+    # reverse() populates the resolver's lookup tables for every included
+    # URLconf, which imports every view module on the way.
+    get_resolver().url_patterns
+    reverse('post-list')
+
+
+def warm_up_templates():
+    """Compile this project's templates into the cached loader; third-party ones load on demand."""
+    base = Path(settings.BASE_DIR).resolve()
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            directory = Path(directory).resolve()
+            if not directory.is_dir() or base not in directory.parents:
+                continue
+            for path in sorted(directory.rglob('*.html')):
+                name = path.relative_to(directory).as_posix()
+                try:
+                    engine.get_template(name)
+                except Exception:
+                    # The page would fail on its first request too; keep going.
+                    logger.exception('Template %s does not compile.', name)
+
+
+def warm_up_database():
+    # Connections are per thread: this warms the one the calling thread
+    # (the worker's request thread for sync servers) will reuse under
+    # CONN_MAX_AGE.
+    for alias in connections:
+        connections[alias].ensure_connection()
+
+
+def warm_up_caches():
+    from .utils.cache import ContentCache
+    from .utils.categories import CategoryCache
+    from .utils.rendering import PostRenderer
+    from .utils.search import PostSearch
+
+    ContentCache().version()
+    CategoryCache().load()
+    PostSearch().is_available()
+    # Imports markdown and builds this thread's renderer.
+    PostRenderer().markdown()
+
+
+STEPS = (
+    ('urls', warm_up_urls),
+    ('templates', warm_up_templates),
+    ('database', warm_up_database),
+    ('caches', warm_up_caches),
+)
+
+# -----------------------
+
+def warm_up():
+    """
+    Pay the first request's one-off costs at worker start.
+
+    Called from ``wsgi.py``/``asgi.py`` when ``WARMUP_ON_START`` is set (not
+    from ``AppConfig.ready()``, which also runs for every management command
+    and must not query the database), and by ``manage.py warmup``. Returns
+    ``[(step, seconds), ...]``; a failing step is logged and skipped so a
+    worker still boots.
+    """
+    timings = []
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception('Warmup step %r failed.', name)
+        timings.append((name, time.perf_counter() - started))
+    logger.info('Warmed up in %.0fms (%s).', sum(seconds for _, seconds in timings) * 1000,
+                ', '.join(f'{name} {seconds * 1000:.0f}ms' for name, seconds in timings))
+    return timings
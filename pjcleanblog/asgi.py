@@ -9,8 +9,16 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pjcleanblog.settings')
+# ASGI workers serve the read path with the async views in cleanblog.views.
+os.environ.setdefault('ASYNC_READ_VIEWS', '1')
 
 application = get_asgi_application()
+
+if settings.WARMUP_ON_START:
+    from cleanblog.warmup import warm_up
+
+    warm_up()
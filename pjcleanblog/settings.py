@@ -28,6 +28,12 @@ DEBUG = True
 # Replace '*' with your domain name(s) in production
 ALLOWED_HOSTS = ['*']
 
+# Reverse proxies (addresses or networks) whose CLIENT_IP_HEADER is trusted
+# to name the client, e.g. TRUSTED_PROXIES=10.0.0.0/8. Empty trusts none, so
+# REMOTE_ADDR is the client (see cleanblog.utils.http.client_ip).
+TRUSTED_PROXIES = [proxy.strip() for proxy in os.environ.get('TRUSTED_PROXIES', '').split(',') if proxy.strip()]
+CLIENT_IP_HEADER = 'HTTP_X_FORWARDED_FOR'
+
 
 # -------------------------------------------------------------------
 # APPLICATIONS
@@ -58,6 +64,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'cleanblog.middleware.AuthorMiddleware',  # request.author, after AuthenticationMiddleware
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -90,19 +97,174 @@ TEMPLATES = [
 
 ROOT_URLCONF = 'pjcleanblog.urls'
 WSGI_APPLICATION = 'pjcleanblog.wsgi.application'
+ASGI_APPLICATION = 'pjcleanblog.asgi.application'
+
+# Serve the post list/detail with native async views; enabled by asgi.py.
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', '0') == '1'
+
+# Run cleanblog.warmup when wsgi.py/asgi.py load (compile templates, resolve
+# URLs, open connections, prime caches) so a new worker's first request is
+# served at steady-state latency. Not with gunicorn --preload: forked workers
+# would share the connections opened by the master.
+WARMUP_ON_START = os.environ.get('WARMUP_ON_START', '0') == '1'
+
+
+# -------------------------------------------------------------------
+# INSTRUMENTATION
+# -------------------------------------------------------------------
+
+# Opt-in request metrics (latency, SQL, templates, sessions) per URL name,
+# scraped in Prometheus format from /internal/metrics.
+INSTRUMENTATION = os.environ.get('INSTRUMENTATION', '0') == '1'
+# /internal/metrics answers a bearer INSTRUMENTATION_TOKEN when one is set,
+# otherwise only these client addresses (resolved through TRUSTED_PROXIES).
+INSTRUMENTATION_TOKEN = os.environ.get('INSTRUMENTATION_TOKEN', '')
+INSTRUMENTATION_ALLOWED_IPS = ['127.0.0.1/32', '::1/128']
+INSTRUMENTATION_SLOW_REQUEST_MS = int(os.environ.get('INSTRUMENTATION_SLOW_REQUEST_MS', '500'))
+INSTRUMENTATION_SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+
+if INSTRUMENTATION:
+    MIDDLEWARE.insert(0, 'cleanblog.middleware.InstrumentationMiddleware')
+    TEMPLATES[0]['BACKEND'] = 'cleanblog.metrics.InstrumentedDjangoTemplates'
+    SESSION_ENGINE = 'cleanblog.sessions'
 
 
 # -------------------------------------------------------------------
 # DATABASE
 # -------------------------------------------------------------------
 
+DATABASE_PATH = Path(os.environ.get('DATABASE_PATH', BASE_DIR / 'db.sqlite3'))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': DATABASE_PATH,
+    }
+}
+
+# SQLite production mode (SQLITE_PRODUCTION=1): WAL journaling, tuned pragmas,
+# persistent connections, and a read-only 'replica' connection to the same file
+# that serves reads outside of transactions (see cleanblog.routers).
+SQLITE_PRODUCTION = os.environ.get('SQLITE_PRODUCTION', '0') == '1'
+
+if SQLITE_PRODUCTION:
+    SQLITE_PRAGMAS = (
+        f"PRAGMA synchronous={os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')};"
+        f"PRAGMA mmap_size={os.environ.get('SQLITE_MMAP_SIZE', 268435456)};"
+        f"PRAGMA cache_size={os.environ.get('SQLITE_CACHE_SIZE', -65536)};"
+        f"PRAGMA busy_timeout={os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)};"
+        "PRAGMA temp_store=MEMORY;"
+    )
+    CONN_MAX_AGE = int(os.environ.get('CONN_MAX_AGE', 600))
+
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': 'PRAGMA journal_mode=WAL;' + SQLITE_PRAGMAS,
+            # Take the write lock up front instead of failing on lock upgrade.
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{DATABASE_PATH}?mode=ro',
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': 'PRAGMA query_only=ON;' + SQLITE_PRAGMAS,
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    }
+    DATABASE_ROUTERS = ['cleanblog.routers.ReadWriteRouter']
+
+
+# -------------------------------------------------------------------
+# CACHE
+# -------------------------------------------------------------------
+
+# Use a backend shared by all workers (e.g. Redis or Memcached) in production,
+# otherwise each process keeps its own fragments and content version.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'cleanblog'),
     }
 }
 
+# Lifetime (seconds) of cached page fragments and paginator counts.
+CONTENT_CACHE_TIMEOUT = 600
+PAGINATOR_COUNT_TIMEOUT = 300
+
+# Cache-Control for anonymous, cookie-free list/detail responses (seconds).
+HTTP_CACHE_MAX_AGE = 60
+HTTP_CACHE_SHARED_MAX_AGE = 300
+
+# Sitemap shards are cached until a post in the shard changes.
+SITEMAP_CACHE_TIMEOUT = 86400
+
+# Scheme and host used for absolute URLs in sitemaps, e.g. 'https://blog.example.com'.
+# Empty falls back to the request's host (one cached copy per host).
+SITE_URL = os.environ.get('SITE_URL', '').rstrip('/')
+
+# Post detail records: shared-cache lifetime (seconds) and size of the
+# per-process LRU in front of it. Both tiers are checked against the
+# versions of the post, its author and its category.
+POST_RECORD_CACHE_TIMEOUT = 3600
+POST_RECORD_LOCAL_SIZE = 1000
+
+
+# -------------------------------------------------------------------
+# BACKGROUND JOBS
+# -------------------------------------------------------------------
+
+# Side effects of saves (image variants, ...) are queued in the database and
+# run by `manage.py run_workers`. JOBS_RUN_INLINE=1 runs them in the web
+# process after commit instead, for development without a worker.
+JOBS_RUN_INLINE = os.environ.get('JOBS_RUN_INLINE', '0') == '1'
+# Seconds before a job still marked running (worker killed) is requeued.
+JOBS_LOCK_TIMEOUT = 600
+# Seconds finished jobs are kept for the admin.
+JOBS_RETENTION = 7 * 86400
+
+
+# -------------------------------------------------------------------
+# AUTHENTICATION
+# -------------------------------------------------------------------
+
+# Loads the user's Author together with the user on every request.
+AUTHENTICATION_BACKENDS = ['cleanblog.backends.AuthorModelBackend']
+
+
+# Login attempts per (burst, attempts per minute), checked per client IP, per
+# client IP and username, and per account (failed attempts only, from any
+# address) before any password is hashed (see cleanblog.utils.throttle).
+LOGIN_THROTTLE = {
+    'ip': (20, 10),
+    'username': (5, 3),
+    'account': (10, 2),
+}
+
+
+# -------------------------------------------------------------------
+# PASSWORD HASHING
+# -------------------------------------------------------------------
+
+# PBKDF2 work factor; unset keeps Django's default. Existing hashes are
+# re-hashed with the new count on each account's next successful login.
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', '0')) or None
+
+PASSWORD_HASHERS = [
+    # Also verifies existing pbkdf2_sha256 hashes, so Django's own entry is left out.
+    'cleanblog.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 
 # -------------------------------------------------------------------
 # PASSWORD VALIDATION
@@ -133,13 +295,57 @@ USE_TZ = True
 # Static files (CSS, JavaScript, images)
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'static'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Outside DEBUG, collected files are fingerprinted and pre-compressed, and
+    # WhiteNoise serves them with immutable far-future caching.
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
+
+# Per-page asset bundles, emitted with {% bundle %}. Outside DEBUG the built
+# files are used: run `manage.py build_bundles` before `collectstatic`.
+ASSET_BUNDLES = {
+    'base': {
+        'css': ['css/vendor/bootstrap.min.css', 'fonts/font-awesome.css', 'css/vendor/clean-blog.min.css'],
+        'js': ['js/vendor/jquery.min.js', 'js/vendor/bootstrap.bundle.min.js', 'js/vendor/clean-blog.min.js'],
+    },
+    'post-list': {
+        'css': ['css/styles/index.css'],
+        'preload': ['images/intro.jpg'],
+    },
+    'post-detail': {
+        'css': ['css/styles/index.css'],
+    },
+    'post-form': {
+        'css': ['css/styles/form.css'],
+    },
+    'login': {
+        'css': ['css/styles/login.css'],
+    },
+}
+ASSET_BUNDLES_BUILT = not DEBUG
 
 # Media files (user uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'cleanblog' / 'media'
 
 
+# -------------------------------------------------------------------
+# MESSAGES
+# -------------------------------------------------------------------
+
+# Flash messages are carried in a signed cookie instead of the session.
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+
 # -------------------------------------------------------------------
 # LOGIN / LOGOUT REDIRECTS
 # -------------------------------------------------------------------